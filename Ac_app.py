@@ -1,9 +1,168 @@
-import customtkinter as ctk
-from gui.interface import App
+import argparse
+import multiprocessing
+import sys
+
+
+def executar_lote(argv):
+    from batch.processador import processar_lote
+
+    parser = argparse.ArgumentParser(
+        prog="Ac_app batch",
+        description="Processa todos os certificados PDF de uma pasta, sem interface."
+    )
+    parser.add_argument("pasta", help="Pasta com os certificados PDF")
+    parser.add_argument("--workers", type=int, default=None, help="Processos para leitura dos PDFs")
+    parser.add_argument("--resumo", default=None, help="Arquivo JSON de resumo (padrão: <pasta>/resumo_lote.json)")
+    parser.add_argument(
+        "--aplicar",
+        action="store_true",
+        help="Aplica no banco todas as correções sugeridas pela validação"
+    )
+    parser.add_argument(
+        "--sem-indice",
+        action="store_true",
+        help="Consulta o banco a cada certificado, sem carregar a tabela em memória"
+    )
+    parser.add_argument(
+        "--triagem",
+        action="store_true",
+        help="Para a validação de cada certificado na primeira divergência que o deixa pendente"
+    )
+    args = parser.parse_args(argv)
+    _preparar_banco_local()
+
+    resultados, caminho_resumo = processar_lote(
+        args.pasta, args.workers, args.aplicar, args.resumo,
+        usar_indice=not args.sem_indice, triagem=args.triagem
+    )
+    ok = sum(1 for r in resultados if r["status"] == "ok")
+    print(f"{ok}/{len(resultados)} certificados gerados. Resumo: {caminho_resumo}")
+
+
+def _preparar_banco_local():
+    """
+    Aplica as migrações pendentes do instrumentos.db local. Com o esquema
+    em dia só há leituras; com o serviço de banco, o esquema é dele.
+    """
+    from data.cliente import cliente_configurado
+    from data.conexao import criar_tabela
+
+    if cliente_configurado() is None:
+        criar_tabela()
+
+
+def _exigir_banco_local(comando):
+    from data.cliente import cliente_configurado
+
+    if cliente_configurado() is not None:
+        print(f"'{comando}' acessa o instrumentos.db diretamente: execute no computador do serviço de banco, sem AC_SERVIDOR_BANCO.")
+        sys.exit(1)
+    _preparar_banco_local()
+
+
+def executar_importacao(argv):
+    import json
+    from data.importacao import importar_instrumentos
+
+    parser = argparse.ArgumentParser(
+        prog="Ac_app importar",
+        description="Importa (insere ou atualiza por TAG) o cadastro de instrumentos de um CSV ou XLSX."
+    )
+    parser.add_argument("arquivo", help="CSV ou XLSX com as colunas tag, sn_instrumento, sn_sensor, min_range, max_range")
+    parser.add_argument("--simular", action="store_true", help="Apenas confere o arquivo, sem gravar no banco")
+    parser.add_argument("--relatorio", default=None, help="Grava conflitos e linhas inválidas neste arquivo JSON")
+    args = parser.parse_args(argv)
+    _exigir_banco_local("importar")
+
+    try:
+        relatorio = importar_instrumentos(args.arquivo, args.simular)
+    except (OSError, ValueError) as e:
+        print(f"Erro na importação: {e}")
+        sys.exit(1)
+
+    for conflito in relatorio["conflitos"][:20]:
+        print(
+            f"Conflito linha {conflito['linha']}: SN {conflito['sn_instrumento']} de {conflito['tag']} "
+            f"já pertence a {conflito['tag_existente']}"
+        )
+    for invalida in relatorio["invalidas"][:20]:
+        print(f"Linha {invalida['linha']} ignorada: {invalida['erro']}")
+
+    if args.relatorio:
+        with open(args.relatorio, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+    print(
+        f"{relatorio['lidas']} linhas lidas: {relatorio['inseridas']} inseridas, "
+        f"{relatorio['atualizadas']} atualizadas, {len(relatorio['conflitos'])} conflitos, "
+        f"{len(relatorio['invalidas'])} inválidas" + (" (simulação, nada gravado)" if args.simular else "")
+    )
+
+
+def executar_exportacao(argv):
+    from data.importacao import exportar_instrumentos
+
+    parser = argparse.ArgumentParser(
+        prog="Ac_app exportar",
+        description="Exporta o cadastro de instrumentos para CSV ou XLSX."
+    )
+    parser.add_argument("arquivo", help="Arquivo de saída (.csv ou .xlsx)")
+    args = parser.parse_args(argv)
+    _exigir_banco_local("exportar")
+
+    total = exportar_instrumentos(args.arquivo)
+    print(f"{total} instrumentos exportados para {args.arquivo}")
+
+
+def executar_servidor(argv):
+    from data.servico import PORTA_PADRAO, criar_servidor
+
+    parser = argparse.ArgumentParser(
+        prog="Ac_app servidor",
+        description="Serviço de banco compartilhado: as estações com AC_SERVIDOR_BANCO=host:porta usam este banco."
+    )
+    parser.add_argument("--banco", default=None, help="Arquivo SQLite (padrão: instrumentos.db)")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface de rede (0.0.0.0 para aceitar outras estações; fora de 127.0.0.1/localhost exige --token ou AC_SERVIDOR_TOKEN)")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--token", default=None, help="Senha exigida dos clientes (padrão: AC_SERVIDOR_TOKEN)")
+    args = parser.parse_args(argv)
+
+    try:
+        servidor = criar_servidor(args.banco, args.host, args.porta, args.token)
+    except ValueError as e:
+        print(f"Serviço não iniciado: {e}")
+        sys.exit(1)
+    host, porta = servidor.server_address[:2]
+    print(f"Serviço de banco em {host}:{porta} (Ctrl+C para encerrar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+COMANDOS = {
+    "batch": executar_lote,
+    "servidor": executar_servidor,
+    "importar": executar_importacao,
+    "exportar": executar_exportacao,
+}
+
 
 def main():
+    multiprocessing.freeze_support()
+
+    if len(sys.argv) > 1 and sys.argv[1] in COMANDOS:
+        COMANDOS[sys.argv[1]](sys.argv[2:])
+        return
+
+    _preparar_banco_local()
+
+    from gui.interface import App
+
     app = App() # Sem passar 'root' aqui
     app.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
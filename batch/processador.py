@@ -0,0 +1,243 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from pdf.cache import extrair_com_cache
+from xml_model.xml_generator import gerar_xml_calibracao
+from data.cliente import cliente_configurado
+from data.historico import registrar_calibracao
+from data.repositorio import repositorio
+from data.unidade_trabalho import UnidadeDeTrabalho
+from data.utils_db import resolver_instrumentos
+from validation.context import chave_resolucao, criar_contexto
+from validation.engine import FALHA_RAPIDA, ValidationEngine, impeditiva
+from telemetria.rastreio import atributos_certificado, span
+
+
+NOME_RESUMO = "resumo_lote.json"
+
+# Certificados por consulta de resolução ao banco (resolver_instrumentos)
+TAMANHO_BLOCO = 50
+
+
+def extrair_certificado(caminho):
+    """
+    Etapa executada nos processos do pool: leitura do PDF (pdfplumber),
+    campos e pontos de calibração, com o cache de extração. Retorna
+    apenas dados serializáveis.
+    """
+    try:
+        dados_pdf, pontos = extrair_com_cache(caminho)
+        return {"arquivo": caminho, "dados": dados_pdf, "pontos": pontos, "erro": None}
+    except Exception as e:
+        return {"arquivo": caminho, "dados": None, "pontos": [], "erro": f"Erro no PDF: {e}"}
+
+
+def _issue_para_dict(issue):
+    return {
+        "key": issue.key,
+        "title": issue.title,
+        "message": issue.message,
+        "blocking": issue.blocking,
+        "action": issue.action is not None
+    }
+
+
+def _pendencia(aplicar_acoes):
+    """
+    Critério de divergência que deixa o certificado pendente no lote.
+    """
+    if aplicar_acoes:
+        return impeditiva
+    return lambda issue: issue.action is not None or issue.blocking
+
+
+def validar_e_gerar(extraido, aplicar_acoes=False, resolucao=None, triagem=False):
+    """
+    Validação, AC e XML de um certificado já extraído.
+
+    Sem interação não há quem confirme as ações das divergências: elas só
+    são aplicadas com aplicar_acoes=True (equivale a responder "Sim" em
+    todas). Caso contrário, qualquer divergência com ação ou bloqueante
+    impede a geração, como ocorre na interface quando o usuário recusa.
+    As ações e o registro no histórico (data.historico) são gravados num
+    único commit, depois que a AC e o XML forem gerados; se a gravação
+    falhar, a AC e o XML são apagados (ver data.unidade_trabalho).
+
+    resolucao: cadastro já resolvido para o certificado (ver
+    processar_lote); sem ela, o banco é consultado aqui.
+
+    triagem: a validação para na primeira divergência que deixa o
+    certificado pendente (o resultado é o mesmo, mas o resumo só traz
+    essa divergência).
+    """
+    dados_pdf = extraido["dados"]
+    resultado = {
+        "arquivo": extraido["arquivo"],
+        "tag": None,
+        "certificado": None,
+        "status": "erro",
+        "issues": [],
+        "acoes_aplicadas": 0,
+        "ac": None,
+        "xml": None,
+        "erro": extraido["erro"]
+    }
+
+    if dados_pdf is None:
+        return resultado
+
+    resultado["tag"] = dados_pdf.get("tag")
+    resultado["certificado"] = dados_pdf.get("certificado")
+
+    if not dados_pdf.get("tag"):
+        resultado["erro"] = "TAG não encontrada no PDF"
+        return resultado
+
+    with span(
+        "lote.certificado",
+        arquivo=os.path.basename(extraido["arquivo"]),
+        **atributos_certificado(dados_pdf, extraido["pontos"])
+    ) as s:
+        _validar_e_gerar(extraido, resultado, aplicar_acoes, resolucao, triagem)
+        s.definir(status=resultado["status"])
+
+    return resultado
+
+
+def _validar_e_gerar(extraido, resultado, aplicar_acoes, resolucao, triagem):
+    dados_pdf = extraido["dados"]
+
+    if triagem:
+        engine = ValidationEngine(FALHA_RAPIDA, parar=_pendencia(aplicar_acoes))
+    else:
+        engine = ValidationEngine()
+
+    try:
+        ctx = criar_contexto(dados_pdf, extraido["pontos"], resolucao)
+        issues = engine.run(ctx)
+    except Exception as e:
+        resultado["erro"] = f"Erro na validação: {e}"
+        return resultado
+
+    ok = True
+    unidade = UnidadeDeTrabalho(dados_pdf)
+    for issue in issues:
+        resultado["issues"].append(_issue_para_dict(issue))
+        if issue.action and aplicar_acoes:
+            unidade.registrar(issue.action, issue.marca)
+        elif issue.action or issue.blocking:
+            ok = False
+
+    if not ok:
+        resultado["status"] = "pendente"
+        return resultado
+
+    acoes = len(unidade)
+    try:
+        # Importado aqui para que os processos do pool não carreguem
+        # openpyxl/win32com, usados só no processo principal
+        from form.utils_print import gerar_ac
+
+        with unidade.confirmar():
+            caminho_ac, _ = gerar_ac(dados_pdf, extraido["arquivo"])
+            unidade.registrar_arquivo(caminho_ac)
+            caminho_xml = Path(str(caminho_ac).replace("_AC", "")).with_suffix(".xml")
+            unidade.registrar_arquivo(caminho_xml)
+            gerar_xml_calibracao(dados_pdf, extraido["pontos"], str(caminho_xml), dados_pdf.get("certificado_te_anterior"))
+            unidade.registrar(lambda: registrar_calibracao(dados_pdf, extraido["pontos"], extraido["arquivo"]))
+    except Exception as e:
+        resultado["erro"] = f"Erro na geração: {e}"
+        return resultado
+
+    resultado["status"] = "ok"
+    resultado["acoes_aplicadas"] = acoes
+    resultado["ac"] = str(caminho_ac)
+    resultado["xml"] = str(caminho_xml)
+    return resultado
+
+
+def listar_pdfs(pasta):
+    return sorted(
+        str(p) for p in Path(pasta).iterdir()
+        if p.is_file() and p.suffix.lower() == ".pdf"
+    )
+
+
+def _em_blocos(iteravel, tamanho):
+    bloco = []
+    for item in iteravel:
+        bloco.append(item)
+        if len(bloco) == tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+def _resolver_bloco(bloco):
+    """
+    Cadastro de todos os certificados do bloco numa única consulta.
+    Retorna {posição no bloco: resolução}.
+    """
+    validos = [i for i, e in enumerate(bloco) if e["dados"] and e["dados"].get("tag")]
+    try:
+        resolucoes = resolver_instrumentos(chave_resolucao(bloco[i]["dados"]) for i in validos)
+    except Exception as e:
+        print(f"Erro ao consultar o banco em bloco: {e}")
+        return {}
+    return dict(zip(validos, resolucoes))
+
+
+def processar_lote(pasta, workers=None, aplicar_acoes=False, caminho_resumo=None, usar_indice=True, triagem=False):
+    """
+    Processa todos os PDFs da pasta.
+
+    A leitura dos PDFs (CPU) é distribuída num pool de processos; banco,
+    validação e geração de AC/XML rodam no processo principal, na ordem
+    dos arquivos, enquanto o pool já lê os próximos certificados. A AC
+    usa o TemplateAC.xlsx e o Excel, que não podem ser usados em paralelo.
+
+    O cadastro é consultado uma vez a cada TAMANHO_BLOCO certificados.
+    Quando correções são gravadas no banco, os demais certificados do
+    bloco voltam a ser consultados um a um.
+
+    Com usar_indice, a tabela instrumentos é carregada em memória no
+    início e as consultas não acessam o SQLite (as correções continuam
+    sendo gravadas no banco e replicadas no índice).
+
+    triagem: ver validar_e_gerar.
+    """
+    arquivos = listar_pdfs(pasta)
+    resultados = []
+
+    # Com o serviço de banco, o arquivo local não é a base consultada
+    usar_indice = usar_indice and cliente_configurado() is None
+    if usar_indice:
+        repositorio.usar_indice()
+
+    try:
+        _processar(arquivos, workers, aplicar_acoes, triagem, resultados)
+    finally:
+        if usar_indice:
+            repositorio.descartar_indice()
+
+    caminho_resumo = caminho_resumo or os.path.join(pasta, NOME_RESUMO)
+    with open(caminho_resumo, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+    return resultados, caminho_resumo
+
+
+def _processar(arquivos, workers, aplicar_acoes, triagem, resultados):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for bloco in _em_blocos(pool.map(extrair_certificado, arquivos), TAMANHO_BLOCO):
+            resolucoes = _resolver_bloco(bloco)
+
+            for i, extraido in enumerate(bloco):
+                resultado = validar_e_gerar(extraido, aplicar_acoes, resolucoes.get(i), triagem)
+                if resultado["acoes_aplicadas"]:
+                    resolucoes = {}
+                resultados.append(resultado)
+                print(f"[{resultado['status']}] {os.path.basename(resultado['arquivo'])}")
@@ -0,0 +1,178 @@
+"""
+Latência por operação na tabela instrumentos: funções antigas de
+data.utils_db (uma conexão, um commit e um close por chamada) contra o
+InstrumentRepository (conexão por thread reutilizada, statements em
+cache), com o journal padrão e com WAL (como no serviço de data.servico).
+
+    python -m benchmarks.bench_banco [--instrumentos 5000] [--consultas 2000]
+
+Os resultados das consultas das duas implementações são comparados;
+divergência, ou o repositório sem wal deixar o banco em WAL, encerra
+com código 1.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from data import conexao
+from data.conexao import criar_tabela
+from data.repositorio import InstrumentRepository
+
+
+# --- Implementação anterior (referência congelada) --------------------------
+
+def _conectar_referencia():
+    return sqlite3.connect(conexao.db_path)
+
+
+def buscar_por_tag_referencia(tag):
+    conn = _conectar_referencia()
+    row = conn.execute("""
+        SELECT tag, sn_instrumento, sn_sensor, min_range, max_range
+        FROM instrumentos
+        WHERE tag = ?
+    """, (tag,)).fetchone()
+    conn.close()
+
+    if not row:
+        return None
+    return {
+        "tag": row[0],
+        "sn_instrumento": row[1],
+        "sn_sensor": row[2],
+        "min_range": row[3],
+        "max_range": row[4]
+    }
+
+
+def buscar_por_sn_referencia(sn):
+    conn = _conectar_referencia()
+    row = conn.execute("""
+        SELECT tag, sn_instrumento, sn_sensor
+        FROM instrumentos
+        WHERE sn_instrumento = ?
+    """, (sn,)).fetchone()
+    conn.close()
+
+    if not row:
+        return None
+    return {"tag": row[0], "sn_instrumento": row[1], "sn_sensor": row[2]}
+
+
+def atualizar_range_referencia(tag, min_range, max_range):
+    conn = _conectar_referencia()
+    conn.execute(
+        "UPDATE instrumentos SET min_range = ?, max_range = ? WHERE tag = ?",
+        (min_range, max_range, tag)
+    )
+    conn.commit()
+    conn.close()
+
+
+# ---------------------------------------------------------------------------
+
+def popular(caminho, n):
+    conexao.db_path = caminho
+    criar_tabela()
+    conn = sqlite3.connect(caminho)
+    conn.executemany(
+        "INSERT INTO instrumentos (tag, sn_instrumento, sn_sensor, min_range, max_range) VALUES (?, ?, ?, ?, ?)",
+        [(f"20-PIT-{i:05d}", f"SN{i:07d}", f"S{i:06d}", 0.0, 2500.0) for i in range(n)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def medir(funcao, argumentos):
+    tempos = []
+    for args in argumentos:
+        inicio = time.perf_counter()
+        funcao(*args)
+        tempos.append((time.perf_counter() - inicio) * 1e6)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instrumentos", type=int, default=5000)
+    parser.add_argument("--consultas", type=int, default=2000)
+    parser.add_argument("--escritas", type=int, default=200)
+    args = parser.parse_args()
+
+    sorteio = random.Random(1)
+    ids = [sorteio.randrange(args.instrumentos) for _ in range(args.consultas)]
+    tags = [(f"20-PIT-{i:05d}",) for i in ids]
+    sns = [(f"SN{i:07d}",) for i in ids]
+
+    # Cada medição grava valores novos: reescrever o mesmo valor não
+    # altera página nenhuma e o commit sai sem sincronizar o arquivo
+    def escritas(inicio):
+        return [(t[0], 0.0, inicio + i) for i, t in enumerate(tags[:args.escritas])]
+
+    def salvar_editor_referencia(tag, min_r, max_r):
+        for _ in range(3):
+            atualizar_range_referencia(tag, min_r, max_r)
+
+    colunas = []
+    erros = []
+
+    # Banco novo para cada modo: o journal WAL fica gravado no arquivo
+    for nome, wal in (("repositório (µs)", False), ("com WAL (µs)", True)):
+        with tempfile.TemporaryDirectory() as pasta:
+            popular(os.path.join(pasta, "instrumentos.db"), args.instrumentos)
+            repo = InstrumentRepository(wal=wal)
+
+            divergentes = [
+                t for t, s in zip(tags, sns)
+                if buscar_por_tag_referencia(*t) != repo.buscar_por_tag(*t)
+                or buscar_por_sn_referencia(*s) != repo.buscar_por_sn_instrumento(*s)
+            ]
+            if divergentes:
+                erros.append(f"{nome}: DIVERGENTE em {len(divergentes)} consultas, ex.: {divergentes[0]}")
+
+            def salvar_editor(tag, min_r, max_r):
+                with repo.transacao():
+                    for _ in range(3):
+                        repo.atualizar_range(tag, min_r, max_r)
+
+            colunas.append((nome, [
+                medir(repo.buscar_por_tag, tags),
+                medir(repo.buscar_por_sn_instrumento, sns),
+                medir(repo.atualizar_range, escritas(1000.0)),
+                medir(salvar_editor, escritas(2000.0)),
+            ]))
+
+            modo = repo.conexao().execute("PRAGMA journal_mode").fetchone()[0]
+            if modo != ("wal" if wal else "delete"):
+                erros.append(f"{nome}: journal {modo}")
+
+            if not wal:
+                anteriores = [
+                    medir(buscar_por_tag_referencia, tags),
+                    medir(buscar_por_sn_referencia, sns),
+                    medir(atualizar_range_referencia, escritas(3000.0)),
+                    medir(salvar_editor_referencia, escritas(4000.0)),
+                ]
+            repo.fechar()
+
+    operacoes = ("buscar por tag", "buscar por sn", "atualizar range", "3 escritas (editor)")
+    print(f"{'operação':<22} {'anterior (µs)':>14}" + "".join(f" {nome:>17} {'ganho':>7}" for nome, _ in colunas))
+    for i, operacao in enumerate(operacoes):
+        antes = anteriores[i]
+        print(f"{operacao:<22} {antes:14.1f}" + "".join(
+            f" {tempos[i]:17.1f} {antes / tempos[i]:6.1f}x" for _, tempos in colunas
+        ))
+
+    for erro in erros:
+        print(erro)
+    if erros:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
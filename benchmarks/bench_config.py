@@ -0,0 +1,216 @@
+"""
+Configuração compilada da validação (config.validacao).
+
+1. Sem arquivo, a configuração padrão classifica TAGs como a AC antes
+   da classificação única (prefixo/sufixo, TE > TT > PT) e reconhece
+   locais como regra_local_fpso anterior.
+2. Custo por certificado: reconhecer o local e classificar_tag antes
+   (dicionário montado e varrido a cada chamada) e com a configuração
+   compilada, e o custo de regra_local_fpso e de configuracao().
+3. Recarga: alterar o arquivo (nova instalação, limite mais rígido para
+   PT, novo código de TAG) vale sem reiniciar; um arquivo inválido
+   mantém a configuração anterior; um contexto já montado continua com
+   a configuração da sua validação; mudar os códigos de TAG muda a
+   versão do cache de extração.
+
+    python -m benchmarks.bench_config [--chamadas 50000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from pdf import cache, classificador
+from pdf.parser_certificados import normalizar_texto
+from config import validacao as config
+from validation.context import ValidationContext
+from validation.engine import ValidationEngine
+from validation.rules import regra_local_fpso
+
+
+# Verificação da AC antes da classificação única, como referência: TAG
+# sem código era DPT
+_CODIGOS_ANTIGOS = (
+    ("TE", ("TE",)),
+    ("TT", ("TT", "TIT", "TI")),
+    ("PT", ("PT", "PIT")),
+)
+
+
+def classificar_tag_antigo(tag):
+    if not tag:
+        return None
+    tag = tag.upper()
+    for tipo, codigos in _CODIGOS_ANTIGOS:
+        if (
+            tag.startswith(codigos) or
+            tag.endswith(tuple(f"-{c}" for c in codigos)) or
+            any(f"-{c}-" in tag for c in codigos)
+        ):
+            return tipo
+    return "DPT"
+
+
+def mesma_classificacao(tag):
+    antigo = classificar_tag_antigo(tag)
+    novo = classificador.classificar_tag(tag)
+    # Sem código na TAG, o texto do certificado decide
+    return novo == antigo or (antigo == "DPT" and novo is None)
+
+
+def local_antigo(local_pdf):
+    fpsos = {
+        "FPSO FRADE": ["FPSO", "FRADE"],
+        "FPSO FORTE": ["FPSO", "FORTE"],
+        "FPSO BRAVO": ["FPSO", "BRAVO"],
+        "POLVO": ["POLVO"]
+    }
+    for nome, palavras in fpsos.items():
+        if all(p in local_pdf for p in palavras):
+            return True
+    return False
+
+
+LOCAIS = (
+    "FPSO Forte - Macaé", "FPSO FRADE", "Polvo", "FPSO Bravo", "Plataforma X",
+    "Frade", "fpso   forte", "POLVO A", "Bacia de Campos - FPSO Frade", "",
+)
+
+
+def gerar_tag(sorteio):
+    partes = [str(sorteio.randrange(10, 30))]
+    partes += [sorteio.choice(("PIT", "TIT", "PDIT", "TE", "FT", "LIT", "TI", "PITX", "1TE", "DPT"))]
+    partes += [f"{sorteio.randrange(10000):04d}"]
+    if sorteio.random() < 0.3:
+        partes.append(sorteio.choice(("A", "B", "TE", "TT")))
+    return sorteio.choice(("-", " - ", "-")).join(partes)
+
+
+def contexto(dados):
+    return ValidationContext(dados, None, None, None, None)
+
+
+def por_chamada(funcao, argumentos):
+    inicio = time.perf_counter()
+    for arg in argumentos:
+        funcao(arg)
+    return (time.perf_counter() - inicio) / len(argumentos) * 1e6
+
+
+def escrever(caminho, dados):
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f)
+    # Garante data de modificação diferente mesmo em sistemas de arquivos
+    # com resolução baixa
+    agora = time.time_ns() + random.randrange(1, 10 ** 9)
+    os.utime(caminho, ns=(agora, agora))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chamadas", type=int, default=50000)
+    args = parser.parse_args()
+
+    sorteio = random.Random(25)
+    erros = []
+    caminho_original = config.caminho_config
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "config_validacao.json")
+        config.caminho_config = caminho
+        padrao = config.recarregar()
+
+        # 1. Padrão igual ao código anterior
+        tags = [gerar_tag(sorteio) for _ in range(args.chamadas)]
+        diferentes = [t for t in set(tags) if not mesma_classificacao(t)]
+        if diferentes:
+            erros.append(f"classificar_tag difere do código anterior: {diferentes[:5]}")
+
+        for local in LOCAIS:
+            normalizado = normalizar_texto(local) or ""
+            if bool(normalizado and padrao.instalacao(normalizado)) != (bool(normalizado) and local_antigo(normalizado)):
+                erros.append(f"local {local!r} reconhecido de forma diferente do código anterior")
+
+        # 2. Custo por certificado
+        contextos = [contexto({"tag": "20-PIT-0001", "local": sorteio.choice(LOCAIS)}) for _ in range(args.chamadas)]
+        locais = [ctx.cert.local_normalizado for ctx in contextos]
+        print(f"{'':26s} {'antes':>9s} {'compilada':>10s}  (µs/chamada)")
+        print(f"{'local reconhecido':26s} {por_chamada(lambda l: l and local_antigo(l), locais):9.3f} "
+              f"{por_chamada(lambda l: l and padrao.instalacao(l), locais):10.3f}")
+        print(f"{'regra_local_fpso':26s} {'':9s} {por_chamada(regra_local_fpso, contextos):10.3f}")
+        print(f"{'classificar_tag':26s} {por_chamada(classificar_tag_antigo, tags):9.3f} "
+              f"{por_chamada(classificador.classificar_tag, tags):10.3f}")
+        print(f"{'configuracao()':26s} {'':9s} {por_chamada(lambda _: config.configuracao(), tags):10.3f}")
+
+        # 3. Recarga
+        engine = ValidationEngine()
+        certificado = {
+            "tag": "20-PIT-0001", "local": "FPSO Peregrino", "tipo": "PT",
+            "incerteza": 0.07, "erro_fid": 0.02,
+        }
+        antes = contexto(dict(certificado))
+        chaves_antes = {i.key for i in engine.run(antes)}
+        if "local_invalido" not in chaves_antes or "incert_fiducial" in chaves_antes:
+            erros.append(f"padrão: esperado só local_invalido, obtido {chaves_antes}")
+
+        versao_antes = cache.versao_cache()
+        escrever(caminho, {
+            "instalacoes": {**config.PADRAO["instalacoes"], "FPSO PEREGRINO": ["PEREGRINO"]},
+            "limites": {"por_tipo": {"PT": {"incerteza": 0.05}}},
+            "codigos_tag": {**config.PADRAO["codigos_tag"], "FT": "PT"},
+        })
+
+        config.INTERVALO_VERIFICACAO = 3600
+        if config.configuracao() is not padrao:
+            erros.append("configuração recarregada antes do intervalo de verificação")
+
+        config.INTERVALO_VERIFICACAO = 0
+        inicio = time.perf_counter()
+        nova = config.configuracao()
+        print(f"\nrecarga do arquivo: {(time.perf_counter() - inicio) * 1000:.2f} ms")
+        config.INTERVALO_VERIFICACAO = 2.0
+
+        depois = contexto(dict(certificado))
+        chaves_depois = {i.key for i in engine.run(depois)}
+        if nova is padrao:
+            erros.append("arquivo alterado não foi recarregado")
+        if "local_invalido" in chaves_depois or "incert_fiducial" not in chaves_depois:
+            erros.append(f"após a recarga: esperado só incert_fiducial, obtido {chaves_depois}")
+        if "Incerteza acima de 0.05%" not in next((i.message for i in engine.run(depois) if i.key == "incert_fiducial"), ""):
+            erros.append("mensagem não traz o limite do tipo")
+        if nova.limites("TE").incerteza != 0.1 or nova.limites("PT").erro_fiducial != 0.1:
+            erros.append("limites não alterados no arquivo deveriam manter o padrão")
+        if classificador.classificar_tag("21-FT-0001") != "PT":
+            erros.append("novo código de TAG não reconhecido")
+        if cache.versao_cache() == versao_antes:
+            erros.append("versão do cache de extração não mudou com os códigos de TAG")
+        if {i.key for i in engine.run(antes)} != chaves_antes:
+            erros.append("contexto montado antes da recarga mudou de configuração")
+
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write("{ inválido")
+        if config.recarregar() is not nova:
+            erros.append("arquivo inválido substituiu a configuração em uso")
+
+        escrever(caminho, {"limites": {"incerteza": "alta"}})
+        if config.recarregar() is not nova:
+            erros.append("limite inválido substituiu a configuração em uso")
+
+        os.remove(caminho)
+        if config.recarregar().instalacoes != padrao.instalacoes:
+            erros.append("sem o arquivo, a configuração deveria voltar ao padrão")
+
+    config.caminho_config = caminho_original
+    config.recarregar()
+
+    for erro in erros:
+        print(f"ERRO: {erro}")
+    print("ok" if not erros else f"{len(erros)} erro(s)")
+    sys.exit(1 if erros else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Histórico de calibrações (data.historico) contra a releitura do PDF.
+
+Registra N certificados sintéticos (várias calibrações por TAG) e mede:
+
+- releitura: abrir o PDF e extrair campos e pontos, o que era necessário
+  para comparar com uma calibração anterior;
+- ultima_calibracao(tag, antes_de): a calibração anterior, com pontos;
+- buscar_calibracoes(tag): o histórico completo da TAG.
+
+Confere também que campos e pontos lidos do banco são os gravados.
+
+    python -m benchmarks.bench_historico [--certificados 5000] [--consultas 500]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.sintetico import gerar_certificado
+from data import conexao
+from data.conexao import criar_tabela
+from data.historico import buscar_calibracoes, registrar_calibracao, ultima_calibracao
+from data.repositorio import repositorio
+from pdf.documento import CertificateDocument
+from pdf.extrator import extrair_campos_pdf
+from xml_model.xml_extractor import extrair_pontos_calibracao_pdf
+
+
+def mediana_ms(funcao, argumentos):
+    tempos = []
+    for args in argumentos:
+        inicio = time.perf_counter()
+        funcao(*args)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def reler(pdf_bytes):
+    with CertificateDocument(pdf_bytes) as doc:
+        dados = extrair_campos_pdf(doc)
+        return dados, extrair_pontos_calibracao_pdf(doc, dados["tipo"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--certificados", type=int, default=5000)
+    parser.add_argument("--consultas", type=int, default=500)
+    args = parser.parse_args()
+
+    sorteio = random.Random(3)
+    pdf_bytes = gerar_certificado("PT", n_pontos=10)
+    dados, pontos = reler(pdf_bytes)
+    n_tags = max(1, args.certificados // 5)
+    erros = []
+
+    with tempfile.TemporaryDirectory() as pasta:
+        conexao.db_path = os.path.join(pasta, "instrumentos.db")
+        criar_tabela()
+
+        inicio = time.perf_counter()
+        with repositorio.transacao():
+            for i in range(args.certificados):
+                registro = dict(
+                    dados,
+                    tag=f"20-PIT-{i % n_tags:05d}",
+                    certificado=f"{i}/2025",
+                    data=f"{i % 28 + 1:02d}/{i // n_tags % 12 + 1:02d}/2025"
+                )
+                registrar_calibracao(registro, pontos, "sintetico.pdf")
+        gravacao = (time.perf_counter() - inicio) * 1000 / args.certificados
+
+        tags = [(f"20-PIT-{sorteio.randrange(n_tags):05d}",) for _ in range(args.consultas)]
+        releitura = mediana_ms(reler, [(pdf_bytes,)] * min(args.consultas, 20))
+        anterior = mediana_ms(ultima_calibracao, [(t, "31/12/2025") for (t,) in tags])
+        historico = mediana_ms(buscar_calibracoes, tags)
+
+        print(f"{args.certificados} certificados, {n_tags} TAGs (gravação {gravacao:.3f} ms/certificado)")
+        print(f"releitura do PDF            {releitura:9.3f} ms")
+        print(f"ultima_calibracao(antes_de) {anterior:9.3f} ms  {releitura / anterior:8.0f}x")
+        print(f"buscar_calibracoes(tag)     {historico:9.3f} ms  {releitura / historico:8.0f}x")
+
+        ultima = ultima_calibracao("20-PIT-00000")
+        todas = buscar_calibracoes(tag="20-PIT-00000", com_pontos=True)
+        if [{k: p[k] for k in ultima["pontos"][0]} for p in pontos] != ultima["pontos"]:
+            erros.append("pontos lidos do histórico diferem dos gravados")
+        if ultima["erro_fid"] != dados["erro_fid"] or ultima["sn_instrumento"] != dados["sn_instrumento"]:
+            erros.append("campos lidos do histórico diferem dos gravados")
+        if [c["data_calibracao"] for c in todas] != sorted((c["data_calibracao"] for c in todas), reverse=True):
+            erros.append("histórico fora de ordem de data")
+        if todas[0]["id"] != ultima["id"]:
+            erros.append("ultima_calibracao não é a primeira de buscar_calibracoes")
+
+        antes = ultima_calibracao("20-PIT-00000", antes_de=ultima["data_calibracao"], com_pontos=False)
+        if antes is not None and antes["data_calibracao"] >= ultima["data_calibracao"]:
+            erros.append("calibração anterior não é anterior")
+
+        registrar_calibracao(dict(dados, tag="20-PIT-00000", certificado="0/2025", data="01/01/2025"), pontos[:2])
+        if len(buscar_calibracoes(tag="20-PIT-00000")) != len(todas):
+            erros.append("reprocessar o certificado criou outro registro")
+
+        repositorio.fechar()
+
+    for erro in erros:
+        print(f"ERRO: {erro}")
+    sys.exit(1 if erros else 0)
+
+
+if __name__ == "__main__":
+    main()
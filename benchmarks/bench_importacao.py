@@ -0,0 +1,128 @@
+"""
+Importação do cadastro (data.importacao) contra a inserção linha a linha
+de data.utils_db, e conferência do formato de ida e volta.
+
+1. Tempo para carregar N instrumentos de um CSV: upsert em lotes numa
+   transação contra um inserir_instrumento (um commit) por linha.
+2. Reimportação do mesmo arquivo: tudo atualizado, nada inserido.
+3. Conflitos: SN de outra TAG fora da família MVS é recusado; mesma
+   família é aceito.
+4. Exportação em CSV e XLSX e reimportação num banco vazio: a tabela
+   resultante precisa ser igual.
+
+    python -m benchmarks.bench_importacao [--instrumentos 20000]
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from data import conexao, utils_db
+from data.conexao import criar_tabela
+from data.importacao import COLUNAS, exportar_instrumentos, importar_instrumentos
+from data.repositorio import repositorio
+
+
+def escrever_csv(caminho, linhas):
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f, delimiter=";")
+        escritor.writerow(COLUNAS)
+        escritor.writerows(linhas)
+
+
+def gerar_linhas(n):
+    return [
+        (f"20-PIT-{i // 3:05d}-{chr(65 + i % 3)}", f"SN{i // 3:07d}", f"S{i:06d}", "0", f"{1000 + i % 500},5")
+        for i in range(n)
+    ]
+
+
+def novo_banco(pasta, nome):
+    repositorio.fechar()
+    conexao.db_path = os.path.join(pasta, nome)
+    criar_tabela()
+    return conexao.db_path
+
+
+def tabela(caminho):
+    conn = sqlite3.connect(caminho)
+    linhas = conn.execute(
+        "SELECT tag, sn_instrumento, sn_sensor, min_range, max_range FROM instrumentos ORDER BY tag"
+    ).fetchall()
+    conn.close()
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instrumentos", type=int, default=20000)
+    args = parser.parse_args()
+
+    n = args.instrumentos
+    erros = []
+
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = os.path.join(pasta, "cadastro.csv")
+        linhas = gerar_linhas(n)
+        escrever_csv(arquivo, linhas)
+
+        novo_banco(pasta, "linha_a_linha.db")
+        inicio = time.perf_counter()
+        for tag, sn, sensor, min_r, max_r in linhas:
+            utils_db.inserir_instrumento(tag, sn, sensor, float(min_r), float(max_r.replace(",", ".")))
+        linha_a_linha = time.perf_counter() - inicio
+
+        caminho = novo_banco(pasta, "importado.db")
+        inicio = time.perf_counter()
+        relatorio = importar_instrumentos(arquivo)
+        importacao = time.perf_counter() - inicio
+        print(f"{n} instrumentos  linha a linha {linha_a_linha:7.2f} s  importação {importacao:7.2f} s  {linha_a_linha / importacao:6.1f}x")
+
+        if relatorio["inseridas"] != n or relatorio["conflitos"] or relatorio["invalidas"]:
+            erros.append(f"importação inicial: {relatorio['inseridas']} inseridas, {len(relatorio['conflitos'])} conflitos")
+        if tabela(caminho) != tabela(os.path.join(pasta, "linha_a_linha.db")):
+            erros.append("importação difere da inserção linha a linha")
+
+        relatorio = importar_instrumentos(arquivo)
+        if relatorio["atualizadas"] != n or relatorio["inseridas"]:
+            erros.append(f"reimportação: {relatorio['inseridas']} inseridas, {relatorio['atualizadas']} atualizadas")
+
+        conflitos = os.path.join(pasta, "conflitos.csv")
+        escrever_csv(conflitos, [
+            ("20-PIT-00000-D", "SN0000000", "", "", ""),     # mesma família MVS
+            ("30-TT-99999-A", "SN0000001", "", "", ""),      # SN de outra família
+            ("", "SN9", "", "", ""),                         # sem TAG
+            ("30-TT-99999-B", "SN9", "", "", "abc"),         # range inválido
+        ])
+        relatorio = importar_instrumentos(conflitos)
+        resumo = (relatorio["inseridas"], len(relatorio["conflitos"]), len(relatorio["invalidas"]))
+        print(f"conflitos: {resumo[0]} inserida, {resumo[1]} conflito, {resumo[2]} inválidas")
+        if resumo != (1, 1, 2):
+            erros.append(f"conflitos: esperado (1, 1, 2), obtido {resumo}")
+
+        esperado = tabela(caminho)
+        for extensao in ("csv", "xlsx"):
+            saida = os.path.join(pasta, f"exportado.{extensao}")
+            inicio = time.perf_counter()
+            total = exportar_instrumentos(saida)
+            exportacao = time.perf_counter() - inicio
+
+            copia = novo_banco(pasta, f"copia_{extensao}.db")
+            importar_instrumentos(saida)
+            print(f"exportação {extensao:<4} {total} instrumentos em {exportacao:5.2f} s, reimportação {'igual' if tabela(copia) == esperado else 'DIFERENTE'}")
+            if tabela(copia) != esperado:
+                erros.append(f"ida e volta {extensao} difere do banco original")
+            conexao.db_path = caminho
+
+        repositorio.fechar()
+
+    for erro in erros:
+        print(f"ERRO: {erro}")
+    sys.exit(1 if erros else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Índice de instrumentos em memória (data.indice) contra consultas ao
+SQLite, e conferência de consistência do write-through.
+
+1. Latência de resolver_instrumento com e sem o índice.
+2. Sequência aleatória de ações de validação (inserir, atualizar TAG,
+   SN, SN do sensor, range; avulsas e em transação, inclusive com
+   rollback e escritas recusadas pelo índice único de TAG) pelas funções
+   de data.utils_db. Após cada uma, o índice
+   precisa ser idêntico à tabela e resolver as mesmas chaves que o SQL.
+
+    python -m benchmarks.bench_indice [--instrumentos 5000] [--acoes 300]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from data import conexao, utils_db
+from data.conexao import criar_tabela
+from data.repositorio import repositorio
+
+
+def popular(caminho, n, sorteio):
+    conexao.db_path = caminho
+    criar_tabela()
+    linhas = []
+    for i in range(n):
+        familia = i // 3
+        # Membros da mesma família MVS compartilham o SN do instrumento
+        linhas.append((
+            f"20-FT-{familia:05d}-{chr(65 + i % 3)}",
+            f"SN{familia:06d}",
+            f"S{sorteio.randrange(n):06d}" if sorteio.random() < 0.7 else None,
+            0.0,
+            float(sorteio.randrange(100, 5000))
+        ))
+    conn = sqlite3.connect(caminho)
+    conn.executemany(
+        "INSERT INTO instrumentos (tag, sn_instrumento, sn_sensor, min_range, max_range) VALUES (?, ?, ?, ?, ?)",
+        linhas
+    )
+    conn.commit()
+    conn.close()
+
+
+def chave_aleatoria(sorteio, n):
+    familia = sorteio.randrange(n // 3 + 10)
+    return (
+        f"20-FT-{familia:05d}-{chr(65 + sorteio.randrange(4))}",
+        sorteio.choice([f"SN{sorteio.randrange(n // 3 + 10):06d}", None]),
+        sorteio.choice([f"S{sorteio.randrange(n):06d}", None])
+    )
+
+
+def _resolucao(r):
+    return r.exato, r.mesmo_sn, r.mesmo_sensor, r.familia_mvs
+
+
+def medir(chaves):
+    tempos = []
+    for chave in chaves:
+        inicio = time.perf_counter()
+        utils_db.resolver_instrumento(*chave)
+        tempos.append((time.perf_counter() - inicio) * 1e6)
+    return statistics.median(tempos)
+
+
+def acao_aleatoria(sorteio, n):
+    tag, sn, sensor = chave_aleatoria(sorteio, n)
+    sn = sn or f"SN{sorteio.randrange(n):06d}"
+    escolha = sorteio.randrange(5)
+
+    if escolha == 0:
+        tag = f"20-FT-{sorteio.randrange(10 ** 6, 2 * 10 ** 6)}-N"
+        return "inserir", lambda: utils_db.inserir_instrumento(tag, sn, sensor, 0, 1000)
+    if escolha == 1:
+        nova = f"20-FT-{sorteio.randrange(10 ** 6, 2 * 10 ** 6)}-T"
+        return "atualizar_tag", lambda: utils_db.atualizar_tag(tag, nova)
+    if escolha == 2:
+        return "atualizar_sn", lambda: utils_db.atualizar_sn(tag, f"SN{sorteio.randrange(n):06d}")
+    if escolha == 3:
+        return "atualizar_sn_sensor", lambda: utils_db.atualizar_sn_sensor(tag, sensor)
+    return "atualizar_range", lambda: utils_db.atualizar_range(tag, 0.0, float(sorteio.randrange(100, 5000)))
+
+
+def executar_acao(sorteio, n):
+    modo = sorteio.randrange(3)
+    nomes = []
+
+    if modo == 0:
+        nome, acao = acao_aleatoria(sorteio, n)
+        try:
+            acao()
+        except sqlite3.IntegrityError:
+            return f"{nome} recusada pelo banco"
+        return nome
+
+    try:
+        with utils_db.transacao():
+            for _ in range(3):
+                nome, acao = acao_aleatoria(sorteio, n)
+                acao()
+                nomes.append(nome)
+            if modo == 2:
+                raise RuntimeError("rollback")
+    except (RuntimeError, sqlite3.IntegrityError):
+        return "rollback(" + ", ".join(nomes) + ")"
+
+    return "transacao(" + ", ".join(nomes) + ")"
+
+
+def conferir(sorteio, n, conn):
+    tabela = conn.execute(
+        "SELECT id, tag, sn_instrumento, sn_sensor, min_range, max_range FROM instrumentos ORDER BY id"
+    ).fetchall()
+    if repositorio.indice.linhas() != tabela:
+        return "linhas diferentes da tabela"
+
+    indice = repositorio.indice
+    for _ in range(20):
+        chave = chave_aleatoria(sorteio, n)
+        repositorio.indice = None
+        sql = utils_db.resolver_instrumento(*chave)
+        repositorio.indice = indice
+        if _resolucao(sql) != _resolucao(indice.resolver(*chave)):
+            return f"resolução diferente para {chave}"
+
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instrumentos", type=int, default=5000)
+    parser.add_argument("--consultas", type=int, default=2000)
+    parser.add_argument("--acoes", type=int, default=300)
+    args = parser.parse_args()
+
+    sorteio = random.Random(7)
+    n = args.instrumentos
+    erro = None
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "instrumentos.db")
+        popular(caminho, n, sorteio)
+
+        chaves = [chave_aleatoria(sorteio, n) for _ in range(args.consultas)]
+        sem_indice = medir(chaves)
+
+        inicio = time.perf_counter()
+        repositorio.usar_indice()
+        carga = (time.perf_counter() - inicio) * 1000
+        com_indice = medir(chaves)
+
+        print(f"carga do índice ({n} instrumentos): {carga:.1f} ms")
+        print(f"resolver_instrumento  SQLite {sem_indice:8.1f} µs  índice {com_indice:8.1f} µs  {sem_indice / com_indice:6.1f}x")
+
+        conn = sqlite3.connect(caminho)
+        for i in range(args.acoes):
+            nome = executar_acao(sorteio, n)
+            erro = conferir(sorteio, n, conn)
+            if erro:
+                print(f"INCONSISTENTE após ação {i} ({nome}): {erro}")
+                break
+        else:
+            print(f"{args.acoes} ações aplicadas: índice consistente com o banco")
+        conn.close()
+
+        repositorio.descartar_indice()
+        repositorio.fechar()
+
+    sys.exit(1 if erro else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Travamentos do loop da interface durante o processamento de certificados.
+
+Simula o loop do Tk sem janela: a thread principal acorda a cada
+INTERVALO_MS (como o after da App), despacha as mensagens do
+ControladorPipeline e registra o atraso de cada volta. O pipeline é o da
+interface (gui.controlador): leitura e validação, confirmação de todas as
+divergências na thread principal e geração. A exportação pelo Excel
+(Windows) é substituída pelo preenchimento da AC, sem salvar.
+
+Compara com as mesmas etapas executadas na própria thread do loop, como
+antes do controlador. Encerra com código 1 se algum certificado falhar
+(o tempo de um pipeline que termina em erro não vale como medida) ou se
+algum atraso com o controlador passar de --limite-ms.
+
+    python -m benchmarks.bench_interface [--certificados 10] [--paginas-extra 20] [--limite-ms 50]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.sintetico import TIPOS, gerar_certificado
+from data import conexao
+from data.conexao import criar_tabela
+from data.historico import registrar_calibracao
+from data.repositorio import repositorio
+from data.unidade_trabalho import UnidadeDeTrabalho
+from gui.controlador import INTERVALO_MS, ControladorPipeline, analisar_certificado
+from pdf import cache
+from xml_model.xml_generator import gerar_xml_calibracao
+
+
+# Template da AC do repositório, para rodar de qualquer diretório
+TEMPLATE = str(Path(__file__).resolve().parent.parent / "TemplateAC.xlsx")
+
+
+def gerar_sem_excel(analise, unidade, progresso=None):
+    from form.utils_print import preencher_ac
+
+    with unidade.confirmar():
+        preencher_ac(analise.dados_pdf, TEMPLATE)
+        caminho_xml = Path(analise.caminho).with_suffix(".xml")
+        unidade.registrar_arquivo(caminho_xml)
+        gerar_xml_calibracao(analise.dados_pdf, analise.pontos, str(caminho_xml))
+        unidade.registrar(lambda: registrar_calibracao(analise.dados_pdf, analise.pontos, analise.caminho))
+    return analise
+
+
+def aprovar_tudo(analise):
+    unidade = UnidadeDeTrabalho(analise.dados_pdf)
+    for issue in analise.issues:
+        if issue.action:
+            unidade.registrar(issue.action, issue.marca)
+    return unidade
+
+
+def com_controlador(arquivos):
+    controlador = ControladorPipeline()
+    pendentes = list(arquivos)
+    estado = {"concluidos": 0, "erros": 0}
+
+    def proximo(_=None):
+        if pendentes:
+            controlador.executar(analisar_certificado, pendentes.pop(0), controlador.progresso, depois=confirmar, erro=falhou)
+
+    def confirmar(analise):
+        controlador.executar(gerar_sem_excel, analise, aprovar_tudo(analise), depois=concluido, erro=falhou)
+
+    def concluido(_):
+        estado["concluidos"] += 1
+        proximo()
+
+    def falhou(e):
+        estado["erros"] += 1
+        proximo()
+
+    atrasos = []
+    proximo()
+    anterior = time.perf_counter()
+    inicio = anterior
+    while estado["concluidos"] + estado["erros"] < len(arquivos):
+        time.sleep(INTERVALO_MS / 1000)
+        agora = time.perf_counter()
+        atrasos.append((agora - anterior) * 1000 - INTERVALO_MS)
+        anterior = agora
+        controlador.processar_mensagens()
+
+    controlador.encerrar()
+    return max(atrasos), time.perf_counter() - inicio, estado["erros"]
+
+
+def na_thread_do_loop(arquivos):
+    atrasos = []
+    erros = 0
+    inicio = time.perf_counter()
+    for arquivo in arquivos:
+        anterior = time.perf_counter()
+        try:
+            analise = analisar_certificado(arquivo)
+            gerar_sem_excel(analise, aprovar_tudo(analise))
+        except Exception:
+            erros += 1
+        atrasos.append((time.perf_counter() - anterior) * 1000)
+    return max(atrasos), time.perf_counter() - inicio, erros
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--certificados", type=int, default=10)
+    parser.add_argument("--paginas-extra", type=int, default=20)
+    parser.add_argument("--limite-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        resultados = {}
+        falhas = {}
+        for modo, executar in (("thread do loop", na_thread_do_loop), ("controlador", com_controlador)):
+            # Os certificados sintéticos repetem TAG e SN: banco novo a cada
+            # modo para que os dois façam as mesmas correções
+            conexao.db_path = os.path.join(pasta, f"instrumentos_{len(resultados)}.db")
+            criar_tabela()
+            # Cache de extração vazio e certificados novos a cada modo
+            cache.cache_path = os.path.join(pasta, f"cache_{len(resultados)}.db")
+            arquivos = []
+            for i in range(args.certificados):
+                caminho = os.path.join(pasta, f"{modo.replace(' ', '_')}_{i}.pdf")
+                with open(caminho, "wb") as f:
+                    f.write(gerar_certificado(TIPOS[i % len(TIPOS)], paginas_extra=args.paginas_extra))
+                arquivos.append(caminho)
+
+            atraso, total, erros = executar(arquivos)
+            resultados[modo] = atraso
+            falhas[modo] = erros
+            print(f"{modo:<15} maior travamento {atraso:8.1f} ms  total {total:6.2f} s  erros {erros}")
+
+        repositorio.fechar()
+
+    ok = resultados["controlador"] <= args.limite_ms
+    print(f"limite {args.limite_ms:.0f} ms: {'ok' if ok else 'EXCEDIDO'}")
+    for modo, erros in falhas.items():
+        if erros:
+            print(f"ERRO: {erros} de {args.certificados} certificados falharam ({modo})")
+    sys.exit(0 if ok and not any(falhas.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Pico de memória (tracemalloc) da extração completa de um certificado
+(campos + pontos de calibração) em função do número de páginas.
+
+Com a leitura página a página de CertificateDocument.iterar_paginas, o
+layout do pdfplumber de cada página é descartado após o uso e o pico
+deve ficar praticamente constante; só o texto guardado cresce (alguns
+kB por página). --sem-liberar repete a medição mantendo o layout de
+todas as páginas, para comparação.
+
+    python -m benchmarks.bench_memoria [--paginas-extra 0 10 40] [--sem-liberar]
+
+Sai com código 1 se o crescimento do pico por página adicional passar
+de --limite-kb.
+"""
+import argparse
+import sys
+import tracemalloc
+
+from benchmarks.sintetico import gerar_certificado
+from pdf.documento import CertificateDocument
+from pdf.extrator import BACKENDS, extrair_campos_pdf
+from xml_model.xml_extractor import extrair_pontos_calibracao_pdf
+
+
+# Crescimento máximo aceito do pico, em kB por página adicional
+LIMITE_KB_POR_PAGINA = 128
+
+
+def medir_pico(pdf_bytes, backend):
+    tracemalloc.start()
+    try:
+        with CertificateDocument(pdf_bytes) as doc:
+            dados = extrair_campos_pdf(doc, backend)
+            extrair_pontos_calibracao_pdf(doc, dados["tipo"])
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def medir(paginas_extra, tipo, liberar=True):
+    """
+    Retorna {backend: [(paginas, pico_bytes), ...]}.
+    """
+    original = CertificateDocument.liberar_pagina
+    if not liberar:
+        CertificateDocument.liberar_pagina = lambda self, indice: None
+
+    try:
+        resultados = {}
+        for nome, backend in BACKENDS.items():
+            resultados[nome] = []
+            for extra in paginas_extra:
+                pico = medir_pico(gerar_certificado(tipo, paginas_extra=extra), backend)
+                resultados[nome].append((extra + 2, pico))
+                print(f"{nome:<11} {extra + 2:>4} páginas  pico {pico / 1e6:8.2f} MB")
+        return resultados
+    finally:
+        CertificateDocument.liberar_pagina = original
+
+
+def crescimento_por_pagina(medidas):
+    """
+    kB de pico a mais por página, entre o menor e o maior certificado
+    com páginas complementares (o primeiro ponto, sem elas, tem páginas
+    menos densas e distorceria a inclinação).
+    """
+    medidas = sorted(medidas)
+    if len(medidas) > 2:
+        medidas = medidas[1:]
+    (p0, m0), (p1, m1) = medidas[0], medidas[-1]
+    if p1 == p0:
+        return 0.0
+    return (m1 - m0) / (p1 - p0) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paginas-extra", type=int, nargs="+", default=[0, 10, 40])
+    parser.add_argument("--tipo", default="PT")
+    parser.add_argument("--sem-liberar", action="store_true", help="Mede também sem liberar o layout das páginas")
+    parser.add_argument("--limite-kb", type=float, default=LIMITE_KB_POR_PAGINA)
+    args = parser.parse_args()
+
+    ok = True
+
+    print("Com liberação do layout por página")
+    for nome, medidas in medir(args.paginas_extra, args.tipo).items():
+        kb = crescimento_por_pagina(medidas)
+        situacao = "OK" if kb <= args.limite_kb else "ACIMA DO LIMITE"
+        print(f"  {nome}: {kb:.1f} kB/página  {situacao}")
+        ok &= kb <= args.limite_kb
+
+    if args.sem_liberar:
+        print("\nSem liberação (layout de todas as páginas mantido)")
+        for nome, medidas in medir(args.paginas_extra, args.tipo, liberar=False).items():
+            print(f"  {nome}: {crescimento_por_pagina(medidas):.1f} kB/página")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
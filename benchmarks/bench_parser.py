@@ -0,0 +1,177 @@
+"""
+Benchmark de pdf.parser_certificados.extrair_campos em certificados
+grandes (texto sintético com N páginas).
+
+Compara com a implementação anterior (uma re.search/re.findall sem
+pré-compilação por campo, sobre o texto inteiro) e confere que os dois
+retornam exatamente o mesmo dicionário.
+
+    python -m benchmarks.bench_parser [--paginas 1 10 50 100] [--repeticoes 20]
+"""
+import argparse
+import re
+import time
+
+from pdf.parser_certificados import extrair_campos, normalizar_num
+
+
+CABECALHO = """CALIBRATION CERTIFICATE
+Nº 1234/2025 - PT
+CLIENT INFORMATION
+Name: ODS Metering Systems
+CALIBRATION LOCATION:
+Name: FPSO FORTE
+Address: Bacia de Campos
+CALIBRATED ITEM DESCRIPTION
+System Description: Sistema de Medicao de Gas
+Combustivel Fiscal
+Periodicity: 12 months
+TAG: 20-PIT-1001
+Item: Pressure Transmitter
+SN: 7712345
+Num. de Série: S99881
+Calibration Date: 10/01/2025
+Report Date: 12/01/2025
+Calibration Range
+Min: 0,00 Max: 2500,00
+Indication Range
+Min: 0,00 Max: 3000,00
+LOCAL ENVIRONMENTAL CONDITIONS
+Temperature: 23 C"""
+
+PAGINA_EXTRA = "\n".join(
+    f"Padrao PRS-{i} rastreavel RBC, certificado de referencia {i} valido ate 2026"
+    for i in range(40)
+)
+
+RESULTADOS = """CALIBRATION RESULTS
+Reference Mean mA DC Mean kPa Tendency Uncertainty k
+0,0 4,0000 0,0 0,1/0,01 0,2/0,02 2,00
+1250,0 12,0000 1250,0 0,1/0,01 0,2/0,02 2,00
+2500,0 20,0000 2500,0 0,1/0,01 0,2/0,02 2,00
+Metrological characteristics
+Repeatability Hysteresis Fiducial Error Uncertainty
+Repetibilidade Histerese Erro Fiducial Incerteza
+0,010 % 0,020 % 0,050 % 0,060 %
+Calibration curve: y = 4,000 + 0,0064 . x"""
+
+
+def gerar_texto(paginas):
+    return "\n".join([CABECALHO] + [PAGINA_EXTRA] * (paginas - 1) + [RESULTADOS])
+
+
+def extrair_campos_referencia(texto):
+    """Implementação anterior, mantida apenas como referência."""
+    m = re.search(r"TAG:\s*([0-9A-Za-z]+(?:\s*[-‐‒–—―]\s*[0-9A-Za-z]+)+)", texto)
+    tag = None
+    if m:
+        tag = m.group(1)
+        for c in "‐‒–—―":
+            tag = tag.replace(c, "-")
+        tag = re.sub(r"\s*-\s*", "-", tag).strip()
+
+    encontrados = re.findall(r"(?:SN|Num\.?\s*de\s*Série):\s*([^\s]+)", texto, flags=re.IGNORECASE)
+    sns = [s for s in encontrados if any(c.isdigit() for c in s)]
+
+    m = re.search(r"Nº\s*([^\n]+)", texto)
+    certificado = m.group(1).strip() if m else None
+
+    m_cal = re.search(r"(Calibration Date|Data da Calibração):\s*([0-9]{2}/[0-9]{2}/[0-9]{4})", texto, flags=re.IGNORECASE)
+    m_rep = re.search(r"(Report Date|Data do Relatório):\s*([0-9]{2}/[0-9]{2}/[0-9]{4})", texto, flags=re.IGNORECASE)
+
+    local = None
+    bloco = re.search(
+        r"CALIBRATION LOCATION:(.*?)(?:CALIBRATED ITEM DESCRIPTION|CLIENT INFORMATION|$)",
+        texto, flags=re.DOTALL | re.IGNORECASE
+    )
+    if bloco:
+        m = re.search(r"(Name|Address|Nome|Endereço):\s*([A-Za-z0-9 \-_/]+)", bloco.group(1), flags=re.IGNORECASE)
+        local = m.group(2).strip() if m else None
+
+    sistema = None
+    m = re.search(
+        r"(?:System Description|Descrição do Sistema):\s*([\s\S]+?)"
+        r"(?=\n(?:Name:|Address:|Calibrated|Classification|Classificação|"
+        r"Periodicidade|Periodicity|Next Calibration|Próxima Calibração|"
+        r"LOCAL ENVIRONMENTAL|REFERENCE STANDARDS|ITEM|TAG|SN))",
+        texto, flags=re.DOTALL | re.IGNORECASE
+    )
+    if m:
+        sistema = re.sub(r"\s+", " ", m.group(1)).strip()
+        sistema = re.sub(r"\b(Periodicity|Periodicidade)\b.*$", "", sistema, flags=re.IGNORECASE).strip()
+
+    def faixa(rotulo):
+        padrao = rotulo + r"""\s*Range.*?
+        Min\s*[:\-]?\s*([-+]?[0-9.,]+)
+        .*?
+        Max\s*[:\-]?\s*([-+]?[0-9.,]+)
+        """
+        m = re.search(padrao, texto, flags=re.I | re.S | re.VERBOSE)
+        return (normalizar_num(m.group(1)), normalizar_num(m.group(2))) if m else (None, None)
+
+    rod = re.search(r"Rod length:\s*([\d,.]+)", texto, flags=re.IGNORECASE)
+    probe = re.search(r"Probe diameter:\s*([\d,.]+)", texto, flags=re.IGNORECASE)
+
+    m = re.search(r"""
+        Metrological\ characteristics.*?Repeatability.*?Uncertainty.*?\n.*?\n\s*
+        ([-+]?\d+[.,]\d+)\s*%?\s+([-+]?\d+[.,]\d+)\s*%?\s+
+        ([-+]?\d+[.,]\d+)\s*%?\s+([-+]?\d+[.,]\d+)\s*%?
+        """, texto, flags=re.IGNORECASE | re.DOTALL | re.VERBOSE)
+    erro_fid, incerteza = (normalizar_num(m.group(3)), normalizar_num(m.group(4))) if m else (None, None)
+
+    curva = None
+    m = re.search(r"Y\s*=\s*([\-0-9.]+)\s*\+\s*([0-9.]+)\s*[\.\*X×]\s*X", texto.upper().replace(",", "."))
+    if m:
+        curva = {"a": float(m.group(1)), "b": float(m.group(2))}
+
+    min_range, max_range = faixa("Calibration")
+    inmin_range, inmax_range = faixa("Indication")
+
+    return {
+        "tag": tag,
+        "sn_instrumento": sns[0] if sns else None,
+        "sn_sensor": sns[1] if len(sns) > 1 else None,
+        "certificado": certificado,
+        "data": m_cal.group(2) if m_cal else None,
+        "local": local,
+        "sistema": sistema,
+        "report_date": m_rep.group(2) if m_rep else None,
+        "min_range": min_range,
+        "max_range": max_range,
+        "inmin_range": inmin_range,
+        "inmax_range": inmax_range,
+        "rod_length": normalizar_num(rod.group(1)) if rod else None,
+        "probe_diameter": normalizar_num(probe.group(1)) if probe else None,
+        "erro_fid": erro_fid,
+        "incerteza": incerteza,
+        "curva_de_calibracao": curva
+    }
+
+
+def cronometrar(funcao, texto, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao(texto)
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paginas", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'páginas':>8} {'caracteres':>11} {'anterior (ms)':>14} {'indexado (ms)':>14} {'ganho':>7}")
+    for paginas in args.paginas:
+        texto = gerar_texto(paginas)
+
+        if extrair_campos(texto) != extrair_campos_referencia(texto):
+            raise SystemExit(f"Resultado divergente com {paginas} página(s)")
+
+        antes = cronometrar(extrair_campos_referencia, texto, args.repeticoes)
+        depois = cronometrar(extrair_campos, texto, args.repeticoes)
+        print(f"{paginas:>8} {len(texto):>11} {antes:>14.3f} {depois:>14.3f} {antes / depois:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Benchmark de ponta a ponta do processamento de um certificado, etapa por
+etapa, sobre certificados sintéticos (benchmarks.sintetico) de todos os
+layouts, variando páginas e número de pontos.
+
+Etapas medidas (mediana de N repetições, em ms):
+    abrir      CertificateDocument sobre os bytes do PDF
+    texto      extrair_texto com o backend escolhido
+    campos     extrair_campos sobre o texto
+    pontos     extrair_pontos_calibracao_pdf (tabelas)
+    contexto   criar_contexto (consultas ao banco)
+    validacao  ValidationEngine.run
+    xml        gerar_xml_calibracao
+    ac         preenchimento da planilha da AC (sem exportar via Excel)
+
+O resultado é gravado em JSON e pode ser comparado a uma execução
+anterior:
+
+    python -m benchmarks.bench_pipeline --saida atual.json --baseline base.json
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.sintetico import TAGS, TIPOS, gerar_certificado
+from data import conexao
+from data.conexao import criar_tabela
+from data.utils_db import inserir_instrumento
+from pdf.documento import CertificateDocument
+from pdf.extrator import BACKENDS, extrair_texto
+from pdf.parser_certificados import extrair_campos
+from validation.context import criar_contexto
+from validation.engine import ValidationEngine
+from xml_model.xml_extractor import extrair_pontos_calibracao_pdf
+from xml_model.xml_generator import gerar_xml_calibracao
+
+
+ETAPAS = ("abrir", "texto", "campos", "pontos", "contexto", "validacao", "xml", "ac")
+
+PAGINAS_EXTRA = (0, 5, 20)
+PONTOS = (5, 20, 40)
+
+# Razão atual/baseline a partir da qual a etapa é apontada como regressão
+LIMITE_REGRESSAO = 1.2
+
+
+def _preparar_banco(caminho):
+    conexao.db_path = caminho
+    criar_tabela()
+    for tag in TAGS.values():
+        inserir_instrumento(tag, "7712345", "S99881", 0.0, 2500.0)
+
+
+def _carregar_preencher_ac():
+    """
+    preencher_ac depende do openpyxl e do TemplateAC.xlsx no diretório
+    atual; sem eles a etapa "ac" não é medida.
+    """
+    try:
+        from form.utils_print import caminho_template, preencher_ac
+    except ImportError:
+        return None
+    return preencher_ac if os.path.exists(caminho_template) else None
+
+
+def medir_caso(pdf_bytes, backend, repeticoes, pasta_saida, preencher_ac):
+    tempos = {etapa: [] for etapa in ETAPAS}
+
+    def cronometrar(etapa, funcao, *args):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        tempos[etapa].append((time.perf_counter() - inicio) * 1000)
+        return resultado
+
+    for _ in range(repeticoes):
+        doc = cronometrar("abrir", CertificateDocument, pdf_bytes)
+        try:
+            texto = cronometrar("texto", extrair_texto, doc, backend)
+            dados_pdf = cronometrar("campos", extrair_campos, texto)
+            pontos = cronometrar("pontos", extrair_pontos_calibracao_pdf, doc)
+        finally:
+            doc.fechar()
+
+        ctx = cronometrar("contexto", criar_contexto, copy.deepcopy(dados_pdf), pontos)
+        cronometrar("validacao", ValidationEngine().run, ctx)
+
+        caminho_xml = os.path.join(pasta_saida, "bench.xml")
+        cronometrar("xml", gerar_xml_calibracao, dados_pdf, pontos, caminho_xml)
+
+        if preencher_ac:
+            cronometrar("ac", preencher_ac, dados_pdf)
+
+    return {etapa: round(statistics.median(v), 3) for etapa, v in tempos.items() if v}
+
+
+def executar(paginas_extra, pontos, repeticoes, backend):
+    preencher_ac = _carregar_preencher_ac()
+    casos = {}
+
+    with tempfile.TemporaryDirectory() as pasta:
+        _preparar_banco(os.path.join(pasta, "instrumentos.db"))
+
+        for tipo in TIPOS:
+            for extra in paginas_extra:
+                for n_pontos in pontos:
+                    nome = f"{tipo}_pag{extra + 2}_pts{n_pontos}"
+                    pdf_bytes = gerar_certificado(tipo, n_pontos=n_pontos, paginas_extra=extra)
+                    etapas = medir_caso(pdf_bytes, backend, repeticoes, pasta, preencher_ac)
+                    casos[nome] = {
+                        "tipo": tipo,
+                        "paginas": extra + 2,
+                        "pontos": n_pontos,
+                        "etapas": etapas,
+                        "total": round(sum(etapas.values()), 3)
+                    }
+                    print(f"{nome:<22} " + "  ".join(f"{e} {t:8.2f}" for e, t in etapas.items()))
+
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "backend": backend.nome,
+        "repeticoes": repeticoes,
+        "casos": casos
+    }
+
+
+def comparar(atual, base, limite=LIMITE_REGRESSAO):
+    """
+    Imprime a razão atual/baseline por caso e etapa.
+    Retorna a lista de regressões acima do limite.
+    """
+    regressoes = []
+
+    print(f"\nComparação com a baseline de {base.get('data')} (razão atual/baseline)")
+    for nome, caso in atual["casos"].items():
+        caso_base = base["casos"].get(nome)
+        if not caso_base:
+            continue
+
+        razoes = []
+        for etapa, tempo in caso["etapas"].items():
+            tempo_base = caso_base["etapas"].get(etapa)
+            if not tempo_base:
+                continue
+            razao = tempo / tempo_base
+            razoes.append(f"{etapa} {razao:5.2f}")
+            if razao >= limite:
+                regressoes.append((nome, etapa, tempo_base, tempo))
+
+        print(f"{nome:<22} " + "  ".join(razoes))
+
+    for nome, etapa, antes, depois in regressoes:
+        print(f"REGRESSÃO {nome} / {etapa}: {antes:.2f} ms -> {depois:.2f} ms")
+
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paginas-extra", type=int, nargs="+", default=list(PAGINAS_EXTRA))
+    parser.add_argument("--pontos", type=int, nargs="+", default=list(PONTOS))
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="pdfium")
+    parser.add_argument("--saida", help="Arquivo JSON com os resultados")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--limite", type=float, default=LIMITE_REGRESSAO)
+    args = parser.parse_args()
+
+    resultado = executar(args.paginas_extra, args.pontos, args.repeticoes, BACKENDS[args.backend])
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            base = json.load(f)
+        if comparar(resultado, base, args.limite):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Regra dos pontos de calibração (validation.rules.regra_pontos_if).
+
+1. verificar_pontos aponta as mesmas linhas e motivos que uma
+   verificação ponto a ponto, em tabelas sintéticas com defeitos
+   (extremos fora do range, referência fora da sequência, k diferente,
+   valores ausentes), e nenhuma divergência bloqueia a AC (não há
+   tolerância de |tendência| + incerteza).
+2. Tempo por certificado de verificar_pontos e da verificação ponto a
+   ponto para 10, 100 e 500 pontos: verificar_pontos não pode ser mais
+   lento.
+3. Os certificados sintéticos (benchmarks.sintetico) de cada tipo, lidos
+   do PDF, não geram divergência de pontos.
+
+    python -m benchmarks.bench_pontos [--certificados 3000]
+"""
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.bench_historico import reler
+from benchmarks.sintetico import gerar_certificado
+from pdf.classificador import DPT, PT, TE, TT
+from pdf.registro import RegistroCertificado
+from config.validacao import configuracao
+from validation.context import ValidationContext
+from validation.rules import regra_pontos_if, verificar_pontos
+
+
+def gerar_pontos(sorteio, tipo, n, min_range, max_range):
+    """
+    Pontos de min_range a max_range (ou ao contrário), com defeitos
+    sorteados em algumas linhas.
+    """
+    passo = (max_range - min_range) / max(n - 1, 1)
+    referencias = [min_range + i * passo for i in range(n)]
+    if sorteio.random() < 0.2:
+        referencias.reverse()
+
+    pontos = [
+        {"tipo": tipo, "referencia": r, "media": r, "tendencia": 0.01, "incerteza": 0.05, "k": 2.0}
+        for r in referencias
+    ]
+
+    for _ in range(sorteio.choice((0, 0, 1, 2, 5))):
+        p = sorteio.choice(pontos)
+        defeito = sorteio.choice(("extremo", "sequencia", "k", "ausente", "referencia"))
+        if defeito == "extremo":
+            extremo = pontos[sorteio.choice((0, -1))]
+            if extremo["referencia"] is not None:
+                extremo["referencia"] += (max_range - min_range) * 0.05
+        elif defeito == "sequencia":
+            p["referencia"] = sorteio.choice(referencias)
+        elif defeito == "k":
+            p["k"] = sorteio.choice((2.01, 2.5, None))
+        elif defeito == "ausente":
+            p[sorteio.choice(("tendencia", "incerteza"))] = None
+        else:
+            p["referencia"] = None
+
+    return pontos
+
+
+def verificar_referencia(cert, pontos):
+    """
+    Mesma verificação de verificar_pontos, ponto a ponto sobre a lista
+    de dicionários.
+    """
+    limites = configuracao().limites(cert.tipo)
+    problemas = {}
+    validos = [(i, p) for i, p in enumerate(pontos) if p["referencia"] is not None]
+    if not validos:
+        return problemas
+
+    primeiro, ultimo = validos[0][1]["referencia"], validos[-1][1]["referencia"]
+    crescente = ultimo >= primeiro
+    span = None
+    if cert.min_range is not None and cert.max_range is not None:
+        span = abs(cert.max_range - cert.min_range)
+
+    if span is not None:
+        inicio, fim = (cert.min_range, cert.max_range) if crescente else (cert.max_range, cert.min_range)
+        if abs(primeiro - inicio) > limites.margem_extremos * span:
+            problemas.setdefault(validos[0][0], []).append(f"ponto inicial {primeiro} ≠ {inicio}")
+        if abs(ultimo - fim) > limites.margem_extremos * span:
+            problemas.setdefault(validos[-1][0], []).append(f"ponto final {ultimo} ≠ {fim}")
+
+    for (_, anterior), (i, p) in zip(validos, validos[1:]):
+        a, b = anterior["referencia"], p["referencia"]
+        if (crescente and b <= a) or (not crescente and b >= a):
+            problemas.setdefault(i, []).append("fora da sequência")
+
+    ks = [p["k"] for p in pontos if p["k"] is not None]
+    if ks:
+        contagem = {}
+        for v in ks:
+            contagem[v] = contagem.get(v, 0) + 1
+        k_maioria = max(contagem, key=lambda v: (contagem[v], -ks.index(v)))
+        for i, p in enumerate(pontos):
+            if p["k"] is not None and abs(p["k"] - k_maioria) > limites.tolerancia_k:
+                problemas.setdefault(i, []).append(f"k diferente de {k_maioria}")
+
+    return problemas
+
+
+def gerar_caso(sorteio, n):
+    tipo = sorteio.choice((TE, TT, PT, DPT))
+    min_range = sorteio.choice((0.0, -50.0, 0.0))
+    max_range = sorteio.choice((100.0, 250.0, 2500.0))
+    pontos = gerar_pontos(sorteio, tipo, n, min_range, max_range)
+
+    dados = {"tag": "20-PIT-0001", "tipo": tipo}
+    if sorteio.random() < 0.9:
+        dados.update(min_range=min_range, max_range=max_range)
+    return dados, pontos
+
+
+def _contexto(dados, pontos):
+    return ValidationContext(dados, None, None, None, None, pontos=pontos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--certificados", type=int, default=3000)
+    args = parser.parse_args()
+
+    sorteio = random.Random(23)
+    erros = []
+
+    # 1. verificar_pontos x ponto a ponto
+    casos = [gerar_caso(sorteio, sorteio.choice((1, 2, 5, 10, 40))) for _ in range(args.certificados)]
+    com_problema = 0
+    for dados, pontos in casos:
+        cert = RegistroCertificado(dados, pontos)
+        obtido = verificar_pontos(cert, configuracao().limites(cert.tipo))
+        esperado = verificar_referencia(cert, pontos)
+        if obtido != esperado:
+            erros.append(f"{dados}: {obtido} ≠ {esperado}")
+            continue
+
+        issue = regra_pontos_if(_contexto(dados, pontos))
+        if bool(issue) != bool(obtido):
+            erros.append(f"{dados}: divergência {issue and issue.key} com {obtido}")
+        elif issue and issue.blocking:
+            erros.append(f"{dados}: pontos bloqueiam a AC sem tolerância configurada")
+        com_problema += bool(issue)
+    print(f"{args.certificados} certificados, {com_problema} com divergência de pontos")
+
+    # 2. Tempo por tamanho da tabela
+    print(f"\n{'pontos':>6s} {'verificar_pontos µs':>20s} {'ponto a ponto':>14s} {'regra':>8s}")
+    for n in (10, 100, 500):
+        amostra = [gerar_caso(sorteio, n) for _ in range(max(20, 20000 // n))]
+        contextos = [_contexto(dados, pontos) for dados, pontos in amostra]
+        limites = [configuracao().limites(ctx.cert.tipo) for ctx in contextos]
+
+        inicio = time.perf_counter()
+        for ctx, lim in zip(contextos, limites):
+            verificar_pontos(ctx.cert, lim)
+        colunas = (time.perf_counter() - inicio) / len(contextos) * 1e6
+
+        inicio = time.perf_counter()
+        for ctx in contextos:
+            verificar_referencia(ctx.cert, ctx.pontos)
+        referencia = (time.perf_counter() - inicio) / len(contextos) * 1e6
+
+        inicio = time.perf_counter()
+        for ctx in contextos:
+            regra_pontos_if(ctx)
+        regra = (time.perf_counter() - inicio) / len(contextos) * 1e6
+
+        print(f"{n:6d} {colunas:20.1f} {referencia:14.1f} {regra:8.1f}")
+        if colunas > referencia:
+            erros.append(f"{n} pontos: verificar_pontos mais lento que ponto a ponto")
+
+    # 3. Certificados sintéticos
+    for tipo in ("TE", "TT", "TT_MA", "PT", "DPT"):
+        dados, pontos = reler(gerar_certificado(tipo, n_pontos=10))
+        issue = regra_pontos_if(_contexto(dados, pontos))
+        if not pontos:
+            erros.append(f"{tipo}: nenhum ponto extraído")
+        elif issue:
+            erros.append(f"{tipo}: divergência em certificado sintético\n{issue.message}")
+
+    for erro in erros[:20]:
+        print(f"ERRO: {erro}")
+    print("ok" if not erros else f"{len(erros)} erro(s)")
+    sys.exit(1 if erros else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Custo das regras de validação sobre certificados já extraídos, sem PDF
+nem banco (contextos montados com cadastros sintéticos).
+
+1. Tempo por certificado de montar o contexto (RegistroCertificado) e de
+   rodar o ValidationEngine, e certificados por segundo.
+2. A validação não altera o certificado (ctx.pdf) nem o cadastro
+   (ctx.db): só as ações aprovadas gravam alguma coisa.
+3. Modo COLETAR devolve as mesmas divergências, na mesma ordem, que
+   rodar todas as regras de REGRAS sem pré-condições.
+4. Modo FALHA_RAPIDA (triagem do lote, com e sem --aplicar) chega ao
+   mesmo status (pendente ou não) executando menos regras.
+
+    python -m benchmarks.bench_regras [--certificados 20000]
+"""
+import argparse
+import copy
+import random
+import sys
+import time
+
+from batch.processador import _pendencia
+from data.repositorio import extrair_tag_base
+from validation.context import ValidationContext
+from validation.engine import COLETAR, FALHA_RAPIDA, REGRAS, ValidationEngine
+
+
+LOCAIS = ("FPSO Forte - Macaé", "FPSO FRADE", "Polvo", "FPSO Bravo", "Plataforma X", None)
+TIPOS = ("TE", "TT", "PT", "DPT")
+
+
+def _numero(sorteio, *opcoes):
+    return sorteio.choice(opcoes + (None,)) if sorteio.random() < 0.1 else sorteio.choice(opcoes)
+
+
+def gerar_caso(sorteio, i):
+    """
+    (dados_pdf, registro, reg_sn) de um certificado sintético.
+    """
+    tag = f"20-{sorteio.choice(('PIT', 'TE', 'TIT', 'PDIT'))}-{i % 500:04d}-{sorteio.choice('AB')}"
+    dados = {
+        "tag": tag,
+        "sn_instrumento": f"N{sorteio.randrange(50)}",
+        "sn_sensor": sorteio.choice((None, f"S{sorteio.randrange(50)}")),
+        "certificado": f"{i}/2025",
+        "data": "10/01/2025",
+        "report_date": "12/01/2025",
+        "local": sorteio.choice(LOCAIS),
+        "min_range": _numero(sorteio, 0.0, -1.0),
+        "max_range": _numero(sorteio, 100.0, 250.0, 2500.0),
+        "inmin_range": _numero(sorteio, 0.0, -1.0),
+        "inmax_range": _numero(sorteio, 250.0, 2500.0),
+        "rod_length": _numero(sorteio, 150.0, 300.0, 5.0),
+        "probe_diameter": _numero(sorteio, 6.0, 8.0),
+        "erro_fid": _numero(sorteio, 0.01, 0.05, 0.2),
+        "incerteza": _numero(sorteio, 0.02, 0.09, 0.15),
+        "tipo": sorteio.choice(TIPOS),
+    }
+
+    registro, reg_sn = None, None
+    sorteado = sorteio.random()
+    if sorteado < 0.7:
+        registro = {
+            "tag": tag,
+            "sn_instrumento": sorteio.choice((dados["sn_instrumento"], "N999")),
+            "sn_sensor": sorteio.choice((dados["sn_sensor"], None)),
+            "min_range": sorteio.choice((0.0, None)),
+            "max_range": sorteio.choice((dados["max_range"], 100.0, None)),
+        }
+    elif sorteado < 0.85:
+        reg_sn = {
+            "tag": sorteio.choice((tag[:-1] + "C", "21-FT-0001-A")),
+            "sn_instrumento": dados["sn_instrumento"],
+            "sn_sensor": None
+        }
+
+    return dados, registro, reg_sn
+
+
+def criar(dados, registro, reg_sn):
+    tag = dados["tag"]
+    return ValidationContext(
+        dados_pdf=dados,
+        registro=registro,
+        reg_sn=reg_sn,
+        tag_base_pdf=extrair_tag_base(tag),
+        tag_base_sn=extrair_tag_base(reg_sn["tag"]) if reg_sn else None
+    )
+
+
+def _chaves(issues):
+    return [(i.key, i.message, i.blocking, i.action is not None) for i in issues]
+
+
+def todas_as_regras(ctx):
+    """
+    Referência: cada regra chamada diretamente, na ordem de REGRAS.
+    """
+    return [issue for issue in (regra.funcao(ctx) for regra in REGRAS) if issue]
+
+
+def _contar_regras(engine, contextos):
+    """
+    Regras executadas pelo engine nos contextos (aplicavel verdadeiro até
+    a parada, reproduzindo a agenda).
+    """
+    total = 0
+    for ctx in contextos:
+        for regra in engine.agenda:
+            if not regra.aplicavel(ctx):
+                continue
+            total += 1
+            issue = regra.funcao(ctx)
+            if issue and engine.modo == FALHA_RAPIDA and engine.parar(issue):
+                break
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--certificados", type=int, default=20000)
+    args = parser.parse_args()
+
+    sorteio = random.Random(21)
+    casos = [gerar_caso(sorteio, i) for i in range(args.certificados)]
+    originais = copy.deepcopy(casos)
+    engine = ValidationEngine(COLETAR)
+    erros = []
+
+    inicio = time.perf_counter()
+    contextos = [criar(*caso) for caso in casos]
+    t_contexto = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    issues = [engine.run(ctx) for ctx in contextos]
+    t_regras = time.perf_counter() - inicio
+
+    n = args.certificados
+    print(f"contexto   {t_contexto / n * 1e6:7.1f} µs/certificado")
+    print(f"regras     {t_regras / n * 1e6:7.1f} µs/certificado   {n / t_regras:9.0f} certificados/s")
+    print(f"divergências: {sum(len(i) for i in issues)} em {sum(1 for i in issues if i)} certificados")
+
+    if casos != originais:
+        erros.append("a validação alterou o certificado ou o cadastro")
+
+    # 3. COLETAR igual a todas as regras
+    diferentes = sum(1 for ctx, i in zip(contextos, issues) if _chaves(i) != _chaves(todas_as_regras(ctx)))
+    if diferentes:
+        erros.append(f"COLETAR difere de todas as regras em {diferentes} certificados")
+
+    # 4. Triagem
+    print(f"\n{'modo':28s} {'regras/cert.':>12s} {'µs/cert.':>9s}")
+    print(f"{'todas as regras':28s} {len(REGRAS):12.2f}")
+    print(f"{'coletar':28s} {_contar_regras(engine, contextos) / n:12.2f} {t_regras / n * 1e6:9.1f}")
+    for aplicar in (False, True):
+        parar = _pendencia(aplicar)
+        triagem = ValidationEngine(FALHA_RAPIDA, parar=parar)
+
+        inicio = time.perf_counter()
+        resultados = [triagem.run(ctx) for ctx in contextos]
+        duracao = time.perf_counter() - inicio
+
+        nome = f"falha rápida ({'--aplicar' if aplicar else 'sem --aplicar'})"
+        print(f"{nome:28s} {_contar_regras(triagem, contextos) / n:12.2f} {duracao / n * 1e6:9.1f}")
+
+        for ctx, completas, parciais in zip(contextos, issues, resultados):
+            if any(map(parar, completas)) != any(map(parar, parciais)):
+                erros.append(f"triagem ({nome}) mudou o status de {ctx.cert.tag}")
+                break
+
+    for erro in erros:
+        print(f"ERRO: {erro}")
+    print("ok" if not erros else f"{len(erros)} erro(s)")
+    sys.exit(1 if erros else 0)
+
+
+if __name__ == "__main__":
+    main()
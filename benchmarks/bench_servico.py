@@ -0,0 +1,166 @@
+"""
+Serviço de banco compartilhado (data.servico + data.cliente) em localhost.
+
+Sobe o serviço numa porta livre com um banco temporário, aponta
+data.cliente para ele e confere, pelas funções de data.utils_db:
+
+1. Várias estações (threads) inserindo e atualizando ao mesmo tempo:
+   nenhuma escrita perdida e nenhum erro de banco travado.
+2. transacao(): escritas enviadas juntas; uma falha descarta todas.
+3. Resoluções e sugestões pelo serviço iguais às feitas direto no arquivo.
+4. Histórico gravado e consultado pelo serviço.
+5. Token errado é recusado; sem token, o serviço não sobe fora de
+   localhost.
+
+Mostra também a latência de uma consulta pelo serviço e direto no SQLite.
+
+    python -m benchmarks.bench_servico [--estacoes 8] [--instrumentos 200]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from data import cliente, conexao, historico, utils_db
+from data.repositorio import repositorio
+from data.servico import criar_servidor
+
+
+def estacao(numero, n, erros):
+    try:
+        for i in range(n):
+            tag = f"{numero:02d}-PIT-{i:05d}"
+            utils_db.inserir_instrumento(tag, f"SN{numero:02d}{i:05d}", None, 0.0, 100.0)
+            with utils_db.transacao():
+                utils_db.atualizar_sn_sensor(tag, f"S{numero:02d}{i:05d}")
+                utils_db.atualizar_range(tag, 0.0, 200.0 + i)
+            if utils_db.buscar_instrumento_por_tag(tag)["max_range"] != 200.0 + i:
+                erros.append(f"estação {numero}: leitura após escrita diferente em {tag}")
+    except Exception as e:
+        erros.append(f"estação {numero}: {type(e).__name__}: {e}")
+    finally:
+        cliente.cliente_configurado().fechar()
+
+
+def latencia(funcao, chaves):
+    tempos = []
+    for chave in chaves:
+        inicio = time.perf_counter()
+        funcao(*chave)
+        tempos.append((time.perf_counter() - inicio) * 1e6)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--estacoes", type=int, default=8)
+    parser.add_argument("--instrumentos", type=int, default=200)
+    args = parser.parse_args()
+
+    erros = []
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "instrumentos.db")
+        servidor = criar_servidor(caminho, porta=0, token="segredo")
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        host, porta = servidor.server_address[:2]
+
+        cliente.endereco = f"{host}:{porta}"
+        cliente.token = "segredo"
+
+        # 1. Estações simultâneas
+        inicio = time.perf_counter()
+        threads = [
+            threading.Thread(target=estacao, args=(e, args.instrumentos, erros))
+            for e in range(args.estacoes)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duracao = time.perf_counter() - inicio
+        escritas = args.estacoes * args.instrumentos * 2
+        print(f"{args.estacoes} estações: {escritas} escritas (commits) em {duracao:.2f} s, {escritas / duracao:.0f}/s")
+
+        conn = sqlite3.connect(caminho)
+        total = conn.execute("SELECT COUNT(*) FROM instrumentos WHERE sn_sensor IS NOT NULL").fetchone()[0]
+        if total != args.estacoes * args.instrumentos:
+            erros.append(f"esperados {args.estacoes * args.instrumentos} instrumentos completos, encontrados {total}")
+
+        # 2. Transação descartada por completo
+        try:
+            with utils_db.transacao():
+                utils_db.inserir_instrumento("99-PIT-NOVO", "SN-NOVO")
+                utils_db.inserir_instrumento("00-PIT-00000", "SN-DUPLICADA")
+            erros.append("TAG duplicada aceita pelo serviço")
+        except sqlite3.IntegrityError:
+            pass
+        if conn.execute("SELECT COUNT(*) FROM instrumentos WHERE tag = '99-PIT-NOVO'").fetchone()[0]:
+            erros.append("transação com erro gravou parte das escritas")
+
+        # 3. Resoluções iguais às do arquivo local
+        sorteio = random.Random(5)
+        chaves = [
+            (f"{sorteio.randrange(args.estacoes + 1):02d}-PIT-{sorteio.randrange(args.instrumentos):05d}",
+             f"SN{sorteio.randrange(args.estacoes):02d}{sorteio.randrange(args.instrumentos):05d}",
+             None)
+            for _ in range(300)
+        ]
+        remotas = utils_db.resolver_instrumentos(chaves)
+        locais = repositorio.resolver_varios(chaves)
+        if [r.como_dict() for r in remotas] != [r.como_dict() for r in locais]:
+            erros.append("resolver_instrumentos pelo serviço difere do arquivo local")
+
+        if utils_db.sugerir_instrumentos("00 PIT 00001") != repositorio.sugerir("00 PIT 00001"):
+            erros.append("sugerir_instrumentos pelo serviço difere do arquivo local")
+
+        servico_us = latencia(utils_db.resolver_instrumento, chaves)
+        local_us = latencia(repositorio.resolver, chaves)
+        print(f"resolver_instrumento  serviço {servico_us:7.1f} µs  SQLite local {local_us:7.1f} µs")
+
+        # 4. Histórico
+        dados = {"certificado": "1/2025", "tag": "00-PIT-00000", "sn_instrumento": "SN0000000", "data": "10/01/2025"}
+        pontos = [{"referencia": 0.0, "media": 0.01, "tendencia": 0.01, "incerteza": 0.02, "k": 2.0}]
+        with utils_db.transacao():
+            historico.registrar_calibracao(dados, pontos, "teste.pdf")
+        ultima = historico.ultima_calibracao("00-PIT-00000")
+        if not ultima or ultima["pontos"] != pontos or ultima["data_calibracao"] != "2025-01-10":
+            erros.append(f"histórico pelo serviço: {ultima}")
+
+        # 5. Token
+        cliente.token = "errado"
+        try:
+            utils_db.buscar_instrumento_por_tag("00-PIT-00000")
+            erros.append("token errado aceito")
+        except cliente.ErroServidor:
+            pass
+
+        token_ambiente = os.environ.pop("AC_SERVIDOR_TOKEN", None)
+        try:
+            criar_servidor(caminho, host="0.0.0.0", porta=0).server_close()
+            erros.append("serviço sem token aceito em 0.0.0.0")
+        except ValueError:
+            pass
+        finally:
+            if token_ambiente is not None:
+                os.environ["AC_SERVIDOR_TOKEN"] = token_ambiente
+
+        cliente.cliente_configurado().fechar()
+        cliente.endereco = None
+        conn.close()
+        repositorio.fechar()
+        servidor.shutdown()
+        servidor.server_close()
+
+    for erro in erros:
+        print(f"ERRO: {erro}")
+    print("ok" if not erros else f"{len(erros)} erro(s)")
+    sys.exit(1 if erros else 0)
+
+
+if __name__ == "__main__":
+    main()
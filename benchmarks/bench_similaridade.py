@@ -0,0 +1,189 @@
+"""
+Busca de instrumentos parecidos (data.similaridade) sobre um cadastro
+sintético.
+
+1. Latência de sugerir_instrumentos (mediana e p99) e tempo de montagem
+   do índice.
+2. Acerto: a TAG cadastrada aparece entre as sugestões para variações
+   do certificado (traço/espaço trocados, um dígito errado na TAG e no
+   SN). Variações só de grafia precisam vir em primeiro, com 100%.
+3. Escritas pelo repositório chegam ao índice sem remontá-lo
+   (write-through): após inserir e atualizar TAG/SNs, o índice em uso é
+   igual a um montado do zero e a TAG nova já é sugerida.
+4. Validação: TAG com outra grafia vira "tag_equivalente" (sem ação de
+   cadastro); TAG sem parecidos continua "novo_instrumento".
+
+    python -m benchmarks.bench_similaridade [--instrumentos 30000] [--consultas 2000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from data import conexao, utils_db
+from data.conexao import criar_tabela
+from data.repositorio import repositorio
+from data.similaridade import IndiceSimilaridade
+from validation.context import criar_contexto
+from validation.engine import ValidationEngine
+
+
+PREFIXOS = ("20-PIT", "20-TIT", "20-FT", "21-PDIT", "21-LIT", "22-TE", "22-PT", "23-TT")
+
+# Limite da mediana de uma consulta (ms)
+LIMITE_MS = 1.0
+
+
+def popular(caminho, n, sorteio):
+    conexao.db_path = caminho
+    criar_tabela()
+    tags = set()
+    linhas = []
+    while len(linhas) < n:
+        tag = f"{sorteio.choice(PREFIXOS)}-{sorteio.randrange(10000):04d}"
+        if sorteio.random() < 0.2:
+            tag += "-" + sorteio.choice("ABC")
+        if tag in tags:
+            continue
+        tags.add(tag)
+        linhas.append((
+            tag,
+            f"{sorteio.choice('NKJ')}{sorteio.randrange(10 ** 7):07d}",
+            f"S{sorteio.randrange(10 ** 6):06d}" if sorteio.random() < 0.5 else None,
+            0.0, 100.0
+        ))
+    conn = sqlite3.connect(caminho)
+    conn.executemany(
+        "INSERT INTO instrumentos (tag, sn_instrumento, sn_sensor, min_range, max_range) VALUES (?, ?, ?, ?, ?)",
+        linhas
+    )
+    conn.commit()
+    conn.close()
+    return linhas
+
+
+def trocar_digito(texto, sorteio):
+    posicoes = [i for i, c in enumerate(texto) if c.isdigit()]
+    i = sorteio.choice(posicoes)
+    return texto[:i] + str((int(texto[i]) + sorteio.randrange(1, 10)) % 10) + texto[i + 1:]
+
+
+def variacao(linha, sorteio):
+    """
+    (tipo, tag, sn_instrumento) de um certificado com a TAG/SN lidos com erro.
+    """
+    tag, sn = linha[0], linha[1]
+    tipo = sorteio.choice(("grafia", "grafia", "digito_tag", "digito_tag_sn"))
+    if tipo == "grafia":
+        # Com o SN certo o repositório já teria achado o cadastro
+        sn = None
+        tag = sorteio.choice((
+            tag.replace("-", "–"),
+            tag.replace("-", " "),
+            tag.replace("-", "", 1),
+            tag.lower().replace("-", " - "),
+        ))
+    elif tipo == "digito_tag":
+        tag, sn = trocar_digito(tag, sorteio), sorteio.choice((sn, None))
+    else:
+        tag, sn = trocar_digito(tag, sorteio), trocar_digito(sn, sorteio)
+    return tipo, tag, sn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instrumentos", type=int, default=30000)
+    parser.add_argument("--consultas", type=int, default=2000)
+    args = parser.parse_args()
+
+    sorteio = random.Random(20)
+    erros = []
+
+    with tempfile.TemporaryDirectory() as pasta:
+        linhas = popular(os.path.join(pasta, "instrumentos.db"), args.instrumentos, sorteio)
+
+        inicio = time.perf_counter()
+        utils_db.sugerir_instrumentos("20-PIT-0000")
+        print(f"montagem do índice ({args.instrumentos} instrumentos): {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+        # 1 e 2. Latência e acerto
+        tempos = []
+        acertos = {}
+        for _ in range(args.consultas):
+            linha = sorteio.choice(linhas)
+            tipo, tag, sn = variacao(linha, sorteio)
+
+            inicio = time.perf_counter()
+            sugestoes = utils_db.sugerir_instrumentos(tag, sn)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+
+            tags = [s["tag"] for s in sugestoes]
+            total, certos = acertos.get(tipo, (0, 0))
+            acertos[tipo] = (total + 1, certos + (linha[0] in tags))
+
+            if tipo == "grafia" and (not sugestoes or tags[0] != linha[0] or sugestoes[0]["similaridade"] != 1.0):
+                erros.append(f"{tag!r}: esperado {linha[0]} em primeiro, sugerido {tags[:3]}")
+
+        tempos.sort()
+        mediana = statistics.median(tempos)
+        print(f"sugerir_instrumentos: mediana {mediana:.3f} ms  p99 {tempos[int(len(tempos) * 0.99)]:.3f} ms")
+        for tipo, (total, certos) in sorted(acertos.items()):
+            print(f"  {tipo:14s} cadastro entre as 5 sugestões em {certos / total:6.1%} de {total}")
+        if mediana > LIMITE_MS:
+            erros.append(f"mediana {mediana:.3f} ms acima de {LIMITE_MS} ms")
+
+        # 3. Write-through
+        indice = repositorio.similaridade
+        inicio = time.perf_counter()
+        utils_db.inserir_instrumento("99-XYZ-4321", "Q7654321")
+        for linha in sorteio.sample(linhas, 50):
+            utils_db.atualizar_sn(linha[0], trocar_digito(linha[1], sorteio))
+            utils_db.atualizar_sn_sensor(linha[0], f"S{sorteio.randrange(10 ** 6):06d}")
+        for linha in sorteio.sample(linhas, 50):
+            utils_db.atualizar_tag(linha[0], linha[0] + "-R")
+        sugestoes = utils_db.sugerir_instrumentos("99 XYZ 4321")
+        print(f"101 escritas e uma consulta: {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+        if repositorio.similaridade is not indice:
+            erros.append("índice remontado após escritas do próprio repositório")
+        if [s["tag"] for s in sugestoes][:1] != ["99-XYZ-4321"]:
+            erros.append("TAG inserida não aparece nas sugestões")
+
+        conn = repositorio.conexao()
+        novo = IndiceSimilaridade().carregar(conn.execute("SELECT id, tag, sn_instrumento, sn_sensor FROM instrumentos"))
+        if indice.linhas != novo.linhas:
+            erros.append("linhas do índice diferem do banco após as escritas")
+        for campo in IndiceSimilaridade.CAMPOS:
+            antigo_campo, novo_campo = indice.campos[campo], novo.campos[campo]
+            if {g: sorted(ids) for g, ids in antigo_campo.postings.items()} != \
+                    {g: sorted(ids) for g, ids in novo_campo.postings.items()}:
+                erros.append(f"trigramas de {campo} diferem de um índice montado do zero")
+
+        # 4. Regras de validação
+        engine = ValidationEngine()
+        casos = (
+            ({"tag": "99 – xyz – 4321", "sn_instrumento": "Z0000001"}, "tag_equivalente"),
+            ({"tag": "77-QQQ-8888-Z", "sn_instrumento": "Z0000002"}, "novo_instrumento"),
+        )
+        for dados, esperado in casos:
+            issues = engine.run(criar_contexto(dados, []))
+            chaves = [issue.key for issue in issues]
+            if esperado not in chaves:
+                erros.append(f"{dados['tag']!r}: esperado {esperado}, obtido {chaves}")
+            if esperado == "tag_equivalente" and any(i.action for i in issues if i.key == esperado):
+                erros.append("tag_equivalente oferece cadastro")
+
+        repositorio.fechar()
+
+    for erro in erros[:20]:
+        print(f"ERRO: {erro}")
+    print("ok" if not erros else f"{len(erros)} erro(s)")
+    sys.exit(1 if erros else 0)
+
+
+if __name__ == "__main__":
+    main()
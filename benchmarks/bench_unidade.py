@@ -0,0 +1,136 @@
+"""
+Commits por certificado ao aplicar as ações de validação: cada ação
+confirmada na hora (comportamento anterior) contra a UnidadeDeTrabalho
+(data.unidade_trabalho), que grava todas num único commit.
+
+    python -m benchmarks.bench_unidade [--certificados 200] [--acoes 3]
+
+Também confere que, quando a geração ou a gravação falha dentro de
+confirmar(), nenhuma alteração chega ao banco, as marcas do certificado
+são desfeitas e os arquivos gerados são apagados. Falha nessa conferência
+encerra com código 1.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from data import conexao, utils_db
+from data.conexao import criar_tabela
+from data.repositorio import repositorio
+from data.unidade_trabalho import UnidadeDeTrabalho
+
+
+def popular(n):
+    criar_tabela()
+    with utils_db.transacao():
+        for i in range(n):
+            utils_db.inserir_instrumento(f"20-PIT-{i:05d}", f"SN{i:07d}", f"S{i:06d}", 0.0, 2500.0)
+
+
+def acoes_do_certificado(i, rodada, n_acoes):
+    # Mesmas funções chamadas pelas ações de validation.rules
+    tag = f"20-PIT-{i:05d}"
+    acoes = [
+        lambda: utils_db.atualizar_sn(tag, f"SN{i:07d}-{rodada}"),
+        lambda: utils_db.atualizar_sn_sensor(tag, f"S{i:06d}-{rodada}"),
+        lambda: utils_db.atualizar_range(tag, 0.0, 2500.0 + rodada),
+    ]
+    return (acoes * n_acoes)[:n_acoes]
+
+
+def contar_commits():
+    contador = {"commits": 0}
+
+    def rastreio(sql):
+        if sql.strip().upper() == "COMMIT":
+            contador["commits"] += 1
+
+    repositorio.conexao().set_trace_callback(rastreio)
+    return contador
+
+
+def medir(n, n_acoes, rodada, agrupar):
+    contador = contar_commits()
+    inicio = time.perf_counter()
+
+    for i in range(n):
+        acoes = acoes_do_certificado(i, rodada, n_acoes)
+        if agrupar:
+            unidade = UnidadeDeTrabalho()
+            for acao in acoes:
+                unidade.registrar(acao)
+            with unidade.confirmar():
+                pass
+        else:
+            for acao in acoes:
+                acao()
+
+    tempo = (time.perf_counter() - inicio) * 1000
+    repositorio.conexao().set_trace_callback(None)
+    return contador["commits"] / n, tempo / n
+
+
+def conferir_rollback(caminho, pasta):
+    def tabela():
+        conn = sqlite3.connect(caminho)
+        linhas = conn.execute("SELECT * FROM instrumentos ORDER BY id").fetchall()
+        conn.close()
+        return linhas
+
+    def falha_na_gravacao():
+        raise RuntimeError("falha simulada na gravação do histórico")
+
+    def falhar(etapa):
+        dados = {"tag": "20-PIT-00000"}
+        unidade = UnidadeDeTrabalho(dados)
+        for acao in acoes_do_certificado(0, 99, 3):
+            unidade.registrar(acao, "sn_atualizado")
+        unidade.registrar(lambda: utils_db.inserir_instrumento("20-PIT-NOVO", "SN-NOVO"))
+
+        arquivo = os.path.join(pasta, f"AC_{etapa}.pdf")
+        try:
+            with unidade.confirmar():
+                if not dados.get("sn_atualizado"):
+                    return False
+                with open(arquivo, "w") as f:
+                    f.write("AC")
+                unidade.registrar_arquivo(arquivo)
+                if etapa == "geração":
+                    raise RuntimeError("falha simulada na geração da AC")
+                unidade.registrar(falha_na_gravacao)
+        except RuntimeError:
+            pass
+
+        return "sn_atualizado" not in dados and not os.path.exists(arquivo) and len(unidade) == 0
+
+    antes = tabela()
+    return falhar("geração") and falhar("gravação") and tabela() == antes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--certificados", type=int, default=200)
+    parser.add_argument("--acoes", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "instrumentos.db")
+        conexao.db_path = caminho
+        popular(args.certificados)
+
+        for nome, agrupar, rodada in (("ação a ação", False, 1), ("unidade de trabalho", True, 2)):
+            commits, ms = medir(args.certificados, args.acoes, rodada, agrupar)
+            print(f"{nome:<20} {commits:5.1f} commits/certificado  {ms:7.3f} ms/certificado")
+
+        ok = conferir_rollback(caminho, pasta)
+        print(f"falha na geração/gravação: {'banco, marcas e arquivos desfeitos' if ok else 'ALTERAÇÕES MANTIDAS'}")
+        repositorio.fechar()
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
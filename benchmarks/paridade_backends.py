@@ -0,0 +1,114 @@
+"""
+Relatório dos backends de texto de pdf.extrator.
+
+Para cada certificado (sintéticos de todos os tipos, nos layouts de
+benchmarks.sintetico, e, opcionalmente, os PDFs de uma pasta), informa o
+tempo de extração de texto de cada backend e os campos em que o pdfium
+difere do pdfplumber: OK (iguais), FALLBACK (falta ao pdfium um campo
+obrigatório e extrair_campos_pdf usa o pdfplumber) ou DIVERGENTE (campos
+completos, mas diferentes: o certificado sairia errado). Também confere
+que a tabela de resultados localizada pelo cabeçalho (pdf.tabelas) é a
+mesma escolhida pela ordem das tabelas, como antes (tabelas[0] para
+TE/TT, tabelas[1] para PT/DPT).
+
+A paridade dos sintéticos é exigida em tests/test_paridade_backends.py;
+este script serve para conferir uma pasta de certificados reais.
+
+    python -m benchmarks.paridade_backends [--pasta certificados/] [--paginas-extra 0 10]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.sintetico import LAYOUTS, TIPOS, gerar_certificado
+from pdf.documento import CertificateDocument
+from pdf.classificador import classificar_documento
+from pdf.extrator import PDFIUM, PDFPLUMBER, campos_completos, extrair_texto
+from pdf.parser_certificados import extrair_campos
+from pdf.tabelas import INDICE_TABELA, localizar_tabela_resultados, tabela_por_ordem
+
+
+def comparar(nome, origem):
+    tempos = {}
+    campos = {}
+    tipo = None
+
+    for backend in (PDFPLUMBER, PDFIUM):
+        with CertificateDocument(origem, caminho=nome, backend=backend) as doc:
+            inicio = time.perf_counter()
+            texto = extrair_texto(doc)
+            tempos[backend.nome] = (time.perf_counter() - inicio) * 1000
+            campos[backend.nome] = extrair_campos(texto)
+            if backend is PDFIUM:
+                tipo = classificar_documento(doc, campos["pdfium"]["tag"]).tipo
+
+    divergentes = {
+        k: (campos["pdfplumber"][k], campos["pdfium"].get(k))
+        for k in campos["pdfplumber"]
+        if campos["pdfplumber"][k] != campos["pdfium"].get(k)
+    }
+
+    ganho = tempos["pdfplumber"] / tempos["pdfium"] if tempos["pdfium"] else float("inf")
+    situacao = "OK" if not divergentes else "DIVERGENTE"
+    if divergentes and not campos_completos(campos["pdfium"], tipo):
+        situacao = "FALLBACK"
+
+    print(
+        f"{situacao:<11} {nome:<40} pdfplumber {tempos['pdfplumber']:9.1f} ms"
+        f"  pdfium {tempos['pdfium']:7.1f} ms  {ganho:5.1f}x"
+    )
+    for campo, (ref, rapido) in divergentes.items():
+        print(f"    {campo}: pdfplumber={ref!r} pdfium={rapido!r}")
+
+    # Divergência com campos completos não aciona o fallback: é erro
+    return situacao != "DIVERGENTE"
+
+
+def comparar_tabelas(nome, origem):
+    with CertificateDocument(origem, caminho=nome) as doc:
+        tipo = classificar_documento(doc).tipo
+        if tipo is None:
+            print(f"{'SEM TIPO':<11} {nome:<40} tabela de resultados não conferida")
+            return True
+        localizada = localizar_tabela_resultados(doc, tipo)
+
+    # Documento novo: a seleção pela ordem não reaproveita nada da anterior
+    with CertificateDocument(origem, caminho=nome) as doc:
+        por_ordem = tabela_por_ordem(doc, INDICE_TABELA[tipo])
+
+    if localizada == por_ordem:
+        return True
+
+    print(f"{'TABELA':<11} {nome:<40} tabela de resultados diferente da escolhida pela ordem")
+    for rotulo, tabela in (("cabeçalho", localizada), ("ordem", por_ordem)):
+        print(f"    {rotulo}: {tabela[0] if tabela else None!r}")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pasta", help="Pasta com certificados reais para conferir")
+    parser.add_argument("--paginas-extra", type=int, nargs="+", default=[0, 10])
+    args = parser.parse_args()
+
+    ok = True
+
+    for tipo in TIPOS:
+        for layout in LAYOUTS:
+            for extra in args.paginas_extra:
+                nome = f"sintetico {tipo} {layout} +{extra} pág."
+                pdf = gerar_certificado(tipo, paginas_extra=extra, layout=layout)
+                ok &= comparar(nome, pdf)
+                ok &= comparar_tabelas(nome, pdf)
+
+    if args.pasta:
+        for caminho in sorted(Path(args.pasta).glob("*.pdf")):
+            ok &= comparar(caminho.name, str(caminho))
+            ok &= comparar_tabelas(caminho.name, str(caminho))
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Gerador de certificados PDF sintéticos para benchmarks e conferências.
+
+Escreve o PDF diretamente (fonte Helvetica, texto e linhas de tabela),
+sem dependências além da biblioteca padrão. Os layouts seguem os que
+xml_model.xml_extractor trata:
+
+- TE: termorresistência, 8 colunas (referência na 3ª)
+- TT: transmissor de temperatura em °C
+- TT_MA: transmissor de temperatura com coluna "mA DC"
+- PT / DPT: transmissor de pressão com média em mA DC e curva de
+  calibração; a tabela de resultados é a segunda do certificado
+
+Em cada um, dois layouts de página:
+
+- linhas: cada linha de texto num único objeto, na ordem de leitura
+- colunas: como nos certificados emitidos, os dados da haste e as
+  características metrológicas ficam em células, gravadas no PDF coluna
+  a coluna (rótulos, depois valores). O texto do pdfplumber continua o
+  mesmo; o do PDFium segue a ordem gravada.
+"""
+
+TIPOS = ("TE", "TT", "TT_MA", "PT", "DPT")
+
+LAYOUTS = ("linhas", "colunas")
+
+TAGS = {
+    "TE": "20-TE-1001",
+    "TT": "20-TT-1001",
+    "TT_MA": "20-TT-1002",
+    "PT": "20-PIT-1001",
+    "DPT": "20-PDIT-1001",
+}
+
+DESCRICOES = {
+    "TE": "Thermoresistance Pt-100",
+    "TT": "Temperature Transmitter",
+    "TT_MA": "Temperature Transmitter",
+    "PT": "Pressure Transmitter",
+    "DPT": "Differential Pressure Transmitter",
+}
+
+ALTURA_PAGINA = 842
+LARGURA_PAGINA = 595
+
+
+def _escapar(texto):
+    return texto.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _num(valor, casas=2):
+    return f"{valor:.{casas}f}".replace(".", ",")
+
+
+class PaginaSintetica:
+    def __init__(self):
+        self.operacoes = []
+        self.y = ALTURA_PAGINA - 42
+
+    def linha(self, texto, x=40, tamanho=9):
+        self.operacoes.append(f"BT /F1 {tamanho} Tf {x} {self.y} Td ({_escapar(texto)}) Tj ET")
+        self.y -= tamanho + 4
+
+    def tabela(self, linhas, larguras, altura=14, bordas=True, por_coluna=False):
+        x0 = 40
+        topo = self.y
+        total = sum(larguras)
+
+        if bordas:
+            for i in range(len(linhas) + 1):
+                y = topo - i * altura
+                self.operacoes.append(f"{x0} {y} m {x0 + total} {y} l S")
+
+            x = x0
+            for largura in larguras + [0]:
+                self.operacoes.append(f"{x} {topo} m {x} {topo - len(linhas) * altura} l S")
+                x += largura
+
+        posicoes = [x0 + sum(larguras[:j]) for j in range(len(larguras))]
+        celulas = [(i, j) for i in range(len(linhas)) for j in range(len(larguras))]
+        if por_coluna:
+            celulas.sort(key=lambda c: (c[1], c[0]))
+
+        for i, j in celulas:
+            if j < len(linhas[i]):
+                y = topo - (i + 1) * altura + 4
+                texto = _escapar(str(linhas[i][j]))
+                self.operacoes.append(f"BT /F1 7 Tf {posicoes[j] + 2} {y} Td ({texto}) Tj ET")
+
+        self.y = topo - len(linhas) * altura - 20
+
+
+def montar_pdf(paginas):
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    filhos = []
+
+    for pagina in paginas:
+        conteudo = "\n".join(pagina.operacoes).encode("cp1252")
+        num_pagina = len(objetos) + 1
+        filhos.append(f"{num_pagina} 0 R")
+        objetos.append((
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {LARGURA_PAGINA} {ALTURA_PAGINA}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {num_pagina + 1} 0 R >>"
+        ).encode())
+        objetos.append(b"<< /Length %d >>\nstream\n" % len(conteudo) + conteudo + b"\nendstream")
+
+    objetos[1] = f"<< /Type /Pages /Kids [{' '.join(filhos)}] /Count {len(paginas)} >>".encode()
+
+    saida = bytearray(b"%PDF-1.4\n")
+    posicoes = []
+    for i, objeto in enumerate(objetos, 1):
+        posicoes.append(len(saida))
+        saida += b"%d 0 obj\n" % i + objeto + b"\nendobj\n"
+
+    inicio_xref = len(saida)
+    saida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    for posicao in posicoes:
+        saida += b"%010d 00000 n \n" % posicao
+    saida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+
+    return bytes(saida)
+
+
+def _pagina_identificacao(tipo, local, layout):
+    p = PaginaSintetica()
+    p.linha("CALIBRATION CERTIFICATE", tamanho=12)
+    p.linha(f"Nº 1234/2025 - {tipo}")
+    p.linha("CLIENT INFORMATION")
+    p.linha("Name: ODS Metering Systems")
+    p.linha("CALIBRATION LOCATION:")
+    p.linha(f"Name: {local}")
+    p.linha("Address: Bacia de Campos")
+    p.linha("CALIBRATED ITEM DESCRIPTION")
+    p.linha("System Description: Sistema de Medicao de Gas")
+    p.linha("Combustivel Fiscal")
+    p.linha("Periodicity: 12 months")
+    p.linha(f"TAG: {TAGS[tipo]}")
+    p.linha(f"Item: {DESCRICOES[tipo]}")
+    p.linha("SN: 7712345")
+
+    if tipo in ("TE", "TT", "TT_MA"):
+        p.linha("Num. de Série: S99881")
+        if layout == "colunas":
+            p.tabela([["Rod length:", "250,0"], ["Probe diameter:", "6,0"]], [80, 60], bordas=False, por_coluna=True)
+        else:
+            p.linha("Rod length: 250,0")
+            p.linha("Probe diameter: 6,0")
+
+    p.linha("Calibration Date: 10/01/2025")
+    p.linha("Report Date: 12/01/2025")
+    p.linha("Calibration Range")
+    p.linha("Min: 0,00 Max: 2500,00")
+    p.linha("Indication Range")
+    p.linha("Min: 0,00 Max: 3000,00")
+    p.linha("LOCAL ENVIRONMENTAL CONDITIONS")
+    p.linha("Temperature: 23 C")
+    return p
+
+
+def _pagina_complementar(numero):
+    p = PaginaSintetica()
+    p.linha(f"REFERENCE STANDARDS - page {numero}")
+    for j in range(40):
+        p.linha(f"Padrao PRS-{numero}-{j} rastreavel RBC, certificado de referencia {j} valido ate 2026")
+    return p
+
+
+def _linhas_resultados(tipo, n_pontos):
+    passo = 2500 / max(n_pontos - 1, 1)
+    referencias = [i * passo for i in range(n_pontos)]
+
+    if tipo == "TE":
+        cabecalho = ["Point", "Sensor", "Reference", "Res", "Mean", "Tendency", "Uncertainty", "k"]
+        corpo = [
+            [str(i), "A", _num(r), "100,0", _num(r + 0.01), "0,01", "0,05", "2,00"]
+            for i, r in enumerate(referencias)
+        ]
+        return [cabecalho] + corpo, [40, 40, 60, 50, 60, 60, 70, 40]
+
+    if tipo == "TT":
+        cabecalho = ["Reference", "Mean", "Tendency", "Uncertainty", "k"]
+        corpo = [[_num(r), _num(r + 0.02), "0,02", "0,08", "2,00"] for r in referencias]
+        return [cabecalho] + corpo, [70, 70, 70, 70, 40]
+
+    if tipo == "TT_MA":
+        cabecalho = ["Reference", "Mean", "mA DC", "Tendency", "Uncertainty", "k"]
+        corpo = [
+            [_num(r), _num(r + 0.02), _num(4 + r * 0.0064, 4), "0,02", "0,08", "2,00"]
+            for r in referencias
+        ]
+        return [cabecalho] + corpo, [70, 70, 60, 70, 70, 40]
+
+    cabecalho = ["Reference", "Mean mA DC", "Mean kPa", "Tendency", "Uncertainty", "k"]
+    corpo = [
+        [_num(r, 1), _num(4 + r * 0.0064, 4), _num(r, 1), "0,1/0,01", "0,2/0,02", "2,00"]
+        for r in referencias
+    ]
+    return [cabecalho] + corpo, [70, 70, 70, 70, 70, 40]
+
+
+def gerar_certificado(tipo, n_pontos=5, paginas_extra=0, local="FPSO FORTE", layout="linhas"):
+    """
+    Retorna os bytes de um certificado sintético do tipo informado.
+
+    paginas_extra acrescenta páginas de texto (padrões de referência)
+    entre a identificação e os resultados; n_pontos é o número de linhas
+    da tabela de resultados, que fica numa única página (até 40 pontos).
+    layout é um de LAYOUTS.
+    """
+    paginas = [_pagina_identificacao(tipo, local, layout)]
+    paginas += [_pagina_complementar(i + 2) for i in range(paginas_extra)]
+
+    resultados = PaginaSintetica()
+    resultados.linha("CALIBRATION RESULTS")
+
+    if tipo in ("PT", "DPT"):
+        resultados.tabela(
+            [["Standard", "SN", "Certificate"], ["PRS-01", "111", "C-1"], ["PRS-02", "222", "C-2"]],
+            [120, 80, 80]
+        )
+
+    linhas, larguras = _linhas_resultados(tipo, n_pontos)
+    resultados.tabela(linhas, larguras)
+
+    resultados.linha("Metrological characteristics")
+    metrologia = [
+        ["Repeatability", "Hysteresis", "Fiducial Error", "Uncertainty"],
+        ["Repetibilidade", "Histerese", "Erro Fiducial", "Incerteza"],
+        ["0,010 %", "0,020 %", "0,050 %", "0,060 %"],
+    ]
+    if layout == "colunas":
+        resultados.tabela(metrologia, [90, 90, 90, 90], por_coluna=True)
+    else:
+        for linha in metrologia:
+            resultados.linha(" ".join(linha))
+
+    if tipo in ("PT", "DPT"):
+        resultados.linha("Calibration curve: y = 4,000 + 0,0064 . x")
+
+    paginas.append(resultados)
+    return montar_pdf(paginas)
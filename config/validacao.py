@@ -0,0 +1,262 @@
+"""
+Configuração da validação: instalações aceitas no LOCAL do certificado,
+limites por tipo de instrumento e códigos de TAG de cada tipo.
+
+Fica fora de validation porque a classificação do certificado
+(pdf.classificador) também usa os códigos de TAG.
+
+Lida de config_validacao.json (ou do arquivo em AC_CONFIG_VALIDACAO) e
+compilada uma vez (ConfigValidacao). configuracao() confere a data de
+modificação do arquivo no máximo a cada INTERVALO_VERIFICACAO segundos e
+recompila quando ele muda: incluir uma instalação ou alterar um limite
+não exige gerar o executável de novo nem reiniciar o programa.
+
+Sem o arquivo vale PADRAO. Chaves ausentes no arquivo também ficam com o
+valor de PADRAO; "limites" é mesclado campo a campo. Um arquivo inválido
+é ignorado (com aviso) e a configuração anterior continua valendo.
+
+    {
+        "instalacoes": {"FPSO FRADE": ["FPSO", "FRADE"], ...},
+        "limites": {
+            "incerteza": 0.1,
+            "por_tipo": {"PT": {"incerteza": 0.05}, ...}
+        },
+        "codigos_tag": {"PIT": "PT", ...}
+    }
+"""
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from pdf.parser_certificados import normalizar_texto
+
+
+caminho_config = os.environ.get("AC_CONFIG_VALIDACAO", "config_validacao.json")
+
+# Segundos entre duas verificações do arquivo
+INTERVALO_VERIFICACAO = 2.0
+
+# Locais distintos guardados com a instalação reconhecida
+MAX_LOCAIS = 4096
+
+# Ordem em que os tipos são procurados na TAG (a mesma das verificações
+# da AC antes da classificação única): "20-TIT-1001-TE" é TE. Tipos que
+# não estão aqui são procurados por último.
+PRECEDENCIA_TAG = ("TE", "TT", "PT", "DPT")
+
+PADRAO = {
+    # Instalação → palavras que precisam aparecer no LOCAL
+    "instalacoes": {
+        "FPSO FRADE": ["FPSO", "FRADE"],
+        "FPSO FORTE": ["FPSO", "FORTE"],
+        "FPSO BRAVO": ["FPSO", "BRAVO"],
+        "POLVO": ["POLVO"]
+    },
+    "limites": {
+        # Incerteza global e erro fiducial (%)
+        "incerteza": 0.1,
+        "erro_fiducial": 0.1,
+        # Distância entre o primeiro/último ponto e o range (fração do span)
+        "margem_extremos": 0.01,
+        # Diferença aceita entre o k de um ponto e o k da maioria
+        "tolerancia_k": 0.01,
+        # Valores de "limites" próprios de cada tipo
+        "por_tipo": {}
+    },
+    # Código de instrumento na TAG (ex.: 20-PIT-1001) → tipo; ver
+    # ConfigValidacao.tipo_da_tag
+    "codigos_tag": {
+        "TE": "TE",
+        "TT": "TT",
+        "TIT": "TT",
+        "TI": "TT",
+        "PT": "PT",
+        "PIT": "PT",
+        "DPT": "DPT",
+        "PDT": "DPT",
+        "PDIT": "DPT",
+        "DPIT": "DPT"
+    }
+}
+
+
+class Limites:
+    """
+    Limites de um tipo de instrumento.
+    """
+    __slots__ = ("incerteza", "erro_fiducial", "margem_extremos", "tolerancia_k")
+
+    def __init__(self, valores):
+        self.incerteza = float(valores["incerteza"])
+        self.erro_fiducial = float(valores["erro_fiducial"])
+        self.margem_extremos = float(valores["margem_extremos"])
+        self.tolerancia_k = float(valores["tolerancia_k"])
+
+    def __repr__(self):
+        return f"Limites(incerteza={self.incerteza}, erro_fiducial={self.erro_fiducial})"
+
+
+class ConfigValidacao:
+    """
+    Configuração compilada: as consultas das regras não refazem nenhum
+    trabalho por certificado.
+
+    - instalacao(local): as palavras de todas as instalações são
+      procuradas uma única vez no LOCAL, e o resultado de cada LOCAL
+      distinto fica guardado;
+    - limites(tipo): Limites do tipo (ou os gerais);
+    - tipo_da_tag(tag): uma expressão por tipo, com todos os seus códigos.
+    """
+    __slots__ = (
+        "instalacoes", "_palavras", "_requisitos", "_locais",
+        "_limites", "_limites_gerais",
+        "_codigos", "_re_tipos", "assinatura_tags"
+    )
+
+    def __init__(self, dados):
+        # Instalações
+        self.instalacoes = tuple(dados["instalacoes"])
+        self._requisitos = tuple(
+            (nome, frozenset(normalizar_texto(p) for p in palavras if p))
+            for nome, palavras in dados["instalacoes"].items()
+        )
+        self._palavras = tuple(sorted(set().union(*(r for _, r in self._requisitos))))
+        self._locais = {}
+
+        # Limites
+        limites = dict(dados["limites"])
+        por_tipo = limites.pop("por_tipo", None) or {}
+        self._limites_gerais = Limites(limites)
+        self._limites = {
+            tipo: Limites({**limites, **proprios})
+            for tipo, proprios in por_tipo.items()
+        }
+
+        # Códigos de TAG: início da TAG, segmento do meio ("-PIT-") ou
+        # último segmento ("-TE")
+        self._codigos = {codigo.upper(): tipo for codigo, tipo in dados["codigos_tag"].items()}
+        tipos = sorted(
+            set(self._codigos.values()),
+            key=lambda t: PRECEDENCIA_TAG.index(t) if t in PRECEDENCIA_TAG else len(PRECEDENCIA_TAG)
+        )
+        self._re_tipos = []
+        for tipo in tipos:
+            alternativas = "|".join(re.escape(c) for c, t in self._codigos.items() if t == tipo)
+            self._re_tipos.append((tipo, re.compile(rf"^(?:{alternativas})|-(?:{alternativas})(?:-|$)")))
+        self.assinatura_tags = hashlib.sha256(
+            json.dumps(sorted(self._codigos.items())).encode()
+        ).hexdigest()[:8]
+
+    def instalacao(self, local_normalizado):
+        """
+        Nome da instalação do LOCAL (já normalizado), ou None.
+        """
+        try:
+            return self._locais[local_normalizado]
+        except KeyError:
+            pass
+
+        presentes = {p for p in self._palavras if p in local_normalizado}
+        nome = next((nome for nome, requisitos in self._requisitos if requisitos <= presentes), None)
+
+        if len(self._locais) < MAX_LOCAIS:
+            self._locais[local_normalizado] = nome
+        return nome
+
+    def limites(self, tipo):
+        return self._limites.get(tipo, self._limites_gerais)
+
+    def tipo_da_tag(self, tag):
+        """
+        Primeiro tipo, na ordem de PRECEDENCIA_TAG, com um código na TAG;
+        None se nenhum for reconhecido.
+        """
+        if not tag:
+            return None
+        tag = tag.upper()
+        for tipo, expressao in self._re_tipos:
+            if expressao.search(tag):
+                return tipo
+        return None
+
+    def __repr__(self):
+        return f"ConfigValidacao({len(self.instalacoes)} instalações, {len(self._codigos)} códigos de TAG)"
+
+
+def _mesclar(arquivo):
+    dados = copy.deepcopy(PADRAO)
+    for chave, valor in arquivo.items():
+        if chave == "limites":
+            por_tipo = valor.get("por_tipo")
+            dados["limites"].update({k: v for k, v in valor.items() if k != "por_tipo"})
+            if por_tipo is not None:
+                for tipo, proprios in por_tipo.items():
+                    dados["limites"]["por_tipo"].setdefault(tipo, {}).update(proprios)
+        elif chave in PADRAO:
+            dados[chave] = valor
+        else:
+            print(f"Configuração da validação: chave desconhecida ignorada: {chave}")
+    return dados
+
+
+def compilar(arquivo=None):
+    """
+    ConfigValidacao de PADRAO com as chaves do dicionário arquivo.
+    """
+    return ConfigValidacao(_mesclar(arquivo or {}))
+
+
+_atual = None
+_origem = None          # (caminho, data de modificação) de _atual
+_verificado = 0.0
+_trava = threading.Lock()
+
+
+def _modificacao(caminho):
+    try:
+        return os.stat(caminho).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _carregar(caminho, modificacao):
+    if modificacao is None:
+        return compilar()
+    with open(caminho, encoding="utf-8") as f:
+        return compilar(json.load(f))
+
+
+def recarregar():
+    """
+    Confere o arquivo agora e recompila se ele mudou. Retorna a
+    configuração em uso.
+    """
+    global _atual, _origem, _verificado
+
+    with _trava:
+        _verificado = time.monotonic()
+        origem = (caminho_config, _modificacao(caminho_config))
+        if _atual is not None and origem == _origem:
+            return _atual
+
+        try:
+            _atual = _carregar(*origem)
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+            print(f"Configuração da validação inválida ({caminho_config}): {e}")
+            if _atual is None:
+                _atual = compilar()
+        _origem = origem
+        return _atual
+
+
+def configuracao():
+    """
+    Configuração em uso, recompilada se o arquivo mudou.
+    """
+    if _atual is not None and time.monotonic() - _verificado < INTERVALO_VERIFICACAO:
+        return _atual
+    return recarregar()
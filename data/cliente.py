@@ -0,0 +1,194 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from data.repositorio import ResolucaoInstrumento
+
+
+# Serviço de banco compartilhado (data.servico), "host:porta". Sem ele, o
+# instrumentos.db local é aberto diretamente.
+endereco = os.environ.get("AC_SERVIDOR_BANCO") or None
+token = os.environ.get("AC_SERVIDOR_TOKEN") or None
+
+TIMEOUT = 30
+
+_cliente = None
+_trava = threading.Lock()
+_thread = threading.local()
+
+
+class ErroServidor(Exception):
+    pass
+
+
+def usar_banco_local():
+    """
+    A thread atual passa a usar o arquivo local mesmo com endereco
+    configurado (threads do próprio serviço de banco).
+    """
+    _thread.local = True
+
+
+def cliente_configurado():
+    """
+    ClienteBanco do endereço configurado, ou None se o banco é local.
+    """
+    global _cliente
+    if not endereco or getattr(_thread, "local", False):
+        return None
+
+    with _trava:
+        if _cliente is None or (_cliente.endereco, _cliente.token) != (endereco, token):
+            _cliente = ClienteBanco(endereco, token)
+        return _cliente
+
+
+class ClienteBanco:
+    """
+    Mesmas operações do InstrumentRepository, atendidas pelo serviço de
+    banco (data.servico). Uma conexão TCP por thread, reaberta se cair.
+
+    Dentro de transacao() as escritas são acumuladas e enviadas numa única
+    requisição ao sair do bloco, aplicadas pelo serviço num único commit.
+    Consultas feitas dentro do bloco ainda não enxergam essas escritas.
+    """
+
+    def __init__(self, endereco, token=None):
+        self.endereco = endereco
+        host, _, porta = endereco.rpartition(":")
+        self._destino = (host or "127.0.0.1", int(porta))
+        self.token = token
+        self._local = threading.local()
+
+    # Conexão
+
+    def _conexao(self):
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            sock = socket.create_connection(self._destino, timeout=TIMEOUT)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conexao = (sock, sock.makefile("rb"))
+            self._local.conexao = conexao
+        return conexao
+
+    def fechar(self):
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is not None:
+            self._local.conexao = None
+            conexao[1].close()
+            conexao[0].close()
+
+    def _enviar(self, requisicao):
+        sock, leitura = self._conexao()
+        try:
+            sock.sendall(requisicao)
+            linha = leitura.readline()
+        except OSError:
+            self.fechar()
+            raise
+        if not linha:
+            self.fechar()
+            raise ConnectionError(f"Serviço de banco {self.endereco} encerrou a conexão")
+        return json.loads(linha)
+
+    def chamar(self, op, *args):
+        requisicao = json.dumps({"op": op, "args": args, "token": self.token}, default=str).encode("utf-8") + b"\n"
+        try:
+            resposta = self._enviar(requisicao)
+        except OSError:
+            # Conexão antiga (ex.: serviço reiniciado): só repete consultas,
+            # uma escrita pode já ter sido aplicada
+            if op in _ESCRITAS or op == "transacao":
+                raise
+            resposta = self._enviar(requisicao)
+
+        if resposta["ok"]:
+            return resposta["resultado"]
+        if resposta["tipo"] == "IntegrityError":
+            raise sqlite3.IntegrityError(resposta["erro"])
+        raise ErroServidor(f"{resposta['tipo']}: {resposta['erro']}")
+
+    # Transação
+
+    @contextmanager
+    def transacao(self):
+        nivel = getattr(self._local, "nivel", 0)
+        if nivel == 0:
+            self._local.pendentes = []
+        self._local.nivel = nivel + 1
+        try:
+            yield self
+        except Exception:
+            self._local.nivel = nivel
+            if nivel == 0:
+                self._local.pendentes = []
+            raise
+        else:
+            self._local.nivel = nivel
+            if nivel == 0:
+                pendentes, self._local.pendentes = self._local.pendentes, []
+                if pendentes:
+                    self.chamar("transacao", *pendentes)
+
+    def _escrever(self, op, *args):
+        if getattr(self._local, "nivel", 0):
+            self._local.pendentes.append((op, args))
+            return None
+        return self.chamar(op, *args)
+
+    # Operações (mesmas assinaturas do InstrumentRepository)
+
+    def inserir(self, tag, sn_instrumento, sn_sensor=None, min_range=None, max_range=None):
+        self._escrever("inserir", tag, sn_instrumento, sn_sensor, min_range, max_range)
+
+    def buscar_por_tag(self, tag):
+        return self.chamar("buscar_por_tag", tag)
+
+    def buscar_por_sn_instrumento(self, sn):
+        return self.chamar("buscar_por_sn_instrumento", sn)
+
+    def buscar_por_sn_sensor(self, sn_sensor):
+        return self.chamar("buscar_por_sn_sensor", sn_sensor)
+
+    def resolver(self, tag, sn_instrumento=None, sn_sensor=None):
+        return ResolucaoInstrumento.de_dict(self.chamar("resolver", tag, sn_instrumento, sn_sensor))
+
+    def resolver_varios(self, chaves):
+        return [ResolucaoInstrumento.de_dict(r) for r in self.chamar("resolver_varios", chaves)]
+
+    def sugerir(self, tag, sn_instrumento=None, sn_sensor=None, k=5):
+        return self.chamar("sugerir", tag, sn_instrumento, sn_sensor, k)
+
+    def atualizar_sn(self, tag, novo_sn):
+        self._escrever("atualizar_sn", tag, novo_sn)
+
+    def atualizar_sn_sensor(self, tag, novo_sn_sensor):
+        self._escrever("atualizar_sn_sensor", tag, novo_sn_sensor)
+
+    def atualizar_tag(self, tag, nova_tag):
+        self._escrever("atualizar_tag", tag, nova_tag)
+
+    def atualizar_range(self, tag, min_range, max_range):
+        self._escrever("atualizar_range", tag, min_range, max_range)
+
+    # Histórico (data.historico)
+
+    def registrar_calibracao(self, dados_pdf, pontos, arquivo=None):
+        return self._escrever("registrar_calibracao", dados_pdf, pontos, arquivo)
+
+    def buscar_calibracoes(self, *args):
+        return self.chamar("buscar_calibracoes", *args)
+
+    def ultima_calibracao(self, *args):
+        return self.chamar("ultima_calibracao", *args)
+
+    def pontos_da_calibracao(self, calibracao_id):
+        return self.chamar("pontos_da_calibracao", calibracao_id)
+
+
+_ESCRITAS = {
+    "inserir", "atualizar_sn", "atualizar_sn_sensor", "atualizar_tag", "atualizar_range", "registrar_calibracao"
+}
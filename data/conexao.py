@@ -6,20 +6,8 @@ def conectar():
     return sqlite3.connect(db_path)
 
 def criar_tabela():
-    conn = conectar()
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS instrumentos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tag TEXT NOT NULL,
-            sn_instrumento TEXT NOT NULL,
-            sn_sensor TEXT,
-            min_range REAL,
-            max_range REAL
-                       
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-
+    """
+    Cria ou atualiza o esquema do banco (ver data.migracoes).
+    """
+    from data.migracoes import migrar
+    migrar()
@@ -0,0 +1,220 @@
+from datetime import datetime
+
+from data.cliente import cliente_configurado
+from data.repositorio import repositorio
+from telemetria.rastreio import rastrear
+
+
+# Colunas de calibracoes devolvidas pelas consultas (na ordem do SELECT)
+COLUNAS = (
+    "id", "certificado", "tag", "sn_instrumento", "sn_sensor", "tipo",
+    "data_calibracao", "data_emissao", "local", "min_range", "max_range",
+    "erro_fid", "incerteza", "arquivo", "registrada_em"
+)
+COLUNAS_PONTO = ("referencia", "media", "tendencia", "incerteza", "k")
+
+_SELECT = "SELECT " + ", ".join(COLUNAS) + " FROM calibracoes"
+
+_SQL_ID = "SELECT id FROM calibracoes WHERE certificado = ? AND tag = ?"
+_SQL_INSERIR = """
+    INSERT INTO calibracoes (
+        certificado, tag, sn_instrumento, sn_sensor, tipo, data_calibracao, data_emissao,
+        local, min_range, max_range, erro_fid, incerteza, arquivo, registrada_em
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_ATUALIZAR = """
+    UPDATE calibracoes SET
+        certificado = ?, tag = ?, sn_instrumento = ?, sn_sensor = ?, tipo = ?, data_calibracao = ?,
+        data_emissao = ?, local = ?, min_range = ?, max_range = ?, erro_fid = ?, incerteza = ?,
+        arquivo = ?, registrada_em = ?
+    WHERE id = ?
+"""
+_SQL_APAGAR_PONTOS = "DELETE FROM pontos_calibracao WHERE calibracao_id = ?"
+_SQL_INSERIR_PONTO = """
+    INSERT INTO pontos_calibracao (calibracao_id, ordem, referencia, media, tendencia, incerteza, k)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_PONTOS = """
+    SELECT calibracao_id, referencia, media, tendencia, incerteza, k
+    FROM pontos_calibracao
+    WHERE calibracao_id IN ({0})
+    ORDER BY calibracao_id, ordem
+"""
+_SQL_POR_TAG = _SELECT + " WHERE tag = ? ORDER BY data_calibracao DESC, id DESC"
+_SQL_ANTERIOR = _SELECT + """
+    WHERE tag = ? AND data_calibracao < ?
+    ORDER BY data_calibracao DESC, id DESC
+    LIMIT 1
+"""
+
+
+def data_iso(data):
+    """
+    "10/01/2025" (formato dos certificados) ou "2025-01-10" → "2025-01-10".
+    None se a data não for reconhecida.
+    """
+    if not data:
+        return None
+    for formato in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(str(data).strip(), formato).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _linha(row):
+    return dict(zip(COLUNAS, row))
+
+
+@rastrear("historico.registrar", "arquivo")
+def registrar_calibracao(dados_pdf, pontos, arquivo=None):
+    """
+    Grava o certificado e os seus pontos no histórico. Reprocessar o mesmo
+    certificado (número e TAG) substitui o registro anterior.
+
+    Usa a transação em andamento do repositório, se houver (na geração da
+    AC/XML, a da UnidadeDeTrabalho). Retorna o id em calibracoes, ou None
+    se o certificado não tiver número ou TAG (ou se for gravado pelo
+    serviço de banco dentro de uma transação, enviada só no commit).
+    """
+    remoto = cliente_configurado()
+    if remoto is not None:
+        return remoto.registrar_calibracao(dados_pdf, pontos, arquivo)
+
+    certificado, tag = dados_pdf.get("certificado"), dados_pdf.get("tag")
+    if not certificado or not tag:
+        print(f"Aviso: certificado sem número ou TAG não foi gravado no histórico ({arquivo})")
+        return None
+
+    valores = (
+        certificado,
+        tag,
+        dados_pdf.get("sn_instrumento"),
+        dados_pdf.get("sn_sensor"),
+        dados_pdf.get("tipo") or (pontos[0].get("tipo") if pontos else None),
+        data_iso(dados_pdf.get("data")),
+        data_iso(dados_pdf.get("report_date")),
+        dados_pdf.get("local"),
+        dados_pdf.get("min_range"),
+        dados_pdf.get("max_range"),
+        dados_pdf.get("erro_fid"),
+        dados_pdf.get("incerteza"),
+        arquivo,
+        datetime.now().isoformat(timespec="seconds")
+    )
+
+    with repositorio.transacao():
+        conn = repositorio.conexao()
+        row = conn.execute(_SQL_ID, (certificado, tag)).fetchone()
+        if row:
+            calibracao_id = row[0]
+            conn.execute(_SQL_ATUALIZAR, valores + (calibracao_id,))
+            conn.execute(_SQL_APAGAR_PONTOS, (calibracao_id,))
+        else:
+            calibracao_id = conn.execute(_SQL_INSERIR, valores).lastrowid
+
+        conn.executemany(_SQL_INSERIR_PONTO, [
+            (calibracao_id, ordem) + tuple(p.get(c) for c in COLUNAS_PONTO)
+            for ordem, p in enumerate(pontos or ())
+        ])
+
+    return calibracao_id
+
+
+def _anexar_pontos(calibracoes):
+    if not calibracoes:
+        return calibracoes
+
+    por_id = {c["id"]: c for c in calibracoes}
+    for c in calibracoes:
+        c["pontos"] = []
+
+    ids = list(por_id)
+    conn = repositorio.conexao()
+    # Mesmo limite de parâmetros das consultas em lote do repositório
+    for inicio in range(0, len(ids), 500):
+        bloco = ids[inicio:inicio + 500]
+        for row in conn.execute(_SQL_PONTOS.format(", ".join("?" * len(bloco))), bloco):
+            por_id[row[0]]["pontos"].append(dict(zip(COLUNAS_PONTO, row[1:])))
+
+    return calibracoes
+
+
+def pontos_da_calibracao(calibracao_id):
+    """
+    Pontos gravados, na ordem do certificado, no formato de
+    extrair_pontos_calibracao_pdf (sem o "tipo").
+    """
+    remoto = cliente_configurado()
+    if remoto is not None:
+        return remoto.pontos_da_calibracao(calibracao_id)
+    return _anexar_pontos([{"id": calibracao_id}])[0]["pontos"]
+
+
+def sql_busca(tag=None, sn_instrumento=None, desde=None, ate=None, limite=None):
+    """
+    SQL e parâmetros de buscar_calibracoes.
+    """
+    condicoes, parametros = [], []
+    if tag is not None:
+        condicoes.append("tag = ?")
+        parametros.append(tag)
+    if sn_instrumento is not None:
+        condicoes.append("sn_instrumento = ?")
+        parametros.append(sn_instrumento)
+    if desde is not None:
+        condicoes.append("data_calibracao >= ?")
+        parametros.append(data_iso(desde))
+    if ate is not None:
+        condicoes.append("data_calibracao <= ?")
+        parametros.append(data_iso(ate))
+
+    sql = _SELECT
+    if condicoes:
+        sql += " WHERE " + " AND ".join(condicoes)
+    sql += " ORDER BY data_calibracao DESC, id DESC"
+    if limite is not None:
+        sql += " LIMIT ?"
+        parametros.append(limite)
+
+    return sql, parametros
+
+
+@rastrear("historico.buscar", "tag", "sn_instrumento")
+def buscar_calibracoes(tag=None, sn_instrumento=None, desde=None, ate=None, limite=None, com_pontos=False):
+    """
+    Calibrações registradas, da mais recente para a mais antiga, filtradas
+    por TAG e/ou SN do instrumento e pelo intervalo de datas de calibração
+    (desde/ate inclusivos, em dd/mm/aaaa ou AAAA-MM-DD).
+    """
+    remoto = cliente_configurado()
+    if remoto is not None:
+        return remoto.buscar_calibracoes(tag, sn_instrumento, desde, ate, limite, com_pontos)
+
+    sql, parametros = sql_busca(tag, sn_instrumento, desde, ate, limite)
+    calibracoes = [_linha(row) for row in repositorio.conexao().execute(sql, parametros)]
+    return _anexar_pontos(calibracoes) if com_pontos else calibracoes
+
+
+@rastrear("historico.ultima", "tag")
+def ultima_calibracao(tag, antes_de=None, com_pontos=True):
+    """
+    Calibração mais recente da TAG; com antes_de, a última anterior a essa
+    data (a calibração anterior à de um certificado novo). None se não houver.
+    """
+    remoto = cliente_configurado()
+    if remoto is not None:
+        return remoto.ultima_calibracao(tag, antes_de, com_pontos)
+
+    conn = repositorio.conexao()
+    if antes_de is None:
+        row = conn.execute(_SQL_POR_TAG + " LIMIT 1", (tag,)).fetchone()
+    else:
+        row = conn.execute(_SQL_ANTERIOR, (tag, data_iso(antes_de))).fetchone()
+
+    if row is None:
+        return None
+    calibracao = _linha(row)
+    return _anexar_pontos([calibracao])[0] if com_pontos else calibracao
@@ -0,0 +1,257 @@
+import csv
+import os
+
+from data.repositorio import CHAVES_POR_CONSULTA, extrair_tag_base, repositorio
+from telemetria.rastreio import span
+
+
+# Colunas da planilha de cadastro (mesma ordem na importação e na exportação)
+COLUNAS = ("tag", "sn_instrumento", "sn_sensor", "min_range", "max_range")
+
+# Linhas por executemany (e por consulta de conflitos ao banco)
+TAMANHO_LOTE = CHAVES_POR_CONSULTA
+
+# A TAG é a chave (índice único). Campos vazios na planilha não apagam o
+# que já está cadastrado.
+_SQL_UPSERT = """
+    INSERT INTO instrumentos (tag, sn_instrumento, sn_sensor, min_range, max_range)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(tag) DO UPDATE SET
+        sn_instrumento = excluded.sn_instrumento,
+        sn_sensor = COALESCE(excluded.sn_sensor, sn_sensor),
+        min_range = COALESCE(excluded.min_range, min_range),
+        max_range = COALESCE(excluded.max_range, max_range)
+"""
+_SQL_EXISTENTES = """
+    SELECT tag, sn_instrumento
+    FROM instrumentos
+    WHERE tag IN ({0}) OR sn_instrumento IN ({0})
+"""
+_SQL_EXPORTAR = """
+    SELECT tag, sn_instrumento, sn_sensor, min_range, max_range
+    FROM instrumentos
+    ORDER BY tag
+"""
+
+
+class ImportacaoCancelada(Exception):
+    pass
+
+
+def _texto(valor):
+    if valor is None:
+        return None
+    valor = str(valor).strip()
+    return valor or None
+
+
+def _real(valor):
+    if valor is None or valor == "":
+        return None
+    try:
+        return float(str(valor).replace(",", "."))
+    except ValueError:
+        raise ValueError(f"range inválido: {valor}")
+
+
+def _linhas_csv(caminho):
+    with open(caminho, newline="", encoding="utf-8-sig") as f:
+        amostra = f.read(4096)
+        f.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=";,\t")
+        except csv.Error:
+            dialeto = csv.excel
+        yield from csv.reader(f, dialeto)
+
+
+def _linhas_xlsx(caminho):
+    import openpyxl
+
+    wb = openpyxl.load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def ler_planilha(caminho):
+    """
+    Lê o cadastro de um CSV (separador , ; ou tab) ou XLSX (primeira aba)
+    sem carregar o arquivo inteiro. A primeira linha deve ter os nomes de
+    COLUNAS (maiúsculas ou minúsculas, em qualquer ordem).
+
+    Gera (número da linha, dict com as colunas).
+    """
+    if os.path.splitext(caminho)[1].lower() in (".xlsx", ".xlsm"):
+        linhas = _linhas_xlsx(caminho)
+    else:
+        linhas = _linhas_csv(caminho)
+
+    cabecalho = next(linhas, None) or ()
+    posicoes = {str(nome or "").strip().lower(): i for i, nome in enumerate(cabecalho)}
+    faltando = [c for c in COLUNAS[:2] if c not in posicoes]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes no cabeçalho: {', '.join(faltando)}")
+
+    for numero, valores in enumerate(linhas, start=2):
+        if not any(v not in (None, "") for v in valores):
+            continue
+        yield numero, {
+            c: valores[posicoes[c]] if c in posicoes and posicoes[c] < len(valores) else None
+            for c in COLUNAS
+        }
+
+
+def _normalizar(campos):
+    tag = _texto(campos["tag"])
+    sn = _texto(campos["sn_instrumento"])
+    if not tag:
+        raise ValueError("TAG vazia")
+    if not sn:
+        raise ValueError("SN do instrumento vazio")
+
+    return (
+        tag.upper(),
+        sn,
+        _texto(campos["sn_sensor"]),
+        _real(campos["min_range"]),
+        _real(campos["max_range"])
+    )
+
+
+def _em_lotes(iteravel, tamanho):
+    lote = []
+    for item in iteravel:
+        lote.append(item)
+        if len(lote) == tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _gravar_lote(conn, lote, sn_arquivo, relatorio):
+    """
+    Separa as linhas em conflito (SN já usado por outra TAG, fora da
+    família MVS, no banco ou em linha anterior do arquivo) e grava as
+    demais num único executemany.
+    """
+    marcadores = ", ".join("?" * len(lote))
+    tags_banco = set()
+    sn_banco = {}
+    for tag, sn in conn.execute(
+        _SQL_EXISTENTES.format(marcadores),
+        [l[1][0] for l in lote] + [l[1][1] for l in lote]
+    ):
+        tags_banco.add(tag)
+        sn_banco.setdefault(sn, []).append(tag)
+
+    gravar = []
+    for numero, linha in lote:
+        tag, sn = linha[0], linha[1]
+        outras = [t for t in sn_banco.get(sn, ()) if t != tag]
+        if sn in sn_arquivo and sn_arquivo[sn] != tag:
+            outras.append(sn_arquivo[sn])
+
+        conflito = next((t for t in outras if extrair_tag_base(t) != extrair_tag_base(tag)), None)
+        if conflito:
+            relatorio["conflitos"].append({"linha": numero, "tag": tag, "sn_instrumento": sn, "tag_existente": conflito})
+            continue
+
+        sn_arquivo.setdefault(sn, tag)
+        if tag in tags_banco:
+            relatorio["atualizadas"] += 1
+        else:
+            relatorio["inseridas"] += 1
+            tags_banco.add(tag)
+        gravar.append(linha)
+
+    conn.executemany(_SQL_UPSERT, gravar)
+
+
+def importar_instrumentos(caminho, simular=False):
+    """
+    Importa o cadastro de instrumentos de um CSV/XLSX (ver ler_planilha).
+
+    Cada TAG é inserida ou atualizada (upsert) em lotes de TAMANHO_LOTE,
+    todos na mesma transação: um erro no meio do arquivo não deixa o
+    cadastro pela metade. Linhas inválidas e conflitos não são gravados e
+    aparecem no relatório. Com simular=True nada é gravado.
+
+    Retorna o relatório: lidas, inseridas, atualizadas, conflitos e
+    invalidas.
+    """
+    relatorio = {"lidas": 0, "inseridas": 0, "atualizadas": 0, "conflitos": [], "invalidas": []}
+
+    def validas():
+        for numero, campos in ler_planilha(caminho):
+            relatorio["lidas"] += 1
+            try:
+                yield numero, _normalizar(campos)
+            except ValueError as e:
+                relatorio["invalidas"].append({"linha": numero, "erro": str(e)})
+
+    conn = repositorio.conexao()
+    unico = conn.execute(
+        "SELECT \"unique\" FROM pragma_index_list('instrumentos') WHERE name = 'idx_instrumentos_tag'"
+    ).fetchone()
+    if not unico or not unico[0]:
+        raise ValueError("O banco tem TAGs repetidas (índice de TAG não é único); corrija antes de importar.")
+
+    with span("cadastro.importar", arquivo=os.path.basename(caminho)) as s:
+        sn_arquivo = {}
+        try:
+            with repositorio.transacao():
+                for lote in _em_lotes(validas(), TAMANHO_LOTE):
+                    _gravar_lote(conn, lote, sn_arquivo, relatorio)
+                if simular:
+                    raise ImportacaoCancelada()
+        except ImportacaoCancelada:
+            pass
+
+        s.definir(
+            lidas=relatorio["lidas"],
+            inseridas=relatorio["inseridas"],
+            atualizadas=relatorio["atualizadas"],
+            conflitos=len(relatorio["conflitos"])
+        )
+
+    # A importação não passa pelo write-through; recarrega o índice em uso
+    # e remonta o de similaridade na próxima busca
+    if not simular:
+        if repositorio.indice is not None:
+            repositorio.usar_indice()
+        repositorio.descartar_similaridade()
+
+    return relatorio
+
+
+def exportar_instrumentos(caminho):
+    """
+    Exporta o cadastro para CSV (separador ;) ou XLSX, conforme a extensão,
+    lendo o banco linha a linha. Retorna o número de instrumentos.
+    """
+    cursor = repositorio.conexao().execute(_SQL_EXPORTAR)
+    total = 0
+
+    with span("cadastro.exportar", arquivo=os.path.basename(caminho)):
+        if os.path.splitext(caminho)[1].lower() == ".xlsx":
+            import openpyxl
+
+            wb = openpyxl.Workbook(write_only=True)
+            ws = wb.create_sheet("instrumentos")
+            ws.append(COLUNAS)
+            for row in cursor:
+                ws.append(row)
+                total += 1
+            wb.save(caminho)
+        else:
+            with open(caminho, "w", newline="", encoding="utf-8-sig") as f:
+                escritor = csv.writer(f, delimiter=";")
+                escritor.writerow(COLUNAS)
+                for row in cursor:
+                    escritor.writerow(row)
+                    total += 1
+
+    return total
@@ -0,0 +1,197 @@
+import threading
+
+from data.repositorio import ResolucaoInstrumento, extrair_tag_base
+
+
+_SQL_TODOS = """
+    SELECT id, tag, sn_instrumento, sn_sensor, min_range, max_range
+    FROM instrumentos
+    ORDER BY id
+"""
+
+
+class LinhaInstrumento:
+    __slots__ = ("id", "tag", "sn_instrumento", "sn_sensor", "min_range", "max_range")
+
+    def __init__(self, id, tag, sn_instrumento, sn_sensor, min_range, max_range):
+        self.id = id
+        self.tag = tag
+        self.sn_instrumento = sn_instrumento
+        self.sn_sensor = sn_sensor
+        self.min_range = min_range
+        self.max_range = max_range
+
+    def tupla(self):
+        return (self.id, self.tag, self.sn_instrumento, self.sn_sensor, self.min_range, self.max_range)
+
+
+# Conversões equivalentes às afinidades TEXT e REAL das colunas, para que
+# os valores escritos aqui sejam iguais aos lidos do banco depois
+def texto_coluna(valor):
+    if valor is None or isinstance(valor, (str, bytes)):
+        return valor
+    return str(valor)
+
+
+def real_coluna(valor):
+    if isinstance(valor, bool) or not isinstance(valor, (int, float, str)):
+        return valor
+    try:
+        return float(valor)
+    except ValueError:
+        return valor
+
+
+def _adicionar(mapa, chave, linha):
+    if chave is not None:
+        mapa.setdefault(chave, []).append(linha)
+
+
+def _remover(mapa, chave, linha):
+    linhas = mapa.get(chave)
+    if linhas is None:
+        return
+    linhas.remove(linha)
+    if not linhas:
+        del mapa[chave]
+
+
+class IndiceInstrumentos:
+    """
+    Cópia em memória da tabela instrumentos, com dicionários por TAG, SN
+    do instrumento, SN do sensor e TAG base (família MVS). Cada chave
+    guarda as linhas em ordem de id, como as consultas do repositório.
+
+    Carregada uma vez (carregar) e mantida pelas escritas do
+    InstrumentRepository (write-through). Alterações feitas no banco por
+    outro processo não aparecem aqui.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.por_id = {}
+        self.por_tag = {}
+        self.por_sn = {}
+        self.por_sensor = {}
+        self.por_base = {}
+
+    def __len__(self):
+        return len(self.por_id)
+
+    def carregar(self, conn):
+        with self._trava:
+            self.por_id, self.por_tag, self.por_sn, self.por_sensor, self.por_base = {}, {}, {}, {}, {}
+            for row in conn.execute(_SQL_TODOS):
+                self._indexar(LinhaInstrumento(*row))
+        return self
+
+    def _indexar(self, linha):
+        self.por_id[linha.id] = linha
+        _adicionar(self.por_tag, linha.tag, linha)
+        _adicionar(self.por_sn, linha.sn_instrumento, linha)
+        _adicionar(self.por_sensor, linha.sn_sensor, linha)
+        _adicionar(self.por_base, extrair_tag_base(linha.tag), linha)
+
+    # Consultas (mesmo formato de data.repositorio)
+
+    def _primeira(self, mapa, chave):
+        linhas = mapa.get(chave)
+        return linhas[0] if linhas else None
+
+    def buscar_por_tag(self, tag):
+        linha = self._primeira(self.por_tag, tag)
+        if linha is None:
+            return None
+
+        return {
+            "tag": linha.tag,
+            "sn_instrumento": linha.sn_instrumento,
+            "sn_sensor": linha.sn_sensor,
+            "min_range": linha.min_range,
+            "max_range": linha.max_range
+        }
+
+    def _resumo(self, linha):
+        if linha is None:
+            return None
+
+        return {
+            "tag": linha.tag,
+            "sn_instrumento": linha.sn_instrumento,
+            "sn_sensor": linha.sn_sensor
+        }
+
+    def buscar_por_sn_instrumento(self, sn):
+        return self._resumo(self._primeira(self.por_sn, sn))
+
+    def buscar_por_sn_sensor(self, sn_sensor):
+        return self._resumo(self._primeira(self.por_sensor, sn_sensor))
+
+    def familia(self, tag):
+        """
+        Linhas da mesma TAG base (família MVS) da TAG informada.
+        """
+        return list(self.por_base.get(extrair_tag_base(tag), ()))
+
+    def resolver(self, tag, sn_instrumento=None, sn_sensor=None):
+        candidatos = {}
+        for mapa, chave in ((self.por_tag, tag), (self.por_sn, sn_instrumento), (self.por_sensor, sn_sensor)):
+            for linha in mapa.get(chave, ()):
+                candidatos[linha.id] = linha
+
+        rows = [candidatos[i].tupla() for i in sorted(candidatos)]
+        return ResolucaoInstrumento(tag, sn_instrumento, sn_sensor, rows)
+
+    # Write-through: chamados pelo repositório após a escrita no banco
+
+    def inserir(self, id, tag, sn_instrumento, sn_sensor=None, min_range=None, max_range=None):
+        with self._trava:
+            self._indexar(LinhaInstrumento(
+                id, texto_coluna(tag), texto_coluna(sn_instrumento), texto_coluna(sn_sensor), real_coluna(min_range), real_coluna(max_range)
+            ))
+
+    def atualizar_sn(self, tag, novo_sn):
+        novo_sn = texto_coluna(novo_sn)
+        with self._trava:
+            for linha in list(self.por_tag.get(tag, ())):
+                _remover(self.por_sn, linha.sn_instrumento, linha)
+                linha.sn_instrumento = novo_sn
+                _adicionar(self.por_sn, novo_sn, linha)
+                self.por_sn[novo_sn].sort(key=lambda l: l.id)
+
+    def atualizar_sn_sensor(self, tag, novo_sn_sensor):
+        novo_sn_sensor = texto_coluna(novo_sn_sensor)
+        with self._trava:
+            for linha in list(self.por_tag.get(tag, ())):
+                _remover(self.por_sensor, linha.sn_sensor, linha)
+                linha.sn_sensor = novo_sn_sensor
+                _adicionar(self.por_sensor, novo_sn_sensor, linha)
+                if novo_sn_sensor is not None:
+                    self.por_sensor[novo_sn_sensor].sort(key=lambda l: l.id)
+
+    def atualizar_tag(self, tag, nova_tag):
+        nova_tag = texto_coluna(nova_tag)
+        with self._trava:
+            for linha in list(self.por_tag.get(tag, ())):
+                _remover(self.por_tag, linha.tag, linha)
+                _remover(self.por_base, extrair_tag_base(linha.tag), linha)
+                linha.tag = nova_tag
+                _adicionar(self.por_tag, nova_tag, linha)
+                _adicionar(self.por_base, extrair_tag_base(nova_tag), linha)
+            for mapa, chave in ((self.por_tag, nova_tag), (self.por_base, extrair_tag_base(nova_tag))):
+                if chave in mapa:
+                    mapa[chave].sort(key=lambda l: l.id)
+
+    def atualizar_range(self, tag, min_range, max_range):
+        min_range, max_range = real_coluna(min_range), real_coluna(max_range)
+        with self._trava:
+            for linha in self.por_tag.get(tag, ()):
+                linha.min_range = min_range
+                linha.max_range = max_range
+
+    def linhas(self):
+        """
+        Tuplas (id, tag, sn_instrumento, sn_sensor, min_range, max_range) em
+        ordem de id, para conferência com o banco.
+        """
+        return [self.por_id[i].tupla() for i in sorted(self.por_id)]
@@ -0,0 +1,160 @@
+from datetime import datetime
+
+from data.conexao import conectar
+
+
+def _criar_instrumentos(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS instrumentos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tag TEXT NOT NULL,
+            sn_instrumento TEXT NOT NULL,
+            sn_sensor TEXT,
+            min_range REAL,
+            max_range REAL
+        )
+    ''')
+
+
+def tags_duplicadas(conn):
+    return [
+        row[0] for row in conn.execute(
+            "SELECT tag FROM instrumentos GROUP BY tag HAVING COUNT(*) > 1"
+        )
+    ]
+
+
+def _criar_indices(conn):
+    """
+    A TAG identifica o instrumento (só é inserida ou atribuída quando não
+    existe no banco), então o índice é único. O SN do instrumento se
+    repete na família MVS e o do sensor não tem garantia: índices simples.
+
+    Bancos antigos com TAGs repetidas recebem índice simples na TAG, para
+    não perder dados; as repetidas são listadas para correção manual.
+    """
+    duplicadas = tags_duplicadas(conn)
+    if duplicadas:
+        print(f"Aviso: TAGs repetidas no banco, índice de TAG não será único: {', '.join(duplicadas)}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_instrumentos_tag ON instrumentos (tag)")
+    else:
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_instrumentos_tag ON instrumentos (tag)")
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_instrumentos_sn_instrumento ON instrumentos (sn_instrumento)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_instrumentos_sn_sensor ON instrumentos (sn_sensor)")
+
+
+def _criar_historico(conn):
+    """
+    Histórico dos certificados processados (data.historico): uma linha
+    por certificado em calibracoes e os pontos em pontos_calibracao.
+    data_calibracao fica em ISO (AAAA-MM-DD) para ordenar por data.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS calibracoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            certificado TEXT NOT NULL,
+            tag TEXT NOT NULL,
+            sn_instrumento TEXT,
+            sn_sensor TEXT,
+            tipo TEXT,
+            data_calibracao TEXT,
+            data_emissao TEXT,
+            local TEXT,
+            min_range REAL,
+            max_range REAL,
+            erro_fid REAL,
+            incerteza REAL,
+            arquivo TEXT,
+            registrada_em TEXT NOT NULL,
+            UNIQUE (certificado, tag)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pontos_calibracao (
+            calibracao_id INTEGER NOT NULL REFERENCES calibracoes (id),
+            ordem INTEGER NOT NULL,
+            referencia REAL,
+            media REAL,
+            tendencia REAL,
+            incerteza REAL,
+            k REAL,
+            PRIMARY KEY (calibracao_id, ordem)
+        ) WITHOUT ROWID
+    ''')
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_calibracoes_tag_data ON calibracoes (tag, data_calibracao)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_calibracoes_sn_data ON calibracoes (sn_instrumento, data_calibracao)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_calibracoes_data ON calibracoes (data_calibracao)")
+
+
+# Passos em ordem; a versão do esquema é a do último passo aplicado.
+# Nunca alterar um passo já publicado: acrescentar um novo.
+MIGRACOES = [
+    (1, "tabela instrumentos", _criar_instrumentos),
+    (2, "índices de tag, sn_instrumento e sn_sensor", _criar_indices),
+    (3, "histórico de calibrações", _criar_historico),
+]
+
+
+def _criar_schema_version(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            versao INTEGER PRIMARY KEY,
+            descricao TEXT NOT NULL,
+            aplicada_em TEXT NOT NULL
+        )
+    ''')
+
+
+def versao_atual(conn):
+    """
+    Versão do esquema, só com leituras (0 num banco novo): conferir a
+    versão a cada início não bloqueia as outras estações.
+    """
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if not existe:
+        return 0
+    row = conn.execute("SELECT MAX(versao) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrar(conn=None):
+    """
+    Aplica os passos de MIGRACOES ainda não registrados em schema_version,
+    cada um na sua transação. Retorna a versão final do esquema.
+
+    Com o esquema em dia, nada é gravado.
+    """
+    propria = conn is None
+    conn = conn or conectar()
+
+    try:
+        versao = versao_atual(conn)
+
+        for numero, descricao, passo in MIGRACOES:
+            if numero <= versao:
+                continue
+
+            # BEGIN explícito: o sqlite3 não abre transação para DDL
+            conn.execute("BEGIN")
+            try:
+                _criar_schema_version(conn)
+                passo(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (versao, descricao, aplicada_em) VALUES (?, ?, ?)",
+                    (numero, descricao, datetime.now().isoformat(timespec="seconds"))
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            versao = numero
+
+        return versao
+
+    finally:
+        if propria:
+            conn.close()
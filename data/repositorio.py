@@ -0,0 +1,453 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from data import conexao
+
+
+# Ajustes aplicados a cada conexão aberta pelo repositório
+PRAGMAS = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA busy_timeout=5000",
+)
+
+# WAL depende de memória compartilhada num único computador: não é seguro
+# com o instrumentos.db numa pasta de rede (SMB/NFS), onde várias estações
+# abrem o arquivo. Só é ligado quando um processo é o único dono do
+# arquivo: o serviço de data.servico, ou com AC_BANCO_WAL=1.
+PRAGMAS_WAL = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+)
+
+WAL = os.environ.get("AC_BANCO_WAL") == "1"
+
+# Statements preparados mantidos por conexão (sqlite3 reaproveita pelo texto do SQL)
+STATEMENTS_EM_CACHE = 64
+
+_SQL_INSERIR = """
+    INSERT INTO instrumentos (tag, sn_instrumento, sn_sensor, min_range, max_range)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_SQL_POR_TAG = """
+    SELECT tag, sn_instrumento, sn_sensor, min_range, max_range
+    FROM instrumentos
+    WHERE tag = ?
+"""
+_SQL_POR_SN_INSTRUMENTO = """
+    SELECT tag, sn_instrumento, sn_sensor
+    FROM instrumentos
+    WHERE sn_instrumento = ?
+"""
+_SQL_POR_SN_SENSOR = """
+    SELECT tag, sn_instrumento, sn_sensor
+    FROM instrumentos
+    WHERE sn_sensor = ?
+"""
+# Candidatos de um certificado: qualquer linha com a TAG, o SN do
+# instrumento ou o SN do sensor (cada termo usa o seu índice)
+_SQL_CANDIDATOS = """
+    SELECT id, tag, sn_instrumento, sn_sensor, min_range, max_range
+    FROM instrumentos
+    WHERE tag = ? OR sn_instrumento = ? OR sn_sensor = ?
+    ORDER BY id
+"""
+_SQL_CANDIDATOS_VARIOS = """
+    SELECT id, tag, sn_instrumento, sn_sensor, min_range, max_range
+    FROM instrumentos
+    WHERE tag IN ({0}) OR sn_instrumento IN ({0}) OR sn_sensor IN ({0})
+    ORDER BY id
+"""
+
+# Chaves por consulta em lote (3 parâmetros por chave; limite antigo do
+# SQLite é de 999 parâmetros)
+CHAVES_POR_CONSULTA = 300
+
+_SQL_TODOS = "SELECT id, tag, sn_instrumento, sn_sensor FROM instrumentos"
+
+_SQL_ATUALIZAR_SN = "UPDATE instrumentos SET sn_instrumento = ? WHERE tag = ?"
+_SQL_ATUALIZAR_SN_SENSOR = "UPDATE instrumentos SET sn_sensor = ? WHERE tag = ?"
+_SQL_ATUALIZAR_TAG = "UPDATE instrumentos SET tag = ? WHERE tag = ?"
+_SQL_ATUALIZAR_RANGE = "UPDATE instrumentos SET min_range = ?, max_range = ? WHERE tag = ?"
+
+
+def extrair_tag_base(tag: str) -> str:
+    return "-".join(tag.split("-")[:-1]) if "-" in tag else tag
+
+
+def _candidato_completo(row):
+    return {
+        "tag": row[1],
+        "sn_instrumento": row[2],
+        "sn_sensor": row[3],
+        "min_range": row[4],
+        "max_range": row[5]
+    }
+
+
+def _candidato_resumo(row):
+    return {
+        "tag": row[1],
+        "sn_instrumento": row[2],
+        "sn_sensor": row[3]
+    }
+
+
+class ResolucaoInstrumento:
+    """
+    Cadastro encontrado para a TAG e os SNs de um certificado:
+
+    - exato: linha com a mesma TAG (formato de buscar_instrumento_por_tag)
+    - mesmo_sn: primeira linha com o SN do instrumento e outra TAG
+    - mesmo_sensor: primeira linha com o SN do sensor e outra TAG
+    - familia_mvs: mesmo_sn pertence à mesma família (TAG base) do certificado
+    """
+    __slots__ = ("tag", "exato", "mesmo_sn", "mesmo_sensor", "familia_mvs")
+
+    def __init__(self, tag, sn_instrumento, sn_sensor, rows):
+        self.tag = tag
+        self.exato = None
+        self.mesmo_sn = None
+        self.mesmo_sensor = None
+
+        for row in rows:
+            if row[1] == tag:
+                if self.exato is None:
+                    self.exato = _candidato_completo(row)
+                continue
+            if self.mesmo_sn is None and sn_instrumento is not None and row[2] == sn_instrumento:
+                self.mesmo_sn = _candidato_resumo(row)
+            if self.mesmo_sensor is None and sn_sensor is not None and row[3] == sn_sensor:
+                self.mesmo_sensor = _candidato_resumo(row)
+
+        self.familia_mvs = (
+            self.mesmo_sn is not None and
+            extrair_tag_base(self.mesmo_sn["tag"]) == extrair_tag_base(tag)
+        )
+
+    def como_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    @classmethod
+    def de_dict(cls, valores):
+        """
+        Reconstrói a resolução serializada por como_dict (data.cliente).
+        """
+        resolucao = cls.__new__(cls)
+        for campo in cls.__slots__:
+            setattr(resolucao, campo, valores[campo])
+        return resolucao
+
+    @property
+    def tag_base_sn(self):
+        return extrair_tag_base(self.mesmo_sn["tag"]) if self.mesmo_sn else None
+
+    def __repr__(self):
+        return (
+            f"ResolucaoInstrumento(tag={self.tag!r}, exato={self.exato is not None}, "
+            f"mesmo_sn={self.mesmo_sn}, mesmo_sensor={self.mesmo_sensor}, mvs={self.familia_mvs})"
+        )
+
+
+def _sair_do_wal(conn):
+    """
+    O modo WAL fica gravado no arquivo: um banco deixado nele volta ao
+    journal padrão. Se outra conexão o tiver aberto, continua como está.
+    """
+    if conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+        try:
+            conn.execute("PRAGMA journal_mode=DELETE")
+        except sqlite3.OperationalError:
+            pass
+
+
+class InstrumentRepository:
+    """
+    Acesso à tabela instrumentos com uma conexão por thread, reutilizada
+    entre as chamadas (pragmas de PRAGMAS e statements em cache). Com
+    wal, o banco usa o journal WAL (PRAGMAS_WAL); sem, o journal padrão
+    do SQLite.
+
+    Cada escrita é confirmada na hora, exceto dentro de transacao(), que
+    agrupa várias alterações num único commit. Sem caminho, usa o
+    data.conexao.db_path vigente (reabrindo a conexão se ele mudar).
+
+    Com usar_indice(), as consultas passam a ser respondidas pelo
+    IndiceInstrumentos em memória (data.indice), atualizado a cada escrita
+    confirmada.
+
+    sugerir() usa um IndiceSimilaridade (data.similaridade) montado na
+    primeira chamada e mantido da mesma forma; é remontado quando outra
+    conexão altera o banco (PRAGMA data_version) ou após
+    descartar_similaridade().
+    """
+
+    def __init__(self, caminho=None, wal=None):
+        self.caminho = caminho
+        self.wal = WAL if wal is None else wal
+        self.indice = None
+        self.similaridade = None
+        self.mudancas_externas = 0
+        self._versao_similaridade = None
+        self._trava_similaridade = threading.Lock()
+        self._local = threading.local()
+
+    def _caminho_atual(self):
+        return self.caminho or conexao.db_path
+
+    def conexao(self):
+        caminho = self._caminho_atual()
+        conn = getattr(self._local, "conn", None)
+
+        if conn is not None and self._local.caminho != caminho:
+            self.fechar()
+            self.indice = None
+            self.similaridade = None
+            conn = None
+
+        if conn is None:
+            conn = sqlite3.connect(caminho, timeout=30, cached_statements=STATEMENTS_EM_CACHE)
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            if self.wal:
+                for pragma in PRAGMAS_WAL:
+                    conn.execute(pragma)
+            else:
+                _sair_do_wal(conn)
+            self._local.conn = conn
+            self._local.caminho = caminho
+            self._local.nivel = 0
+            self._local.pendentes = []
+
+        return conn
+
+    def fechar(self):
+        """
+        Fecha a conexão da thread atual.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def usar_indice(self):
+        """
+        Carrega a tabela no índice em memória e passa a usá-lo nas consultas.
+        """
+        from data.indice import IndiceInstrumentos
+
+        self.indice = IndiceInstrumentos().carregar(self.conexao())
+        return self.indice
+
+    def descartar_indice(self):
+        self.indice = None
+
+    def descartar_similaridade(self):
+        self.similaridade = None
+
+    def _indices(self):
+        return [i for i in (self.indice, self.similaridade) if i is not None]
+
+    def _aplicar_pendentes(self):
+        pendentes, self._local.pendentes = self._local.pendentes, []
+        for indice in self._indices():
+            for efeito, cursor in pendentes:
+                efeito(indice, cursor)
+
+    @contextmanager
+    def transacao(self):
+        """
+        Agrupa as escritas do bloco num único commit (rollback em erro).
+        Pode ser aninhada; só o bloco externo confirma.
+        """
+        conn = self.conexao()
+        self._local.nivel += 1
+        try:
+            yield self
+        except Exception:
+            self._local.nivel -= 1
+            if self._local.nivel == 0:
+                conn.rollback()
+                self._local.pendentes = []
+            raise
+        else:
+            self._local.nivel -= 1
+            if self._local.nivel == 0:
+                conn.commit()
+                self._aplicar_pendentes()
+
+    def _consultar(self, sql, parametros):
+        return self.conexao().execute(sql, parametros).fetchone()
+
+    def _escrever(self, sql, parametros, efeito):
+        """
+        Executa a escrita; efeito(indice, cursor) replica a alteração nos
+        índices em memória e só é aplicado após o commit.
+        """
+        conn = self.conexao()
+        try:
+            cursor = conn.execute(sql, parametros)
+        except sqlite3.Error:
+            # Fora de transacao() não deixa a transação implícita aberta
+            if self._local.nivel == 0:
+                conn.rollback()
+            raise
+        if self.indice is not None or self.similaridade is not None:
+            self._local.pendentes.append((efeito, cursor))
+        if self._local.nivel == 0:
+            conn.commit()
+            self._aplicar_pendentes()
+
+    def inserir(self, tag, sn_instrumento, sn_sensor=None, min_range=None, max_range=None):
+        self._escrever(
+            _SQL_INSERIR,
+            (tag, sn_instrumento, sn_sensor, min_range, max_range),
+            lambda indice, cursor: indice.inserir(
+                cursor.lastrowid, tag, sn_instrumento, sn_sensor, min_range, max_range
+            )
+        )
+
+    def buscar_por_tag(self, tag):
+        if self.indice is not None:
+            return self.indice.buscar_por_tag(tag)
+
+        row = self._consultar(_SQL_POR_TAG, (tag,))
+        if not row:
+            return None
+
+        return {
+            "tag": row[0],
+            "sn_instrumento": row[1],
+            "sn_sensor": row[2],
+            "min_range": row[3],
+            "max_range": row[4]
+        }
+
+    def _resumo(self, row):
+        if not row:
+            return None
+
+        return {
+            "tag": row[0],
+            "sn_instrumento": row[1],
+            "sn_sensor": row[2]
+        }
+
+    def buscar_por_sn_instrumento(self, sn):
+        if self.indice is not None:
+            return self.indice.buscar_por_sn_instrumento(sn)
+        return self._resumo(self._consultar(_SQL_POR_SN_INSTRUMENTO, (sn,)))
+
+    def buscar_por_sn_sensor(self, sn_sensor):
+        if self.indice is not None:
+            return self.indice.buscar_por_sn_sensor(sn_sensor)
+        return self._resumo(self._consultar(_SQL_POR_SN_SENSOR, (sn_sensor,)))
+
+    def resolver(self, tag, sn_instrumento=None, sn_sensor=None):
+        """
+        Todos os candidatos do certificado numa única consulta.
+        """
+        if self.indice is not None:
+            return self.indice.resolver(tag, sn_instrumento, sn_sensor)
+
+        rows = self.conexao().execute(_SQL_CANDIDATOS, (tag, sn_instrumento, sn_sensor)).fetchall()
+        return ResolucaoInstrumento(tag, sn_instrumento, sn_sensor, rows)
+
+    def resolver_varios(self, chaves):
+        """
+        Resolve vários certificados, cada um dado por (tag, sn_instrumento,
+        sn_sensor), com uma consulta a cada CHAVES_POR_CONSULTA chaves.
+        Retorna as resoluções na ordem das chaves.
+        """
+        if self.indice is not None:
+            return [self.indice.resolver(*chave) for chave in chaves]
+
+        rows = {}
+        conn = self.conexao()
+
+        for inicio in range(0, len(chaves), CHAVES_POR_CONSULTA):
+            bloco = chaves[inicio:inicio + CHAVES_POR_CONSULTA]
+            tags = [c[0] for c in bloco]
+            sns = [c[1] for c in bloco]
+            sensores = [c[2] for c in bloco]
+
+            marcadores = ", ".join("?" * len(bloco))
+            for row in conn.execute(_SQL_CANDIDATOS_VARIOS.format(marcadores), tags + sns + sensores):
+                rows[row[0]] = row
+
+        por_tag, por_sn, por_sensor = {}, {}, {}
+        for row in sorted(rows.values()):
+            por_tag.setdefault(row[1], []).append(row)
+            por_sn.setdefault(row[2], []).append(row)
+            if row[3] is not None:
+                por_sensor.setdefault(row[3], []).append(row)
+
+        resolucoes = []
+        for tag, sn_instrumento, sn_sensor in chaves:
+            candidatos = {
+                row[0]: row
+                for grupo in (por_tag.get(tag), por_sn.get(sn_instrumento), por_sensor.get(sn_sensor))
+                if grupo
+                for row in grupo
+            }
+            resolucoes.append(
+                ResolucaoInstrumento(tag, sn_instrumento, sn_sensor, sorted(candidatos.values()))
+            )
+
+        return resolucoes
+
+    def sugerir(self, tag, sn_instrumento=None, sn_sensor=None, k=5):
+        """
+        Instrumentos cadastrados mais parecidos com a TAG/SNs informados
+        (data.similaridade.IndiceSimilaridade.sugerir).
+        """
+        from data.similaridade import IndiceSimilaridade
+
+        conn = self.conexao()
+
+        # data_version só é comparável dentro da mesma conexão: cada thread
+        # soma em mudancas_externas as alterações de outras conexões que a
+        # sua enxergou (as deste repositório chegam pelo write-through)
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if getattr(self._local, "data_version", data_version) != data_version:
+            self.mudancas_externas += 1
+        self._local.data_version = data_version
+
+        with self._trava_similaridade:
+            versao = (self._local.caminho, self.mudancas_externas)
+            if self.similaridade is None or self._versao_similaridade != versao:
+                self.similaridade = IndiceSimilaridade().carregar(conn.execute(_SQL_TODOS))
+                self._versao_similaridade = versao
+            indice = self.similaridade
+
+        return indice.sugerir(tag, sn_instrumento, sn_sensor, k)
+
+    def atualizar_sn(self, tag, novo_sn):
+        self._escrever(
+            _SQL_ATUALIZAR_SN, (novo_sn, tag),
+            lambda indice, cursor: indice.atualizar_sn(tag, novo_sn)
+        )
+
+    def atualizar_sn_sensor(self, tag, novo_sn_sensor):
+        self._escrever(
+            _SQL_ATUALIZAR_SN_SENSOR, (novo_sn_sensor, tag),
+            lambda indice, cursor: indice.atualizar_sn_sensor(tag, novo_sn_sensor)
+        )
+
+    def atualizar_tag(self, tag, nova_tag):
+        self._escrever(
+            _SQL_ATUALIZAR_TAG, (nova_tag, tag),
+            lambda indice, cursor: indice.atualizar_tag(tag, nova_tag)
+        )
+
+    def atualizar_range(self, tag, min_range, max_range):
+        self._escrever(
+            _SQL_ATUALIZAR_RANGE, (min_range, max_range, tag),
+            lambda indice, cursor: indice.atualizar_range(tag, min_range, max_range)
+        )
+
+
+# Repositório usado pelas funções de data.utils_db
+repositorio = InstrumentRepository()
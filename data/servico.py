@@ -0,0 +1,164 @@
+"""
+Serviço de banco compartilhado entre estações.
+
+Um único processo abre o instrumentos.db e atende as operações de
+data.utils_db (e o histórico de data.historico) pela rede; as estações
+usam data.cliente em vez de abrir o arquivo numa pasta compartilhada.
+
+Protocolo: conexão TCP persistente, uma requisição JSON por linha e uma
+resposta JSON por linha.
+
+    → {"op": "buscar_por_tag", "args": ["20-PIT-1001"], "token": "..."}
+    ← {"ok": true, "resultado": {...}}
+    ← {"ok": false, "tipo": "IntegrityError", "erro": "UNIQUE constraint failed: ..."}
+
+"transacao" recebe uma lista de [op, args] de escrita e aplica todas num
+único commit (ou nenhuma). Leituras rodam em paralelo (uma conexão por
+cliente, WAL); escritas são serializadas.
+"""
+import hmac
+import ipaddress
+import json
+import os
+import socketserver
+import threading
+
+from data import cliente, conexao, historico
+from data.conexao import criar_tabela
+from data.repositorio import repositorio
+
+
+PORTA_PADRAO = 8765
+
+# Tamanho máximo de uma requisição (uma linha)
+LIMITE_LINHA = 16 * 1024 * 1024
+
+
+def _resolver(tag, sn_instrumento=None, sn_sensor=None):
+    return repositorio.resolver(tag, sn_instrumento, sn_sensor).como_dict()
+
+
+def _resolver_varios(chaves):
+    return [r.como_dict() for r in repositorio.resolver_varios([tuple(c) for c in chaves])]
+
+
+LEITURAS = {
+    "ping": lambda: "pong",
+    "buscar_por_tag": repositorio.buscar_por_tag,
+    "buscar_por_sn_instrumento": repositorio.buscar_por_sn_instrumento,
+    "buscar_por_sn_sensor": repositorio.buscar_por_sn_sensor,
+    "resolver": _resolver,
+    "resolver_varios": _resolver_varios,
+    "sugerir": repositorio.sugerir,
+    "buscar_calibracoes": historico.buscar_calibracoes,
+    "ultima_calibracao": historico.ultima_calibracao,
+    "pontos_da_calibracao": historico.pontos_da_calibracao,
+}
+
+ESCRITAS = {
+    "inserir": repositorio.inserir,
+    "atualizar_sn": repositorio.atualizar_sn,
+    "atualizar_sn_sensor": repositorio.atualizar_sn_sensor,
+    "atualizar_tag": repositorio.atualizar_tag,
+    "atualizar_range": repositorio.atualizar_range,
+    "registrar_calibracao": historico.registrar_calibracao,
+}
+
+
+class _Atendimento(socketserver.StreamRequestHandler):
+
+    def setup(self):
+        super().setup()
+        cliente.usar_banco_local()
+
+    def handle(self):
+        while True:
+            linha = self.rfile.readline(LIMITE_LINHA)
+            if not linha:
+                break
+            resposta = self.server.atender(linha)
+            self.wfile.write(json.dumps(resposta, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+
+    def finish(self):
+        super().finish()
+        # Conexão SQLite desta thread
+        repositorio.fechar()
+
+
+class ServidorBanco(socketserver.ThreadingTCPServer):
+    """
+    Uma thread por estação conectada. token: se informado, exigido em
+    todas as requisições.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, endereco, token=None):
+        super().__init__(endereco, _Atendimento)
+        self.token = token
+        self._escrita = threading.Lock()
+
+    def atender(self, linha):
+        try:
+            requisicao = json.loads(linha)
+            if self.token and not hmac.compare_digest(str(requisicao.get("token") or ""), self.token):
+                raise PermissionError("token inválido")
+            return {"ok": True, "resultado": self.executar(requisicao["op"], requisicao.get("args") or [])}
+        except Exception as e:
+            return {"ok": False, "tipo": type(e).__name__, "erro": str(e)}
+
+    def executar(self, op, args):
+        if op in LEITURAS:
+            return LEITURAS[op](*args)
+
+        if op == "transacao":
+            operacoes = [(nome, argumentos) for nome, argumentos in args]
+        elif op in ESCRITAS:
+            operacoes = [(op, args)]
+        else:
+            raise ValueError(f"operação desconhecida: {op}")
+
+        desconhecidas = [nome for nome, _ in operacoes if nome not in ESCRITAS]
+        if desconhecidas:
+            raise ValueError(f"operação de escrita desconhecida: {', '.join(desconhecidas)}")
+
+        with self._escrita:
+            with repositorio.transacao():
+                resultados = [ESCRITAS[nome](*argumentos) for nome, argumentos in operacoes]
+
+        return resultados if op == "transacao" else resultados[0]
+
+
+def criar_servidor(banco=None, host="127.0.0.1", porta=PORTA_PADRAO, token=None):
+    """
+    Prepara o banco (migrações) e abre o servidor, sem começar a atender
+    (serve_forever). porta=0 escolhe uma porta livre (server_address).
+
+    Sem token (nem AC_SERVIDOR_TOKEN), só aceita host local (127.0.0.1,
+    ::1, localhost): em outra interface, levanta ValueError antes de abrir
+    o banco.
+    """
+    token = token or os.environ.get("AC_SERVIDOR_TOKEN")
+    if not token and not host_local(host):
+        raise ValueError(
+            f"o serviço em {host} aceitaria qualquer estação da rede: "
+            "informe --token ou AC_SERVIDOR_TOKEN"
+        )
+
+    if banco:
+        conexao.db_path = banco
+    # Só o serviço abre o arquivo: WAL deixa as leituras correrem em
+    # paralelo com as escritas
+    repositorio.wal = True
+    repositorio.fechar()
+    criar_tabela()
+    return ServidorBanco((host, porta), token)
+
+
+def host_local(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
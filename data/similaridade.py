@@ -0,0 +1,230 @@
+import heapq
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+from data.indice import texto_coluna
+
+
+# Similaridade mínima (coeficiente de Dice entre trigramas) para sugerir
+LIMIAR = 0.6
+
+# Ids percorridos por consulta nas listas de trigramas (dos mais raros
+# para os mais comuns) e candidatos avaliados por completo
+ORCAMENTO_POSTINGS = 1000
+CANDIDATOS = 20
+
+_NAO_ALFANUMERICO = re.compile(r"[^0-9A-Z]+")
+
+
+def normalizar_chave(texto):
+    """
+    Forma compacta de TAGs e SNs para comparação: maiúsculas, sem acentos
+    e só letras e dígitos ("20 – PIT-1001" e "20-PIT-1001" → "20PIT1001").
+    """
+    if not texto:
+        return ""
+    return _NAO_ALFANUMERICO.sub("", unicodedata.normalize("NFKD", str(texto).upper()))
+
+
+def trigramas(chave):
+    chave = f" {chave} "
+    return {chave[i:i + 3] for i in range(len(chave) - 2)}
+
+
+def dice(a, b):
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def _descartar(mapa, chave, id):
+    ids = mapa[chave]
+    ids.remove(id)
+    if not ids:
+        del mapa[chave]
+
+
+class _IndiceCampo:
+    """
+    Índice de um campo (TAG, SN do instrumento ou do sensor): chave
+    normalizada → ids, e trigrama → ids.
+    """
+
+    def __init__(self):
+        self.por_chave = {}
+        self.postings = {}
+        self.chaves = {}
+        self.gramas = {}
+
+    def adicionar(self, id, valor):
+        chave = normalizar_chave(valor)
+        if not chave:
+            return
+        gramas = trigramas(chave)
+        self.chaves[id] = chave
+        self.gramas[id] = gramas
+        self.por_chave.setdefault(chave, []).append(id)
+        postings = self.postings
+        for g in gramas:
+            postings.setdefault(g, []).append(id)
+
+    def remover(self, id):
+        chave = self.chaves.pop(id, None)
+        if chave is None:
+            return
+        _descartar(self.por_chave, chave, id)
+        for g in self.gramas.pop(id):
+            _descartar(self.postings, g, id)
+
+    def ids(self, valor):
+        """
+        Ids com a mesma chave normalizada de valor.
+        """
+        return list(self.por_chave.get(normalizar_chave(valor), ()))
+
+    def buscar(self, valor):
+        """
+        {id: similaridade} dos registros parecidos com valor. Mesma chave
+        normalizada vale 1.0; os demais são avaliados pelos trigramas, a
+        partir dos mais raros, dentro de ORCAMENTO_POSTINGS.
+        """
+        chave = normalizar_chave(valor)
+        if not chave:
+            return {}
+
+        resultado = {id: 1.0 for id in self.por_chave.get(chave, ())}
+        gramas = trigramas(chave)
+
+        contagem = Counter()
+        percorridos = 0
+        for g in sorted(gramas, key=lambda g: len(self.postings.get(g, ()))):
+            ids = self.postings.get(g)
+            if not ids:
+                continue
+            if percorridos and percorridos + len(ids) > ORCAMENTO_POSTINGS:
+                break
+            contagem.update(ids)
+            percorridos += len(ids)
+
+        if len(contagem) > CANDIDATOS:
+            # Só quem divide mais trigramas raros com a consulta
+            corte = sorted(contagem.values(), reverse=True)[CANDIDATOS - 1]
+            candidatos = [id for id, n in contagem.items() if n >= corte]
+        else:
+            candidatos = contagem
+
+        for id in candidatos:
+            if id not in resultado:
+                resultado[id] = dice(gramas, self.gramas[id])
+
+        return resultado
+
+
+class IndiceSimilaridade:
+    """
+    Busca aproximada de instrumentos por TAG e SNs, para variações de
+    digitação/OCR (traços, espaços, um dígito trocado) que a busca exata
+    do repositório não encontra.
+
+    Mantido pelas escritas do InstrumentRepository (write-through), com os
+    mesmos métodos de escrita do IndiceInstrumentos (data.indice).
+    """
+
+    CAMPOS = ("tag", "sn_instrumento", "sn_sensor")
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.linhas = {}
+        self.campos = {campo: _IndiceCampo() for campo in self.CAMPOS}
+
+    def __len__(self):
+        return len(self.linhas)
+
+    def carregar(self, rows):
+        """
+        rows: (id, tag, sn_instrumento, sn_sensor).
+        """
+        with self._trava:
+            for row in rows:
+                self._indexar(*row)
+        return self
+
+    def _indexar(self, id, tag, sn_instrumento, sn_sensor):
+        self.linhas[id] = (tag, sn_instrumento, sn_sensor)
+        for campo, valor in zip(self.CAMPOS, (tag, sn_instrumento, sn_sensor)):
+            self.campos[campo].adicionar(id, valor)
+
+    def _reindexar(self, campo, valor, posicao, novo):
+        """
+        Troca o valor da coluna posicao das linhas em que campo == valor.
+        """
+        filtro = self.CAMPOS.index(campo)
+        for id in self.campos[campo].ids(valor):
+            linha = self.linhas[id]
+            if linha[filtro] != valor:
+                continue
+            for indice in self.campos.values():
+                indice.remover(id)
+            linha = list(linha)
+            linha[posicao] = novo
+            self._indexar(id, *linha)
+
+    # Write-through: chamados pelo repositório após a escrita no banco
+
+    def inserir(self, id, tag, sn_instrumento, sn_sensor=None, min_range=None, max_range=None):
+        with self._trava:
+            # Já presente se o índice foi montado depois do commit
+            if id in self.linhas:
+                for indice in self.campos.values():
+                    indice.remover(id)
+            self._indexar(id, texto_coluna(tag), texto_coluna(sn_instrumento), texto_coluna(sn_sensor))
+
+    def atualizar_sn(self, tag, novo_sn):
+        with self._trava:
+            self._reindexar("tag", tag, 1, texto_coluna(novo_sn))
+
+    def atualizar_sn_sensor(self, tag, novo_sn_sensor):
+        with self._trava:
+            self._reindexar("tag", tag, 2, texto_coluna(novo_sn_sensor))
+
+    def atualizar_tag(self, tag, nova_tag):
+        with self._trava:
+            self._reindexar("tag", tag, 0, texto_coluna(nova_tag))
+
+    def atualizar_range(self, tag, min_range, max_range):
+        pass
+
+    def sugerir(self, tag, sn_instrumento=None, sn_sensor=None, k=5, limiar=LIMIAR):
+        """
+        Até k instrumentos mais parecidos, do mais ao menos similar:
+        dicts com tag, sn_instrumento, sn_sensor, similaridade (0 a 1) e o
+        campo que mais se aproximou.
+        """
+        # id → (maior similaridade, soma das similaridades, campo da maior);
+        # a soma desempata quem se parece em mais de um campo
+        melhores = {}
+        with self._trava:
+            for campo, valor in zip(self.CAMPOS, (tag, sn_instrumento, sn_sensor)):
+                for id, similaridade in self.campos[campo].buscar(valor).items():
+                    maior, soma, melhor_campo = melhores.get(id, (0, 0, None))
+                    if similaridade > maior:
+                        maior, melhor_campo = similaridade, campo
+                    melhores[id] = (maior, soma + similaridade, melhor_campo)
+
+            escolhidos = heapq.nsmallest(
+                k,
+                ((id, valores) for id, valores in melhores.items() if valores[0] >= limiar),
+                key=lambda item: (-item[1][0], -item[1][1], item[0])
+            )
+            linhas = {id: self.linhas[id] for id, _ in escolhidos}
+
+        return [
+            {
+                "tag": linhas[id][0],
+                "sn_instrumento": linhas[id][1],
+                "sn_sensor": linhas[id][2],
+                "similaridade": round(similaridade, 3),
+                "campo": campo
+            }
+            for id, (similaridade, _, campo) in escolhidos
+        ]
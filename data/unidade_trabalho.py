@@ -0,0 +1,87 @@
+import os
+from contextlib import contextmanager
+
+from data.utils_db import backend
+from telemetria.rastreio import span
+
+
+class UnidadeDeTrabalho:
+    """
+    Ações de validação aprovadas para um certificado (ValidationIssue.action),
+    guardadas até a geração da AC/XML.
+
+    confirmar() roda o bloco (geração da AC/XML) fora de qualquer
+    transação e, só se ele terminar sem erro, executa as ações numa única
+    transação curta: o banco não fica bloqueado para as outras estações
+    enquanto o Excel exporta a AC. Ações registradas dentro do bloco (o
+    histórico) entram na mesma transação.
+
+        unidade = UnidadeDeTrabalho(dados_pdf)
+        unidade.registrar(issue.action, issue.marca)
+        ...
+        with unidade.confirmar():
+            caminho_ac, _ = gerar_ac(...)
+            unidade.registrar_arquivo(caminho_ac)
+            ...
+            unidade.registrar(lambda: registrar_calibracao(...))
+
+    As marcas das ações (sn_atualizado, range_atualizado) são gravadas em
+    dados antes do bloco, porque aparecem na AC. Se o bloco ou a
+    transação falhar, nenhuma alteração chega ao banco, as marcas são
+    desfeitas e os arquivos registrados são apagados. Com o serviço de
+    banco (data.cliente), as escritas são enviadas juntas no commit.
+    """
+
+    def __init__(self, dados=None, repo=None):
+        self.repo = repo or backend()
+        self.dados = dados if dados is not None else {}
+        self.acoes = []
+        self.marcas = []
+        self.arquivos = []
+
+    def __len__(self):
+        return len(self.acoes)
+
+    def registrar(self, acao, marca=None):
+        self.acoes.append(acao)
+        if marca and marca not in self.marcas:
+            self.marcas.append(marca)
+
+    def registrar_arquivo(self, caminho):
+        """
+        Arquivo gerado no bloco de confirmar(), apagado se a gravação
+        falhar.
+        """
+        self.arquivos.append(str(caminho))
+
+    def descartar(self):
+        self.acoes = []
+        self.marcas = []
+        self.arquivos = []
+
+    @contextmanager
+    def confirmar(self):
+        marcadas = [m for m in self.marcas if not self.dados.get(m)]
+        for marca in marcadas:
+            self.dados[marca] = True
+
+        try:
+            yield self
+            with span("db.unidade_trabalho", acoes=len(self.acoes)):
+                with self.repo.transacao():
+                    for acao in self.acoes:
+                        acao()
+        except BaseException:
+            for marca in marcadas:
+                self.dados.pop(marca, None)
+            self._apagar_arquivos()
+            raise
+        finally:
+            self.descartar()
+
+    def _apagar_arquivos(self):
+        for caminho in self.arquivos:
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
@@ -1,137 +1,89 @@
-from data.conexao import conectar
+from data.cliente import cliente_configurado
+from data.repositorio import extrair_tag_base, repositorio
+from telemetria.rastreio import rastrear
 
-def inserir_instrumento(tag, sn_instrumento, sn_sensor=None, min_range=None, max_range=None):
-    conn = conectar()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO instrumentos (tag, sn_instrumento, sn_sensor, min_range, max_range)
-        VALUES (?, ?, ?,?, ?)
-    ''', (tag, sn_instrumento, sn_sensor, min_range, max_range))
-    conn.commit()
-    conn.close()
+# Funções de acesso à tabela instrumentos. Delegam ao InstrumentRepository
+# (data.repositorio), que mantém a conexão aberta entre as chamadas, ou ao
+# serviço de banco compartilhado (data.cliente), se configurado.
 
 
-def buscar_instrumento_por_tag(tag):
-    conn = conectar()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT tag, sn_instrumento, sn_sensor, min_range, max_range
-        FROM instrumentos
-        WHERE tag = ?
-    """, (tag,))
-
-    row = cur.fetchone()
-    conn.close()
-
-    if not row:
-        return None
-
-    # row = (tag, sn_instrumento, sn_sensor)
-    return {
-        "tag": row[0],
-        "sn_instrumento": row[1],
-        "sn_sensor": row[2],
-        "min_range": row[3],
-        'max_range': row[4]
-    }
+def backend():
+    return cliente_configurado() or repositorio
 
-def atualizar_sn(tag, novo_sn):
-    conn = conectar()
-    cursor = conn.cursor()
 
-    cursor.execute("""
-        UPDATE instrumentos
-        SET sn_instrumento = ?
-        WHERE tag = ?
-    """, (novo_sn, tag))
+@rastrear("db.inserir_instrumento", "tag", "sn_instrumento")
+def inserir_instrumento(tag, sn_instrumento, sn_sensor=None, min_range=None, max_range=None):
+    backend().inserir(tag, sn_instrumento, sn_sensor, min_range, max_range)
 
-    conn.commit()
-    conn.close()
 
-def atualizar_sn_sensor(tag, novo_sn_sensor):
-    conn = conectar()
-    cursor = conn.cursor()
+@rastrear("db.buscar_instrumento_por_tag", "tag")
+def buscar_instrumento_por_tag(tag):
+    return backend().buscar_por_tag(tag)
 
-    cursor.execute("""
-        UPDATE instrumentos
-        SET sn_sensor = ?
-        WHERE tag = ?
-    """, (novo_sn_sensor, tag))
+@rastrear("db.atualizar_sn", "tag", "novo_sn")
+def atualizar_sn(tag, novo_sn):
+    backend().atualizar_sn(tag, novo_sn)
 
-    conn.commit()
-    conn.close()
+@rastrear("db.atualizar_sn_sensor", "tag", "novo_sn_sensor")
+def atualizar_sn_sensor(tag, novo_sn_sensor):
+    backend().atualizar_sn_sensor(tag, novo_sn_sensor)
 
+@rastrear("db.buscar_por_sn_instrumento", "sn")
 def buscar_por_sn_instrumento(sn):
-    conn = conectar()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT tag, sn_instrumento, sn_sensor
-        FROM instrumentos
-        WHERE sn_instrumento = ?
-    """, (sn,))
-
-    row = cur.fetchone()
-    conn.close()
-
-    if not row:
-        return None
-
-    return {
-        "tag": row[0],
-        "sn_instrumento": row[1],
-        "sn_sensor": row[2]
-    }
+    return backend().buscar_por_sn_instrumento(sn)
 
 
+@rastrear("db.buscar_por_sn_sensor", "sn_sensor")
 def buscar_por_sn_sensor(sn_sensor):
-    conn = conectar()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT tag, sn_instrumento, sn_sensor
-        FROM instrumentos
-        WHERE sn_sensor = ?
-    """, (sn_sensor,))
+    return backend().buscar_por_sn_sensor(sn_sensor)
 
-    row = cur.fetchone()
-    conn.close()
 
-    if not row:
-        return None
+@rastrear("db.resolver_instrumento", "tag", "sn_instrumento", "sn_sensor")
+def resolver_instrumento(tag, sn_instrumento=None, sn_sensor=None):
+    """
+    Cadastro da TAG e os registros com o mesmo SN de instrumento ou de
+    sensor, numa única consulta (ver data.repositorio.ResolucaoInstrumento).
+    """
+    return backend().resolver(tag, sn_instrumento, sn_sensor)
 
-    return {
-        "tag": row[0],
-        "sn_instrumento": row[1],
-        "sn_sensor": row[2]
-    }
 
+@rastrear("db.resolver_instrumentos")
+def resolver_instrumentos(chaves):
+    """
+    resolver_instrumento para uma lista de (tag, sn_instrumento, sn_sensor).
+    """
+    return backend().resolver_varios(list(chaves))
 
-def atualizar_tag(sn_instrumento, nova_tag):
 
-    conn = conectar()
-    cur = conn.cursor()
+@rastrear("db.sugerir_instrumentos", "tag", "sn_instrumento", "sn_sensor")
+def sugerir_instrumentos(tag, sn_instrumento=None, sn_sensor=None, k=5):
+    """
+    Instrumentos cadastrados com TAG ou SN parecidos (grafia diferente,
+    dígito trocado), do mais ao menos similar. Ver data.similaridade.
+    """
+    return backend().sugerir(tag, sn_instrumento, sn_sensor, k)
 
-    cur.execute("""
-        UPDATE instrumentos
-        SET tag = ?
-        WHERE sn_instrumento = ?
-    """, (nova_tag, sn_instrumento))
 
-    conn.commit()
-    conn.close()
+@rastrear("db.atualizar_tag", "tag", "nova_tag")
+def atualizar_tag(tag, nova_tag):
+    """
+    Renomeia o instrumento cadastrado com a TAG tag. Só essa linha: os
+    demais instrumentos com o mesmo SN (família MVS) mantêm as suas TAGs.
+    """
+    backend().atualizar_tag(tag, nova_tag)
 
 
+@rastrear("db.atualizar_range", "tag")
 def atualizar_range(tag, min_range, max_range):
-    conn = conectar()
-    cur = conn.cursor()
+    backend().atualizar_range(tag, min_range, max_range)
+
 
-    cur.execute("""
-        UPDATE instrumentos
-        SET min_range = ?, max_range = ?
-        WHERE tag = ?
-    """, (min_range, max_range, tag))
+def transacao():
+    """
+    Agrupa várias alterações num único commit:
 
-    conn.commit()
-    conn.close()
\ No newline at end of file
+        with transacao():
+            atualizar_sn(tag, sn)
+            atualizar_range(tag, min_r, max_r)
+    """
+    return backend().transacao()
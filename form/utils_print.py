@@ -1,22 +1,38 @@
 import openpyxl
 from openpyxl.styles import Alignment, Font
-import win32com.client as win32
 import os
 from datetime import datetime, timedelta
 from openpyxl.cell.rich_text import CellRichText, TextBlock
 from openpyxl.cell.text import InlineFont
 
+from pdf.classificador import DPT, PT, TE, TIPO_PADRAO, TT, tipo_do_certificado
+from telemetria.rastreio import span
+
 tipo=""
-def gerar_ac(dados, caminho_pdf_original="TemplateAC.xlsx"):
-    def adicionar_dia_util(data):
+caminho_template = "TemplateAC.xlsx"
+
+TITULOS_AC = {
+    TE: "Análise Crítica de Calibração dos Sensores de Temperatura",
+    TT: "Análise Crítica de Calibração dos Sensores de Temperatura",
+    PT: "Análise Crítica de Calibração dos Transmissores de Pressão",
+    DPT: "Análise Crítica de Calibração dos Transmissores de Pressão Diferencial",
+}
+
+
+def adicionar_dia_util(data):
+    data += timedelta(days=1)
+    if data.weekday() == 5:  # sábado
+        data += timedelta(days=2)
+    elif data.weekday() == 6:  # domingo
         data += timedelta(days=1)
-        if data.weekday() == 5:  # sábado
-            data += timedelta(days=2)
-        elif data.weekday() == 6:  # domingo
-            data += timedelta(days=1)
-        return data
+    return data
 
-    caminho_template = "TemplateAC.xlsx"
+
+def preencher_ac(dados, caminho_template=caminho_template):
+    """
+    Carrega o template e preenche a planilha da AC.
+    Retorna (workbook, tipo).
+    """
     wb = openpyxl.load_workbook(caminho_template)
     ws = wb["Template Formulário"]
 
@@ -49,35 +65,8 @@ def gerar_ac(dados, caminho_pdf_original="TemplateAC.xlsx"):
     ws.row_dimensions[7].height = 15 * max(1, local.count("\n") + 1)
 
     
-    tag = (dados.get("tag") or "").upper()
-   
-    if (
-        tag.startswith("TE") or
-        tag.endswith("-TE") or
-        "-TE-" in tag
-    ):
-        ws["B2"] = "Análise Crítica de Calibração dos Sensores de Temperatura"
-        tipo = "TE"
-
-    elif (
-        tag.startswith(("TT", "TIT", "TI")) or
-        tag.endswith(("-TT", "-TIT", "-TI")) or
-        any(x in tag for x in ("-TT-", "-TIT-", "-TI-"))
-    ):
-        ws["B2"] = "Análise Crítica de Calibração dos Sensores de Temperatura"
-        tipo = "TT"
-
-    elif (
-        tag.startswith(("PT", "PIT")) or
-        tag.endswith(("-PT", "-PIT")) or
-        any(x in tag for x in ("-PT-", "-PIT-"))
-    ):
-        ws["B2"] = "Análise Crítica de Calibração dos Transmissores de Pressão"
-        tipo = "PT"
-
-    else:
-        ws["B2"] = "Análise Crítica de Calibração dos Transmissores de Pressão Diferencial"
-        tipo = "DPT"
+    tipo = tipo_do_certificado(dados) or TIPO_PADRAO
+    ws["B2"] = TITULOS_AC[tipo]
 
 
     #Report Date (+1 dia) - útil
@@ -136,8 +125,33 @@ def gerar_ac(dados, caminho_pdf_original="TemplateAC.xlsx"):
     ws["B35"].value = rich
     ws["B35"].alignment = Alignment(wrap_text=True, vertical="top")
 
-   
-    wb.save(caminho_template)
+    return wb, tipo
+
+
+def exportar_pdf_excel(caminho_xlsx, caminho_pdf_final):
+    # Importado aqui: só a exportação depende do Excel (Windows)
+    import win32com.client as win32
+
+    excel = win32.DispatchEx("Excel.Application") 
+    excel.Visible = False
+    excel.DisplayAlerts = False
+    excel.ScreenUpdating = False
+    excel.Interactive = False
+
+    try:
+        wb_excel = excel.Workbooks.Open(os.path.abspath(caminho_xlsx))
+        wb_excel.ExportAsFixedFormat(0, caminho_pdf_final)
+        wb_excel.Close(SaveChanges=False)
+
+    finally:
+        excel.Quit()  
+
+
+def gerar_ac(dados, caminho_pdf_original="TemplateAC.xlsx"):
+    with span("ac.preencher"):
+        wb, tipo = preencher_ac(dados)
+    with span("ac.salvar"):
+        wb.save(caminho_template)
 
     # Definir o caminho de saída do PDF
     pasta_saida = os.path.dirname(os.path.abspath(caminho_pdf_original))
@@ -153,19 +167,8 @@ def gerar_ac(dados, caminho_pdf_original="TemplateAC.xlsx"):
                 f"⚠ O arquivo PDF está aberto e não pode ser sobrescrito:\n{caminho_pdf_final}"
             )
 
-  
-    excel = win32.DispatchEx("Excel.Application") 
-    excel.Visible = False
-    excel.DisplayAlerts = False
-    excel.ScreenUpdating = False
-    excel.Interactive = False
-
-    try:
-        wb_excel = excel.Workbooks.Open(os.path.abspath(caminho_template))
-        wb_excel.ExportAsFixedFormat(0, caminho_pdf_final)
-        wb_excel.Close(SaveChanges=False)
 
-    finally:
-        excel.Quit()  
+    with span("ac.exportar_excel"):
+        exportar_pdf_excel(caminho_template, caminho_pdf_final)
 
     return caminho_pdf_final,tipo
\ No newline at end of file
@@ -0,0 +1,160 @@
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from telemetria.rastreio import atributos_certificado, span
+
+
+# Intervalo (ms) em que a interface lê a fila de mensagens do controlador
+INTERVALO_MS = 20
+
+
+def _iniciar_worker():
+    # O Excel (win32com) exige o COM inicializado na thread que o usa
+    try:
+        import pythoncom
+    except ImportError:
+        return
+    pythoncom.CoInitialize()
+
+
+class ControladorPipeline:
+    """
+    Executa as etapas bloqueantes (PDF, banco, validação, AC/XML) numa
+    thread de trabalho, fora do loop do Tk. Uma única thread: o
+    TemplateAC.xlsx e o Excel não podem ser usados em paralelo, e a
+    transação da UnidadeDeTrabalho fica na conexão dessa thread.
+
+    Resultados, erros e progresso voltam pela fila e são despachados na
+    thread da interface por processar_mensagens (chamada periodicamente
+    com after):
+
+        controlador.executar(analisar_certificado, caminho, controlador.progresso,
+                             depois=self.confirmar, erro=self.falhou)
+    """
+
+    def __init__(self):
+        self.fila = queue.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ac-pipeline", initializer=_iniciar_worker
+        )
+        self._despachando = False
+
+    def executar(self, funcao, *args, depois=None, erro=None):
+        """
+        Agenda funcao(*args) na thread de trabalho. depois(resultado) ou
+        erro(exceção) são chamados depois na thread da interface.
+        """
+        def tarefa():
+            try:
+                resultado = funcao(*args)
+            except Exception as e:
+                self.fila.put(("erro", erro, e))
+            else:
+                self.fila.put(("feito", depois, resultado))
+
+        return self._executor.submit(tarefa)
+
+    def progresso(self, texto):
+        """
+        Pode ser chamada da thread de trabalho.
+        """
+        self.fila.put(("progresso", None, texto))
+
+    def processar_mensagens(self, ao_progresso=None):
+        """
+        Despacha as mensagens pendentes, sem esperar por novas. Os
+        callbacks podem abrir diálogos modais (que rodam o loop do Tk de
+        novo): chamadas aninhadas nesse intervalo não fazem nada.
+        """
+        if self._despachando:
+            return
+        self._despachando = True
+        try:
+            while True:
+                try:
+                    tipo, callback, valor = self.fila.get_nowait()
+                except queue.Empty:
+                    return
+                if tipo == "progresso":
+                    callback = ao_progresso
+                if callback is None:
+                    if tipo == "erro":
+                        print(f"Erro na thread de trabalho: {valor}")
+                    continue
+                try:
+                    callback(valor)
+                except Exception as e:
+                    # Ex.: janela fechada antes do resultado chegar
+                    print(f"Erro ao atualizar a interface: {e}")
+        finally:
+            self._despachando = False
+
+    def encerrar(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class Analise:
+    """
+    Resultado da leitura e validação de um certificado, levado da thread
+    de trabalho aos diálogos de confirmação e de volta para a geração.
+    """
+    __slots__ = ("caminho", "dados_pdf", "pontos", "issues", "registro", "caminho_ac", "caminho_xml")
+
+    def __init__(self, caminho, dados_pdf, pontos, issues, registro):
+        self.caminho = caminho
+        self.dados_pdf = dados_pdf
+        self.pontos = pontos
+        self.issues = issues
+        self.registro = registro
+        self.caminho_ac = None
+        self.caminho_xml = None
+
+
+def analisar_certificado(caminho, progresso=None):
+    """
+    Etapa 1 (thread de trabalho): leitura do PDF, consulta ao banco e
+    regras de validação.
+    """
+    from pdf.cache import extrair_com_cache
+    from validation.context import criar_contexto
+    from validation.engine import ValidationEngine
+
+    progresso = progresso or (lambda texto: None)
+    progresso(f"Lendo: {os.path.basename(caminho)}")
+    dados_pdf, pontos = extrair_com_cache(caminho)
+
+    with span("gui.analisar", arquivo=os.path.basename(caminho), **atributos_certificado(dados_pdf, pontos)):
+        progresso(f"Validando: {os.path.basename(caminho)}")
+        ctx = criar_contexto(dados_pdf, pontos)
+        issues = ValidationEngine().run(ctx)
+
+    return Analise(caminho, dados_pdf, pontos, issues, ctx.db)
+
+
+def gerar_documentos(analise, unidade, progresso=None):
+    """
+    Etapa 2 (thread de trabalho): AC e XML; depois, o histórico e as
+    ações aprovadas numa única transação (ver data.unidade_trabalho).
+    """
+    from data.historico import registrar_calibracao
+    from form.utils_print import gerar_ac
+    from xml_model.xml_generator import gerar_xml_calibracao
+
+    progresso = progresso or (lambda texto: None)
+    dados_pdf = analise.dados_pdf
+
+    with span("gui.gerar", arquivo=os.path.basename(analise.caminho), **atributos_certificado(dados_pdf, analise.pontos)):
+        progresso("Gerando AC e XML...")
+        with unidade.confirmar():
+            caminho_ac, _ = gerar_ac(dados_pdf, analise.caminho)
+            unidade.registrar_arquivo(caminho_ac)
+            caminho_xml = Path(str(caminho_ac).replace("_AC", "")).with_suffix(".xml")
+            unidade.registrar_arquivo(caminho_xml)
+            gerar_xml_calibracao(dados_pdf, analise.pontos, str(caminho_xml), dados_pdf.get("certificado_te_anterior"))
+            unidade.registrar(lambda: registrar_calibracao(dados_pdf, analise.pontos, analise.caminho))
+
+    analise.caminho_ac = caminho_ac
+    analise.caminho_xml = caminho_xml
+    return analise
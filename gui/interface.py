@@ -1,29 +1,23 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-from threading import Thread
 import os
 import sys
-from pathlib import Path
 from PIL import Image
 
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 try:
-    from pdf.extrator import extrair_texto
-    from pdf.parser_certificados import extrair_campos
-    from xml_model.xml_extractor import extrair_pontos_calibracao_pdf
-    from xml_model.xml_generator import gerar_xml_calibracao
     from data.utils_db import (
         buscar_instrumento_por_tag,
-        buscar_por_sn_instrumento,
         atualizar_sn,
         atualizar_sn_sensor,
-        atualizar_range
+        atualizar_range,
+        transacao
     )
-    from form.utils_print import gerar_ac
-    from validation.engine import ValidationEngine
-    from validation.context import ValidationContext
+    from data.unidade_trabalho import UnidadeDeTrabalho
+    from gui.controlador import INTERVALO_MS, ControladorPipeline, analisar_certificado, gerar_documentos
+    from telemetria.rastreio import atributos_certificado, span
 except ImportError as e:
     print(f"Aviso: Módulos internos não encontrados. Erro: {e}")
 
@@ -41,9 +35,6 @@ ODS_ERROR = "#D81F3C"
 FONT_FAMILY = "Segoe UI" 
 
 
-def extrair_tag_base(tag: str) -> str:
-    return "-".join(tag.split("-")[:-1]) if "-" in tag else tag
-
 def to_float_safe(value):
     try: return float(str(value).replace(",", "."))
     except: return None
@@ -65,7 +56,24 @@ class App(ctk.CTk):
         self.pontos_calibracao = []
         self.caminho_pdf_atual = None
 
+        # PDF, banco e geração rodam na thread do controlador; aqui ficam
+        # só os diálogos e a atualização da tela
+        self.controlador = ControladorPipeline()
+        self.protocol("WM_DELETE_WINDOW", self._fechar)
+
         self._build_ui()
+        self.after(INTERVALO_MS, self._acompanhar)
+
+    def _acompanhar(self):
+        self.after(INTERVALO_MS, self._acompanhar)
+        self.controlador.processar_mensagens(self._mostrar_progresso)
+
+    def _mostrar_progresso(self, texto):
+        self.lbl_pdf.configure(text=texto)
+
+    def _fechar(self):
+        self.controlador.encerrar()
+        self.destroy()
 
     def _definir_logo_janela(self):
         """Carrega a imagem PNG e a define como ícone da janela e barra de tarefas"""
@@ -182,47 +190,68 @@ class App(ctk.CTk):
         if not caminho: return
         self.caminho_pdf_atual = caminho
         self.lbl_pdf.configure(text=f"Processando: {os.path.basename(caminho)}", font=(FONT_FAMILY, 11, "bold"), text_color=ODS_TEXT)
-        Thread(target=self._processar_pdf_thread, args=(caminho,), daemon=True).start()
+        self.btn_pdf.configure(state="disabled")
+        self.controlador.executar(
+            analisar_certificado, caminho, self.controlador.progresso,
+            depois=self.processar_comparacao,
+            erro=lambda e: self._concluir(None, "Erro na análise", e)
+        )
 
-    def _processar_pdf_thread(self, caminho):
-        try:
-            texto = extrair_texto(caminho)
-            dados_pdf = extrair_campos(texto)
-            self.pontos_calibracao = extrair_pontos_calibracao_pdf(caminho)
-            self.after(0, lambda: self.processar_comparacao(dados_pdf))
-        except Exception as e:
-            self.after(0, lambda: messagebox.showerror("Erro no PDF", str(e)))
-
-    def processar_comparacao(self, dados_pdf):
-        tag = dados_pdf["tag"].upper()
-        dados_pdf["tag"] = tag
-        registro = buscar_instrumento_por_tag(tag)
-        reg_sn = buscar_por_sn_instrumento(dados_pdf.get("sn_instrumento"))
-        ctx = ValidationContext(dados_pdf=dados_pdf, registro=registro, reg_sn=reg_sn, 
-                                tag_base_pdf=extrair_tag_base(tag), 
-                                tag_base_sn=extrair_tag_base(registro["tag"]) if registro else None, 
-                                pontos=self.pontos_calibracao)
-        engine = ValidationEngine()
-        issues = engine.run(ctx)
+    def processar_comparacao(self, analise):
+        """
+        Diálogos de confirmação das divergências (thread da interface).
+        """
+        self.pontos_calibracao = analise.pontos
+        with span(
+            "gui.processar_comparacao",
+            arquivo=os.path.basename(analise.caminho),
+            **atributos_certificado(analise.dados_pdf, analise.pontos)
+        ):
+            unidade, ok = self._confirmar_divergencias(analise)
+
+        if not ok:
+            self._concluir(analise)
+            return
+
+        self.controlador.executar(
+            gerar_documentos, analise, unidade, self.controlador.progresso,
+            depois=self._geracao_concluida,
+            erro=lambda e: self._concluir(
+                analise, "Erro", f"Erro na geração: {e}\n\nNenhuma alteração foi gravada no banco."
+            )
+        )
+
+    def _confirmar_divergencias(self, analise):
+        # Ações aprovadas só vão ao banco junto com a geração da AC/XML
+        unidade = UnidadeDeTrabalho(analise.dados_pdf)
         ok = True
-        for issue in issues:
+        for issue in analise.issues:
             if issue.action:
-                if messagebox.askyesno(issue.title, issue.message): issue.action()
+                with span("gui.dialogo", titulo=issue.title):
+                    resposta = messagebox.askyesno(issue.title, issue.message)
+                if resposta: unidade.registrar(issue.action, issue.marca)
                 else:
                     ok = False
                     if issue.blocking: break
             else:
-                messagebox.showwarning(issue.title, issue.message)
+                with span("gui.dialogo", titulo=issue.title):
+                    messagebox.showwarning(issue.title, issue.message)
                 if issue.blocking: ok = False; break
-        if ok:
-            try:
-                caminho_ac, _ = gerar_ac(dados_pdf, self.caminho_pdf_atual)
-                caminho_xml = Path(str(caminho_ac).replace("_AC", "")).with_suffix(".xml")
-                gerar_xml_calibracao(dados_pdf, self.pontos_calibracao, str(caminho_xml), dados_pdf.get("certificado_te_anterior"))
-                messagebox.showinfo("Sucesso", "Análise e XML concluídos!")
-            except Exception as e:
-                messagebox.showerror("Erro", f"Erro na geração: {e}")
-        self.exibir_resultado(dados_pdf, registro)
+        return unidade, ok
+
+    def _geracao_concluida(self, analise):
+        messagebox.showinfo("Sucesso", "Análise e XML concluídos!")
+        self._concluir(analise)
+
+    def _concluir(self, analise, titulo_erro=None, erro=None):
+        if titulo_erro:
+            messagebox.showerror(titulo_erro, str(erro))
+        self.btn_pdf.configure(state="normal")
+        if analise is None:
+            self.lbl_pdf.configure(text="Aguardando seleção de PDF...")
+            return
+        self.lbl_pdf.configure(text=f"Concluído: {os.path.basename(analise.caminho)}")
+        self.exibir_resultado(analise.dados_pdf, analise.registro)
 
     def exibir_resultado(self, dados_pdf, registro):
         for w in self.result_frame.winfo_children(): w.destroy()
@@ -264,7 +293,12 @@ class App(ctk.CTk):
             entries[k] = e
         def consultar():
             tag = entry_tag.get().upper()
-            reg = buscar_instrumento_por_tag(tag)
+            self.controlador.executar(
+                buscar_instrumento_por_tag, tag,
+                depois=exibir,
+                erro=lambda e: messagebox.showerror("Erro", f"Erro na consulta: {e}")
+            )
+        def exibir(reg):
             if not reg:
                 messagebox.showerror("Erro", "TAG não encontrada.")
                 return
@@ -277,9 +311,18 @@ class App(ctk.CTk):
             if min_r is None or max_r is None:
                 messagebox.showerror("Erro", "Ranges inválidos.")
                 return
-            atualizar_sn(tag, campos["sn_instrumento"].get())
-            atualizar_sn_sensor(tag, campos["sn_sensor"].get())
-            atualizar_range(tag, min_r, max_r)
+            sn, sn_sensor = campos["sn_instrumento"].get(), campos["sn_sensor"].get()
+            def gravar():
+                with transacao():
+                    atualizar_sn(tag, sn)
+                    atualizar_sn_sensor(tag, sn_sensor)
+                    atualizar_range(tag, min_r, max_r)
+            self.controlador.executar(
+                gravar,
+                depois=salvo,
+                erro=lambda e: messagebox.showerror("Erro", f"Erro ao salvar: {e}")
+            )
+        def salvo(_):
             messagebox.showinfo("Sucesso", "Dados salvos.")
             for e in entries.values(): e.configure(state="readonly", fg_color=ODS_FRAME_LIGHT)
         ctk.CTkButton(container, text="CONSULTAR", fg_color=ODS_DARK, command=consultar, height=35).pack(fill="x", pady=5)
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from pdf import classificador, documento, extrator, parser_certificados, tabelas
+from pdf.documento import CertificateDocument
+from pdf.extrator import CAMPOS_OBRIGATORIOS, extrair_campos_pdf
+from telemetria.rastreio import atributos_certificado, span
+from config.validacao import configuracao
+from xml_model import xml_extractor
+from xml_model.xml_extractor import extrair_pontos_calibracao_pdf
+
+
+cache_path = "cache_extracao.db"
+
+# Limite padrão do cache em disco (soma dos JSON armazenados)
+LIMITE_BYTES = 64 * 1024 * 1024
+
+# Incrementar quando a saída dos extratores mudar de forma que o código
+# não reflita (ex.: executável congelado sem os fontes .py)
+VERSAO_MANUAL = 1
+
+
+def _calcular_versao_parser():
+    """
+    Versão do parser = versão manual + hash do código dos módulos de
+    extração. Qualquer alteração nesses arquivos invalida o cache.
+    """
+    h = hashlib.sha256(str(VERSAO_MANUAL).encode())
+
+    for modulo in (classificador, documento, extrator, parser_certificados, tabelas, xml_extractor):
+        arquivo = getattr(modulo, "__file__", None)
+        if arquivo and arquivo.endswith(".py") and os.path.exists(arquivo):
+            with open(arquivo, "rb") as f:
+                h.update(f.read())
+
+    return h.hexdigest()[:16]
+
+
+VERSAO_PARSER = _calcular_versao_parser()
+
+
+def versao_cache():
+    """
+    VERSAO_PARSER mais os códigos de TAG em uso (o tipo classificado é
+    guardado com os campos): alterá-los na configuração invalida o cache.
+    """
+    return f"{VERSAO_PARSER}-{configuracao().assinatura_tags}"
+
+
+def chave_pdf(conteudo: bytes) -> str:
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+class CacheExtracao:
+    """
+    Cache em disco (SQLite) dos campos e pontos de calibração extraídos,
+    indexado pelo SHA-256 do PDF. Entradas de outra versão (versao_cache)
+    são descartadas ao abrir; acima do limite, as menos usadas são
+    removidas.
+
+    Uma conexão por instância, aberta na primeira consulta; use
+    cache_padrao() para ter uma só instância por processo.
+    """
+
+    def __init__(self, caminho=None, limite_bytes=LIMITE_BYTES, versao=None):
+        self.caminho = caminho or cache_path
+        self.limite_bytes = limite_bytes
+        self.versao = versao or versao_cache()
+        self._trava = threading.Lock()
+        self._conn = None
+
+    def _conexao(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False)
+            self._criar(self._conn)
+        return self._conn
+
+    def _criar(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS extracoes (
+                chave TEXT PRIMARY KEY,
+                versao TEXT NOT NULL,
+                dados TEXT NOT NULL,
+                tamanho INTEGER NOT NULL,
+                acesso REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_extracoes_acesso ON extracoes (acesso)")
+        # Só grava se houver o que descartar: os outros processos do pool
+        # abrem o mesmo arquivo
+        antiga = conn.execute("SELECT 1 FROM extracoes WHERE versao != ? LIMIT 1", (self.versao,)).fetchone()
+        if antiga:
+            conn.execute("DELETE FROM extracoes WHERE versao != ?", (self.versao,))
+        conn.commit()
+
+    def fechar(self):
+        with self._trava:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def obter(self, chave):
+        with self._trava:
+            conn = self._conexao()
+            row = conn.execute(
+                "SELECT dados FROM extracoes WHERE chave = ? AND versao = ?",
+                (chave, self.versao)
+            ).fetchone()
+
+            if row:
+                conn.execute("UPDATE extracoes SET acesso = ? WHERE chave = ?", (time.time(), chave))
+                conn.commit()
+
+        if not row:
+            return None
+
+        conteudo = json.loads(row[0])
+        return conteudo["dados"], conteudo["pontos"]
+
+    def guardar(self, chave, dados_pdf, pontos):
+        conteudo = json.dumps({"dados": dados_pdf, "pontos": pontos}, ensure_ascii=False)
+
+        with self._trava:
+            conn = self._conexao()
+            conn.execute("""
+                INSERT OR REPLACE INTO extracoes (chave, versao, dados, tamanho, acesso)
+                VALUES (?, ?, ?, ?, ?)
+            """, (chave, self.versao, conteudo, len(conteudo), time.time()))
+            self._despejar(conn)
+            conn.commit()
+
+    def _despejar(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM extracoes").fetchone()[0]
+        if total <= self.limite_bytes:
+            return
+
+        remover = []
+        for chave, tamanho in conn.execute("SELECT chave, tamanho FROM extracoes ORDER BY acesso"):
+            if total <= self.limite_bytes:
+                break
+            remover.append((chave,))
+            total -= tamanho
+
+        conn.executemany("DELETE FROM extracoes WHERE chave = ?", remover)
+
+
+_cache = None
+_trava_cache = threading.Lock()
+
+
+def cache_padrao():
+    """
+    Instância do processo (cada processo do pool tem a sua), criada na
+    primeira chamada. É trocada se cache_path ou versao_cache() mudarem,
+    o que descarta as entradas da versão anterior uma única vez.
+    """
+    global _cache
+    versao = versao_cache()
+    with _trava_cache:
+        if _cache is None or _cache.caminho != cache_path or _cache.versao != versao:
+            if _cache is not None:
+                _cache.fechar()
+            _cache = CacheExtracao(versao=versao)
+        return _cache
+
+
+def extrair_com_cache(caminho_pdf, cache=None):
+    """
+    Retorna (dados_pdf, pontos) do certificado, lendo o PDF apenas se
+    o conteúdo ainda não estiver no cache.
+    """
+    with span("pdf.extrair", arquivo=os.path.basename(str(caminho_pdf))) as s:
+        with open(caminho_pdf, "rb") as f:
+            conteudo = f.read()
+
+        cache = cache or cache_padrao()
+        chave = chave_pdf(conteudo)
+
+        with span("cache.obter"):
+            encontrado = cache.obter(chave)
+        if encontrado is not None:
+            s.definir(cache=True, **atributos_certificado(*encontrado))
+            return encontrado
+
+        with CertificateDocument(conteudo, caminho=caminho_pdf) as doc:
+            with span("pdf.campos"):
+                dados_pdf = extrair_campos_pdf(doc)
+            s.definir(cache=False, paginas=doc.num_paginas, **atributos_certificado(dados_pdf))
+            with span("pdf.pontos"):
+                pontos = extrair_pontos_calibracao_pdf(doc, dados_pdf["tipo"])
+
+        # Sem nenhum campo obrigatório, o mais provável é uma falha de
+        # leitura (extrair_texto devolve ""): guardada, seria servida para
+        # esse conteúdo até a versão mudar
+        if not any(dados_pdf.get(c) is not None for c in CAMPOS_OBRIGATORIOS):
+            return dados_pdf, pontos
+
+        with span("cache.guardar"):
+            cache.guardar(chave, dados_pdf, pontos)
+        return dados_pdf, pontos
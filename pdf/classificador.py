@@ -0,0 +1,127 @@
+"""
+Classificação do tipo de instrumento do certificado (TE, TT, PT, DPT).
+
+Feita uma única vez por documento, dos sinais mais baratos para os mais
+caros: códigos da TAG, depois o texto da primeira página (só quando ele
+já decide, ver classificar_documento) e o texto completo. O resultado é
+gravado em dados_pdf["tipo"] e usado pela extração dos pontos, pela
+validação, pela AC e pelo XML.
+
+A precedência entre os tipos é a das verificações anteriores à
+classificação única: na TAG, TE, TT, PT e DPT (as da AC); no texto, TT,
+TE, DPT e PT (as da extração dos pontos). tests/test_classificador.py
+confere as duas contra as verificações antigas.
+"""
+from config.validacao import configuracao
+
+
+TE = "TE"
+TT = "TT"
+PT = "PT"
+DPT = "DPT"
+
+TIPOS = (TE, TT, PT, DPT)
+
+# Tipo assumido pela AC quando nada identifica o instrumento
+TIPO_PADRAO = DPT
+
+# Termos procurados no texto (já em maiúsculas)
+_TERMOS_TE = ("THERMORESISTANCE", "TERMORRESISTÊNCIA")
+_TERMOS_TT = ("DIGITAL THERMOMETER", "TEMPERATURE TRANSMITTER", "-TT", "TRANSMISSOR DE TEMPERATURA")
+_TERMOS_DPT = ("DIFFERENTIAL", "DIFERENCIAL", "-DPT", "PDIT")
+_TERMOS_PT = ("PRESSURE", "PRESSÃO", "-PT")
+
+# Ordem de decisão pelo texto (a da antiga extração dos pontos)
+_TIPOS_POR_PRECEDENCIA = (TT, TE, DPT, PT)
+_TERMOS = {TT: _TERMOS_TT, TE: _TERMOS_TE, DPT: _TERMOS_DPT, PT: _TERMOS_PT}
+
+
+class Classificacao:
+    """
+    Tipo do instrumento e o sinal que o decidiu ("tag", "pagina",
+    "texto" ou None quando não identificado).
+    """
+    __slots__ = ("tipo", "origem")
+
+    def __init__(self, tipo, origem):
+        self.tipo = tipo
+        self.origem = origem
+
+    def __bool__(self):
+        return self.tipo is not None
+
+    def __repr__(self):
+        return f"Classificacao({self.tipo!r}, {self.origem!r})"
+
+    @property
+    def temperatura(self):
+        return self.tipo in (TE, TT)
+
+    @property
+    def pressao(self):
+        return self.tipo in (PT, DPT)
+
+
+def classificar_tag(tag):
+    """
+    Tipo pelos códigos da TAG (codigos_tag da configuração, ver
+    config.validacao); None se nenhum for reconhecido.
+    """
+    return configuracao().tipo_da_tag(tag)
+
+
+def _contem(texto_upper, termos):
+    return any(t in texto_upper for t in termos)
+
+
+def classificar_texto(texto):
+    """
+    Tipo pelos termos do certificado; None se nenhum for encontrado.
+    Termos de temperatura têm precedência (a pressão atmosférica aparece
+    nas condições ambientais de qualquer certificado).
+    """
+    texto_upper = texto.upper()
+
+    for tipo in _TIPOS_POR_PRECEDENCIA:
+        if _contem(texto_upper, _TERMOS[tipo]):
+            return tipo
+
+    return None
+
+
+def classificar_documento(documento, tag=None):
+    """
+    Classifica o CertificateDocument. A TAG, se já conhecida, dispensa
+    a leitura do texto.
+    """
+    tipo = classificar_tag(tag)
+    if tipo:
+        return Classificacao(tipo, "tag")
+
+    # Só TT decide pela primeira página: qualquer outro tipo perderia
+    # para um termo de maior precedência numa página seguinte
+    if documento.num_paginas:
+        tipo = classificar_texto(documento.texto_pagina(0))
+        if tipo == _TIPOS_POR_PRECEDENCIA[0]:
+            return Classificacao(tipo, "pagina")
+
+    tipo = classificar_texto(documento.texto)
+    if tipo:
+        return Classificacao(tipo, "texto")
+
+    return Classificacao(None, None)
+
+
+def tipo_do_certificado(dados_pdf, pontos=None):
+    """
+    Tipo já classificado de um certificado extraído. Dados antigos, sem
+    "tipo", caem no tipo dos pontos e depois na TAG.
+    """
+    tipo = (dados_pdf or {}).get("tipo")
+    if tipo:
+        return tipo
+
+    if pontos:
+        return pontos[0].get("tipo")
+
+    return classificar_tag((dados_pdf or {}).get("tag"))
@@ -0,0 +1,144 @@
+import io
+
+import pdfplumber
+import pypdfium2 as pdfium
+
+
+class CertificateDocument:
+    """
+    Certificado PDF aberto uma única vez.
+
+    Aceita o caminho do arquivo ou o conteúdo em bytes (neste caso o
+    caminho de origem pode ser informado para mensagens). O texto e as
+    tabelas de cada página são extraídos sob demanda e guardados, para
+    que todas as etapas (campos, pontos de calibração, ...) reutilizem a
+    mesma análise de layout do pdfplumber.
+
+    O texto vem do backend informado (ver pdf.extrator); sem backend, do
+    próprio pdfplumber. Tabelas sempre vêm do pdfplumber.
+    """
+
+    def __init__(self, origem, caminho=None, backend=None):
+        if isinstance(origem, (bytes, bytearray)):
+            self.caminho = caminho
+            self._origem = bytes(origem)
+        else:
+            self.caminho = str(origem)
+            self._origem = self.caminho
+
+        self.backend = backend
+
+        self._pdf = None
+        self._pdfium = None
+        self._textos = {}
+        self._tabelas = {}
+        self._texto = None
+
+        # Predicado sobre o texto da página: as páginas em que ele é
+        # verdadeiro não são liberadas por iterar_paginas
+        self.reter = None
+        self._retidas = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+        if self._pdfium is not None:
+            self._pdfium.close()
+            self._pdfium = None
+
+    @property
+    def pdfplumber(self):
+        if self._pdf is None:
+            origem = self._origem
+            if isinstance(origem, bytes):
+                origem = io.BytesIO(origem)
+            self._pdf = pdfplumber.open(origem)
+        return self._pdf
+
+    @property
+    def pdfium(self):
+        if self._pdfium is None:
+            self._pdfium = pdfium.PdfDocument(self._origem)
+        return self._pdfium
+
+    @property
+    def paginas(self):
+        return self.pdfplumber.pages
+
+    @property
+    def num_paginas(self):
+        if self._pdf is None and self._pdfium is not None:
+            return len(self._pdfium)
+        return len(self.paginas)
+
+    def usar_backend(self, backend):
+        """
+        Troca o backend de texto, descartando o texto já extraído.
+        """
+        if backend is not self.backend:
+            self.backend = backend
+            self._textos = {}
+            self._texto = None
+
+    def texto_pagina(self, indice):
+        if indice not in self._textos:
+            if self.backend is not None:
+                self._textos[indice] = self.backend.texto_pagina(self, indice)
+            else:
+                self._textos[indice] = self.paginas[indice].extract_text() or ""
+        return self._textos[indice]
+
+    def tabelas_pagina(self, indice):
+        if indice not in self._tabelas:
+            self._tabelas[indice] = self.paginas[indice].extract_tables() or []
+        return self._tabelas[indice]
+
+    def liberar_pagina(self, indice):
+        """
+        Descarta a análise de layout do pdfplumber da página (caracteres,
+        linhas, retângulos), mesmo se retida. Texto e tabelas já extraídos
+        continuam guardados; a página volta a ser analisada se for usada
+        de novo.
+        """
+        self._retidas.discard(indice)
+        if self._pdf is not None:
+            self._pdf.pages[indice].close()
+
+    def iterar_paginas(self, tabelas=False):
+        """
+        Percorre as páginas uma a uma, gerando (indice, texto, tabelas)
+        (tabelas só se pedidas). O layout de cada página é liberado assim
+        que o laço avança, de modo que o pico de memória não cresce com o
+        número de páginas.
+
+        As páginas cujo texto satisfaz self.reter ficam com o layout até
+        liberar_pagina(indice) (ex.: a página da tabela de resultados, que
+        a extração dos pontos analisa logo depois do texto).
+        """
+        for i in range(self.num_paginas):
+            texto = self.texto_pagina(i)
+            if self.reter is not None and self.reter(texto):
+                self._retidas.add(i)
+            try:
+                yield i, texto, self.tabelas_pagina(i) if tabelas else None
+            finally:
+                if i not in self._retidas:
+                    self.liberar_pagina(i)
+
+    @property
+    def texto(self):
+        """
+        Texto completo do certificado (páginas vazias ignoradas),
+        já normalizado.
+        """
+        if self._texto is None:
+            texto = "\n".join(t for _, t, _ in self.iterar_paginas() if t)
+            self._texto = texto.replace("\xa0", " ").strip()
+        return self._texto
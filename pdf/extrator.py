@@ -1,21 +1,133 @@
-import pdfplumber
+from abc import ABC, abstractmethod
 
-def extrair_texto(caminho_pdf: str) -> str:
-    texto_final = ""
+from pdf.classificador import TE, classificar_documento
+from pdf.documento import CertificateDocument
+from pdf.parser_certificados import extrair_campos
+from pdf.tabelas import pagina_de_resultados
 
+
+class BackendTexto(ABC):
+    """
+    Motor de extração de texto de uma página do CertificateDocument.
+    """
+    nome = None
+
+    @abstractmethod
+    def texto_pagina(self, documento, indice):
+        """
+        Texto da página indice, linhas separadas por quebra de linha simples.
+        """
+
+
+class BackendPdfplumber(BackendTexto):
+    """
+    Layout do pdfplumber (Python puro): lento, mas é a referência das
+    expressões de pdf.parser_certificados.
+    """
+    nome = "pdfplumber"
+
+    def texto_pagina(self, documento, indice):
+        return documento.paginas[indice].extract_text() or ""
+
+
+class BackendPdfium(BackendTexto):
+    """
+    Texto nativo do PDFium (pypdfium2), ordem de grandeza mais rápido.
+
+    O texto sai na ordem em que foi escrito no PDF. Certificados com as
+    tabelas escritas linha a linha dão os mesmos campos que o pdfplumber
+    (tests/test_paridade_backends.py). Tabelas escritas coluna a coluna
+    não são suportadas: os valores perdem a linha do rótulo, faltam campos
+    obrigatórios e extrair_campos_pdf usa o pdfplumber.
+    """
+    nome = "pdfium"
+
+    def texto_pagina(self, documento, indice):
+        pagina = documento.pdfium[indice]
+        textpage = pagina.get_textpage()
+        try:
+            texto = textpage.get_text_range()
+        finally:
+            textpage.close()
+            pagina.close()
+
+        return texto.replace("\r\n", "\n").replace("\r", "\n")
+
+
+PDFPLUMBER = BackendPdfplumber()
+PDFIUM = BackendPdfium()
+
+BACKENDS = {b.nome: b for b in (PDFPLUMBER, PDFIUM)}
+
+# Backend usado primeiro na extração dos campos
+BACKEND_PADRAO = PDFIUM
+
+# Campos sem os quais o texto do backend rápido é considerado incompleto:
+# identificação, ranges e os valores lidos pelas regras de validação (sem
+# eles, regra_rangein e regra_incert_fidu deixariam de rodar)
+CAMPOS_OBRIGATORIOS = (
+    "tag",
+    "sn_instrumento",
+    "certificado",
+    "data",
+    "report_date",
+    "local",
+    "min_range",
+    "max_range",
+    "inmin_range",
+    "inmax_range",
+    "erro_fid",
+    "incerteza",
+)
+
+# Obrigatórios só para alguns tipos (regra_haste_te bloqueia sem eles)
+CAMPOS_POR_TIPO = {
+    TE: ("rod_length", "probe_diameter"),
+}
+
+
+def campos_completos(dados, tipo=None):
+    obrigatorios = CAMPOS_OBRIGATORIOS + CAMPOS_POR_TIPO.get(tipo, ())
+    return all(dados.get(c) is not None for c in obrigatorios)
+
+
+def extrair_texto(origem, backend=None) -> str:
+    """
+    Aceita um CertificateDocument já aberto ou o caminho do PDF.
+    """
     try:
-        with pdfplumber.open(caminho_pdf) as pdf:
-            for page in pdf.pages:
-                texto = page.extract_text()
-                if texto:  
-                    texto_final += texto + "\n"
-                    
+        if isinstance(origem, CertificateDocument):
+            if backend is not None:
+                origem.usar_backend(backend)
+            return origem.texto
 
-        # Normalização 
-        texto_final = texto_final.replace("\xa0", " ").strip()
-        return texto_final
+        with CertificateDocument(origem, backend=backend) as documento:
+            return documento.texto
 
     except Exception as e:
-        print(f"Erro ao ler PDF '{caminho_pdf}': {e}")
+        caminho = getattr(origem, "caminho", origem)
+        print(f"Erro ao ler PDF '{caminho}': {e}")
         return ""
 
+
+def extrair_campos_pdf(documento, backend=None) -> dict:
+    """
+    Campos do certificado pelo backend rápido; se algum campo obrigatório
+    não for encontrado (ex.: tabelas escritas coluna a coluna, ver
+    BackendPdfium), repete com o pdfplumber. Inclui o tipo do
+    instrumento ("tipo"), classificado aqui uma única vez.
+    """
+    backend = backend or BACKEND_PADRAO
+
+    dados = extrair_campos(extrair_texto(documento, backend))
+    tipo = classificar_documento(documento, dados.get("tag")).tipo
+
+    if backend is not PDFPLUMBER and not campos_completos(dados, tipo):
+        # O pdfplumber analisa cada página para o texto; a da tabela de
+        # resultados fica com o layout para a extração dos pontos
+        documento.reter = pagina_de_resultados
+        dados = extrair_campos(extrair_texto(documento, PDFPLUMBER))
+        tipo = classificar_documento(documento, dados.get("tag")).tipo
+
+    dados["tipo"] = tipo
+    return dados
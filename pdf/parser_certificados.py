@@ -1,6 +1,99 @@
 import re
 import unicodedata
 
+from pdf.documento import CertificateDocument
+
+
+# Marcadores de seção. O texto é varrido uma única vez (str.find sobre o
+# texto em minúsculas) para registrar a posição de cada marcador; cada
+# extrator aplica o seu padrão pré-compilado somente a partir dessas
+# posições, com re.match. Como todo padrão começa pelo texto do marcador,
+# o primeiro match ancorado é o mesmo que re.search encontraria varrendo
+# o texto inteiro.
+_MARCADORES = {
+    "sn": ("sn:", "num"),
+    "local": ("calibration location:",),
+    "local_fim": ("calibrated item description", "client information"),
+    "sistema": ("system description:", "descrição do sistema:"),
+    "range_calibrado": ("calibration",),
+    "range_indicado": ("indication",),
+    "rod": ("rod length:",),
+    "probe": ("probe diameter:",),
+    "metrologia": ("metrological characteristics",),
+}
+
+
+# Caracteres que re.IGNORECASE também aceita como letras ASCII
+_DOBRAS = str.maketrans({"ſ": "s", "ı": "i", "İ": "i"})
+
+
+def _posicoes(texto, literal):
+    pos = texto.find(literal)
+    while pos != -1:
+        yield pos
+        pos = texto.find(literal, pos + 1)
+
+
+class IndiceSecoes:
+    """
+    Texto do certificado com as posições de cada marcador de seção.
+    """
+
+    def __init__(self, texto):
+        self.texto = texto
+        self.posicoes = {}
+
+        if "ſ" in texto or "ı" in texto or "İ" in texto:
+            texto = texto.translate(_DOBRAS)
+
+        minusculo = texto.lower()
+        if len(minusculo) != len(texto):
+            # Algum caractere mudou de tamanho ao converter: as posições
+            # deixariam de corresponder ao texto original
+            minusculo = "".join(c.lower() if len(c.lower()) == 1 else c for c in texto)
+
+        for rotulo, literais in _MARCADORES.items():
+            posicoes = [p for literal in literais for p in _posicoes(minusculo, literal)]
+            if len(literais) > 1:
+                posicoes.sort()
+            self.posicoes[rotulo] = posicoes
+
+        # "y = a + b.x": o "=" é raro; volta até o "y" que o antecede
+        curva = []
+        for p in _posicoes(texto, "="):
+            i = p - 1
+            while i >= 0 and texto[i].isspace():
+                i -= 1
+            if i >= 0 and texto[i] in "yY":
+                curva.append(i)
+        self.posicoes["curva"] = curva
+
+    def buscar(self, rotulo, padrao):
+        for pos in self.posicoes.get(rotulo, ()):
+            m = padrao.match(self.texto, pos)
+            if m:
+                return m
+        return None
+
+    def buscar_todos(self, rotulo, padrao):
+        # Mesma semântica de re.findall: matches não sobrepostos
+        fim = 0
+        for pos in self.posicoes.get(rotulo, ()):
+            if pos < fim:
+                continue
+            m = padrao.match(self.texto, pos)
+            if m:
+                fim = m.end()
+                yield m
+
+
+def _indice(texto):
+    return texto if isinstance(texto, IndiceSecoes) else IndiceSecoes(texto)
+
+
+# Equivalente a buscar "Y = a + b.X" no texto em maiúsculas e com vírgula
+# trocada por ponto, sem precisar copiar o texto inteiro
+_RE_CURVA = re.compile(r"[yY]\s*=\s*([\-0-9.,]+)\s*\+\s*([0-9.,]+)\s*[.,*xX×]\s*[xX]")
 
 
 def extrair_curva_calibracao(texto):
@@ -10,17 +103,14 @@ def extrair_curva_calibracao(texto):
     onde x e y estão em kPa
     """
 
-    texto = texto.upper().replace(",", ".")
-
-    padrao = r"Y\s*=\s*([\-0-9.]+)\s*\+\s*([0-9.]+)\s*[\.\*X×]\s*X"
-    m = re.search(padrao, texto)
+    m = _indice(texto).buscar("curva", _RE_CURVA)
 
     if not m:
         return None
 
     return {
-        "a": float(m.group(1)),
-        "b": float(m.group(2))
+        "a": float(m.group(1).replace(",", ".")),
+        "b": float(m.group(2).replace(",", "."))
     }
 
 def aplicar_curva_kpa(valor_ma, curva):
@@ -45,6 +135,9 @@ def aplicar_curva_kpa(valor_ma, curva):
 def normalizar_num(valor):
     if valor is None:
         return None
+    # Já convertido (dados do cache, registro do banco)
+    if type(valor) is float:
+        return valor
     try:
         return float(str(valor).replace(",", "."))
     except Exception:
@@ -52,119 +145,144 @@ def normalizar_num(valor):
 
 
 def normalizar_texto(texto):
+    """
+    Maiúsculas e sem acentos, para comparações ("Macaé" → "MACAE").
+    """
     if not texto:
         return None
     texto = texto.upper()
+    # Sem acentos não há o que decompor
+    if texto.isascii():
+        return texto
     texto = unicodedata.normalize("NFKD", texto)
     return "".join(c for c in texto if not unicodedata.combining(c))
 
 
 
+_TRACOS = str.maketrans({c: "-" for c in "‐‒–—―"})
+
+_RE_TAG = re.compile(r"TAG:\s*([0-9A-Za-z]+(?:\s*[-‐‒–—―]\s*[0-9A-Za-z]+)+)")
+_RE_TAG_HIFEN = re.compile(r"\s*-\s*")
+
+
 def extrair_tag(texto):
-    padrao = r"TAG:\s*([0-9A-Za-z]+(?:\s*[-‐‒–—―]\s*[0-9A-Za-z]+)+)"
-    m = re.search(padrao, texto)
+    m = _RE_TAG.search(texto)
     if not m:
         return None
 
-    tag = (
-        m.group(1)
-        .replace("‐", "-")
-        .replace("‒", "-")
-        .replace("–", "-")
-        .replace("—", "-")
-        .replace("―", "-")
-    )
-    return re.sub(r"\s*-\s*", "-", tag).strip()
+    tag = m.group(1).translate(_TRACOS)
+    return _RE_TAG_HIFEN.sub("-", tag).strip()
+
+
+_RE_SN = re.compile(r"(?:SN|Num\.?\s*de\s*Série):\s*([^\s]+)", flags=re.IGNORECASE)
 
 
 def extrair_sn(texto):
-    encontrados = re.findall(
-        r"(?:SN|Num\.?\s*de\s*Série):\s*([^\s]+)",
-        texto,
-        flags=re.IGNORECASE
-    )
+    encontrados = [m.group(1) for m in _indice(texto).buscar_todos("sn", _RE_SN)]
     sns_validos = [s for s in encontrados if any(c.isdigit() for c in s)]
     sn_inst = sns_validos[0] if len(sns_validos) >= 1 else None
     sn_sensor = sns_validos[1] if len(sns_validos) >= 2 else None
     return sn_inst, sn_sensor
 
 
+_RE_CERTIFICADO = re.compile(r"Nº\s*([^\n]+)")
+
+
 def extrair_certificado(texto):
-    m = re.search(r"Nº\s*([^\n]+)", texto)
+    m = _RE_CERTIFICADO.search(texto)
     return m.group(1).strip() if m else None
 
 
+_RE_DATA_CAL = re.compile(
+    r"(Calibration Date|Data da Calibração):\s*([0-9]{2}/[0-9]{2}/[0-9]{4})",
+    flags=re.IGNORECASE
+)
+_RE_DATA_REP = re.compile(
+    r"(Report Date|Data do Relatório):\s*([0-9]{2}/[0-9]{2}/[0-9]{4})",
+    flags=re.IGNORECASE
+)
+
+
 def extrair_datas(texto):
-    m_cal = re.search(
-        r"(Calibration Date|Data da Calibração):\s*([0-9]{2}/[0-9]{2}/[0-9]{4})",
-        texto,
-        flags=re.IGNORECASE
-    )
-    m_rep = re.search(
-        r"(Report Date|Data do Relatório):\s*([0-9]{2}/[0-9]{2}/[0-9]{4})",
-        texto,
-        flags=re.IGNORECASE
-    )
+    m_cal = _RE_DATA_CAL.search(texto)
+    m_rep = _RE_DATA_REP.search(texto)
     return (
         m_cal.group(2) if m_cal else None,
         m_rep.group(2) if m_rep else None
     )
 
 
+_RE_LOCAL_NOME = re.compile(
+    r"(Name|Address|Nome|Endereço):\s*([A-Za-z0-9 \-_/]+)",
+    flags=re.IGNORECASE
+)
+
+
 def extrair_local(texto):
-    bloco = re.search(
-        r"CALIBRATION LOCATION:(.*?)(?:CALIBRATED ITEM DESCRIPTION|CLIENT INFORMATION|$)",
-        texto,
-        flags=re.DOTALL | re.IGNORECASE
-    )
+    """
+    Bloco entre CALIBRATION LOCATION: e CALIBRATED ITEM DESCRIPTION /
+    CLIENT INFORMATION (ou o fim do texto).
+    """
+    indice = _indice(texto)
+    inicios = indice.posicoes.get("local")
 
-    if not bloco:
+    if not inicios:
         return None
 
-    m = re.search(
-        r"(Name|Address|Nome|Endereço):\s*([A-Za-z0-9 \-_/]+)",
-        bloco.group(1),
-        flags=re.IGNORECASE
+    inicio = inicios[0] + len("CALIBRATION LOCATION:")
+    fim = next(
+        (p for p in indice.posicoes.get("local_fim", ()) if p >= inicio),
+        len(indice.texto)
     )
 
+    m = _RE_LOCAL_NOME.search(indice.texto, inicio, fim)
+
     return m.group(2).strip() if m else None
 
 
+_RE_SISTEMA = re.compile(
+    r"(?:System Description|Descrição do Sistema):\s*([\s\S]+?)"
+    r"(?=\n(?:Name:|Address:|Calibrated|Classification|Classificação|"
+    r"Periodicidade|Periodicity|Next Calibration|Próxima Calibração|"
+    r"LOCAL ENVIRONMENTAL|REFERENCE STANDARDS|ITEM|TAG|SN))",
+    flags=re.DOTALL | re.IGNORECASE
+)
+_RE_ESPACOS = re.compile(r"\s+")
+_RE_PERIODICIDADE = re.compile(r"\b(Periodicity|Periodicidade)\b.*$", flags=re.IGNORECASE)
+
+
 def extrair_sistema(texto):
-    m = re.search(
-        r"(?:System Description|Descrição do Sistema):\s*([\s\S]+?)"
-        r"(?=\n(?:Name:|Address:|Calibrated|Classification|Classificação|"
-        r"Periodicidade|Periodicity|Next Calibration|Próxima Calibração|"
-        r"LOCAL ENVIRONMENTAL|REFERENCE STANDARDS|ITEM|TAG|SN))",
-        texto,
-        flags=re.DOTALL | re.IGNORECASE
-    )
+    m = _indice(texto).buscar("sistema", _RE_SISTEMA)
 
     if not m:
         return None
 
-    sistema = re.sub(r"\s+", " ", m.group(1)).strip()
+    sistema = _RE_ESPACOS.sub(" ", m.group(1)).strip()
 
     # 🔒 remove Periodicity / Periodicidade se vier colado no sistema
-    sistema = re.sub(
-        r"\b(Periodicity|Periodicidade)\b.*$",
-        "",
-        sistema,
-        flags=re.IGNORECASE
-    ).strip()
+    sistema = _RE_PERIODICIDADE.sub("", sistema).strip()
 
     return sistema
 
 
 
-def extrair_range_calibrado(texto):
-    padrao = r"""
+_RE_RANGE_CALIBRADO = re.compile(r"""
     Calibration\s*Range.*?
     Min\s*[:\-]?\s*([-+]?[0-9.,]+)
     .*?
     Max\s*[:\-]?\s*([-+]?[0-9.,]+)
-    """
-    m = re.search(padrao, texto, flags=re.I | re.S | re.VERBOSE)
+    """, flags=re.I | re.S | re.VERBOSE)
+
+_RE_RANGE_INDICADO = re.compile(r"""
+    Indication\s*Range.*?
+    Min\s*[:\-]?\s*([-+]?[0-9.,]+)
+    .*?
+    Max\s*[:\-]?\s*([-+]?[0-9.,]+)
+    """, flags=re.I | re.S | re.VERBOSE)
+
+
+def extrair_range_calibrado(texto):
+    m = _indice(texto).buscar("range_calibrado", _RE_RANGE_CALIBRADO)
     return (
         normalizar_num(m.group(1)) if m else None,
         normalizar_num(m.group(2)) if m else None
@@ -172,13 +290,7 @@ def extrair_range_calibrado(texto):
 
 
 def extrair_range_indicado(texto):
-    padrao = r"""
-    Indication\s*Range.*?
-    Min\s*[:\-]?\s*([-+]?[0-9.,]+)
-    .*?
-    Max\s*[:\-]?\s*([-+]?[0-9.,]+)
-    """
-    m = re.search(padrao, texto, flags=re.I | re.S | re.VERBOSE)
+    m = _indice(texto).buscar("range_indicado", _RE_RANGE_INDICADO)
     return (
         normalizar_num(m.group(1)) if m else None,
         normalizar_num(m.group(2)) if m else None
@@ -186,9 +298,14 @@ def extrair_range_indicado(texto):
 
 
 
+_RE_ROD = re.compile(r"Rod length:\s*([\d,.]+)", flags=re.IGNORECASE)
+_RE_PROBE = re.compile(r"Probe diameter:\s*([\d,.]+)", flags=re.IGNORECASE)
+
+
 def extrair_haste(texto):
-    rod = re.search(r"Rod length:\s*([\d,.]+)", texto, flags=re.IGNORECASE)
-    probe = re.search(r"Probe diameter:\s*([\d,.]+)", texto, flags=re.IGNORECASE)
+    indice = _indice(texto)
+    rod = indice.buscar("rod", _RE_ROD)
+    probe = indice.buscar("probe", _RE_PROBE)
 
     return (
         normalizar_num(rod.group(1)) if rod else None,
@@ -197,13 +314,7 @@ def extrair_haste(texto):
 
 
 
-def extrair_erro_incerteza(texto):
-    """
-    Extrai Erro Fiducial e Incerteza a partir da tabela
-    'Metrological characteristics', ignorando curva de calibração.
-    """
-
-    padrao = r"""
+_RE_ERRO_INCERTEZA = re.compile(r"""
     Metrological\ characteristics.*?          # início do bloco
     Repeatability.*?Uncertainty                # cabeçalho (EN)
     .*?\n                                     # quebra de linha
@@ -213,13 +324,16 @@ def extrair_erro_incerteza(texto):
     ([-+]?\d+[.,]\d+)\s*%?\s+                 # histerese
     ([-+]?\d+[.,]\d+)\s*%?\s+                 # ERRO FIDUCIAL  ← grupo 3
     ([-+]?\d+[.,]\d+)\s*%?                    # INCERTEZA      ← grupo 4
+    """, flags=re.IGNORECASE | re.DOTALL | re.VERBOSE)
+
+
+def extrair_erro_incerteza(texto):
+    """
+    Extrai Erro Fiducial e Incerteza a partir da tabela
+    'Metrological characteristics', ignorando curva de calibração.
     """
 
-    m = re.search(
-        padrao,
-        texto,
-        flags=re.IGNORECASE | re.DOTALL | re.VERBOSE
-    )
+    m = _indice(texto).buscar("metrologia", _RE_ERRO_INCERTEZA)
 
     if not m:
         return None, None
@@ -234,21 +348,28 @@ def extrair_erro_incerteza(texto):
 
 
 
-def extrair_campos(texto: str) -> dict:
+def extrair_campos(texto) -> dict:
+    # Aceita também o CertificateDocument, reaproveitando o texto já extraído
+    if isinstance(texto, CertificateDocument):
+        texto = texto.texto
+
+    # Texto indexado uma única vez por seção
+    indice = IndiceSecoes(texto)
+
     tag = extrair_tag(texto)
-    sn_inst, sn_sensor = extrair_sn(texto)
+    sn_inst, sn_sensor = extrair_sn(indice)
     certificado = extrair_certificado(texto)
     data_cal, report_date = extrair_datas(texto)
-    local = extrair_local(texto)
-    sistema = extrair_sistema(texto)
+    local = extrair_local(indice)
+    sistema = extrair_sistema(indice)
 
-    min_range, max_range = extrair_range_calibrado(texto)
-    inmin_range, inmax_range = extrair_range_indicado(texto)
+    min_range, max_range = extrair_range_calibrado(indice)
+    inmin_range, inmax_range = extrair_range_indicado(indice)
 
-    rod_length, probe_diameter = extrair_haste(texto)
-    erro_fid, incerteza = extrair_erro_incerteza(texto)
+    rod_length, probe_diameter = extrair_haste(indice)
+    erro_fid, incerteza = extrair_erro_incerteza(indice)
 
-    curva_de_calibracao = extrair_curva_calibracao(texto)
+    curva_de_calibracao = extrair_curva_calibracao(indice)
    
 
     return {
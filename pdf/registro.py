@@ -0,0 +1,71 @@
+from pdf.classificador import tipo_do_certificado
+from pdf.parser_certificados import normalizar_num, normalizar_texto
+
+
+class PontosCalibracao:
+    """
+    Tabela de resultados (pontos de extrair_pontos_calibracao_pdf) em
+    colunas, na ordem do certificado, para as regras percorrerem cada
+    grandeza de uma vez. Valores ausentes ficam como None.
+    """
+    __slots__ = ("referencia", "tendencia", "incerteza", "k")
+
+    def __init__(self, pontos):
+        self.referencia = [p.get("referencia") for p in pontos]
+        self.tendencia = [p.get("tendencia") for p in pontos]
+        self.incerteza = [p.get("incerteza") for p in pontos]
+        self.k = [p.get("k") for p in pontos]
+
+    def __len__(self):
+        return len(self.referencia)
+
+    def __repr__(self):
+        return f"PontosCalibracao({len(self)} pontos)"
+
+
+class RegistroCertificado:
+    """
+    Campos de um certificado (dicionário de extrair_campos) já prontos
+    para a validação: números convertidos, LOCAL normalizado e tipo do
+    instrumento resolvido. Montado uma vez por certificado; as regras só
+    leem os atributos.
+
+    pontos é a tabela de resultados em colunas (PontosCalibracao), ou
+    None se o certificado não tem pontos.
+    """
+    __slots__ = (
+        "tag", "sn_instrumento", "sn_sensor", "certificado", "data", "report_date",
+        "local", "local_normalizado", "sistema",
+        "min_range", "max_range", "inmin_range", "inmax_range",
+        "rod_length", "probe_diameter", "erro_fid", "incerteza",
+        "tipo", "pontos"
+    )
+
+    def __init__(self, dados_pdf, pontos=None):
+        get = dados_pdf.get
+
+        self.tag = get("tag")
+        self.sn_instrumento = get("sn_instrumento")
+        self.sn_sensor = get("sn_sensor")
+        self.certificado = get("certificado")
+        self.data = get("data")
+        self.report_date = get("report_date")
+        self.sistema = get("sistema")
+
+        self.local = get("local")
+        self.local_normalizado = normalizar_texto(self.local) or ""
+
+        self.min_range = normalizar_num(get("min_range"))
+        self.max_range = normalizar_num(get("max_range"))
+        self.inmin_range = normalizar_num(get("inmin_range"))
+        self.inmax_range = normalizar_num(get("inmax_range"))
+        self.rod_length = normalizar_num(get("rod_length"))
+        self.probe_diameter = normalizar_num(get("probe_diameter"))
+        self.erro_fid = normalizar_num(get("erro_fid"))
+        self.incerteza = normalizar_num(get("incerteza"))
+
+        self.tipo = tipo_do_certificado(dados_pdf, pontos)
+        self.pontos = PontosCalibracao(pontos) if pontos else None
+
+    def __repr__(self):
+        return f"RegistroCertificado(tag={self.tag!r}, certificado={self.certificado!r}, tipo={self.tipo!r})"
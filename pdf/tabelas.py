@@ -0,0 +1,131 @@
+import re
+
+
+# Posição da tabela de resultados entre as tabelas (> 2 linhas) do
+# certificado, por tipo de instrumento: usada quando o cabeçalho não é
+# localizado (a seleção de antes, tabelas[0] ou tabelas[1])
+INDICE_TABELA = {"TE": 0, "TT": 0, "PT": 1, "DPT": 1}
+
+# Parâmetros de detecção do pdfplumber: os mesmos do extract_tables
+# padrão para todos os tipos (não há amostras que justifiquem ajuste por
+# tipo)
+TABLE_SETTINGS = {
+    "vertical_strategy": "lines",
+    "horizontal_strategy": "lines",
+    "snap_tolerance": 3,
+    "join_tolerance": 3,
+    "intersection_tolerance": 3,
+}
+
+# Cabeçalho da tabela de resultados: colunas de tendência e incerteza
+_RE_TENDENCIA = re.compile(r"TENDENCY|TENDÊNCIA|TENDENCIA|BIAS", flags=re.IGNORECASE)
+_RE_INCERTEZA = re.compile(r"UNCERTAINTY|INCERTEZA", flags=re.IGNORECASE)
+
+# Distância vertical máxima entre as palavras do cabeçalho (células com
+# quebra de linha)
+TOLERANCIA_CABECALHO = 15
+
+# Quanto acima da palavra de tendência a região recortada começa: a
+# borda superior da tabela fica acima do cabeçalho, que pode ter células
+# com mais de uma linha
+MARGEM_REGIAO = 2 * TOLERANCIA_CABECALHO
+
+
+def pagina_de_resultados(texto):
+    """
+    O texto da página tem as palavras do cabeçalho da tabela de
+    resultados.
+    """
+    return bool(_RE_TENDENCIA.search(texto) and _RE_INCERTEZA.search(texto))
+
+
+def _localizar_cabecalho(pagina):
+    """
+    Procura o cabeçalho nos caracteres da página (já carregados para o
+    texto), sem reagrupar palavras. Retorna o caractere inicial da
+    palavra de tendência.
+    """
+    chars = pagina.chars
+    sequencia = "".join(c["text"][:1] or " " for c in chars)
+
+    incertezas = [chars[m.start()] for m in _RE_INCERTEZA.finditer(sequencia)]
+    if not incertezas:
+        return None
+
+    for m in _RE_TENDENCIA.finditer(sequencia):
+        t = chars[m.start()]
+        for u in incertezas:
+            if u["x0"] > t["x0"] and abs(u["top"] - t["top"]) <= TOLERANCIA_CABECALHO:
+                return t
+
+    return None
+
+
+def _contem(bbox, char):
+    x0, top, x1, bottom = bbox
+    return (
+        x0 <= char["x0"] and char["x1"] <= x1 and
+        top <= char["top"] and char["bottom"] <= bottom
+    )
+
+
+def tabela_por_ordem(documento, indice):
+    """
+    N-ésima tabela com mais de 2 linhas, na ordem do documento.
+    Para de extrair tabelas assim que ela é encontrada.
+    """
+    encontradas = 0
+
+    for _, _, tabelas in documento.iterar_paginas(tabelas=True):
+        for tabela in tabelas:
+            if tabela and len(tabela) > 2:
+                if encontradas == indice:
+                    return tabela
+                encontradas += 1
+
+    return None
+
+
+def _tabela_do_cabecalho(pagina, cabecalho):
+    for tabela in pagina.find_tables(TABLE_SETTINGS):
+        if _contem(tabela.bbox, cabecalho):
+            linhas = tabela.extract()
+            if linhas and len(linhas) > 2:
+                return linhas
+    return None
+
+
+def localizar_tabela_resultados(documento, tipo):
+    """
+    Localiza a tabela de resultados da calibração pelo cabeçalho
+    (tendência + incerteza na mesma linha). A detecção de tabelas roda
+    só na região da página do cabeçalho que começa logo acima dele
+    (page.within_bbox): as tabelas acima e as demais páginas não são
+    analisadas. Se a tabela não couber na região (linhas acima do
+    cabeçalho na mesma tabela), a página inteira é analisada. Sem
+    cabeçalho reconhecível, usa a ordem das tabelas no documento.
+    """
+    for i, texto, _ in documento.iterar_paginas():
+        # Texto da página já extraído: descarta páginas sem o cabeçalho
+        if not pagina_de_resultados(texto):
+            continue
+
+        # Página retida pela extração do texto (ver extrair_campos_pdf):
+        # o layout já analisado é usado aqui e liberado em seguida
+        pagina = documento.paginas[i]
+        try:
+            cabecalho = _localizar_cabecalho(pagina)
+            if cabecalho is None:
+                continue
+
+            topo = max(0, cabecalho["top"] - MARGEM_REGIAO)
+            regiao = pagina.within_bbox((0, topo, pagina.width, pagina.height))
+            linhas = _tabela_do_cabecalho(regiao, cabecalho)
+            if linhas is None:
+                linhas = _tabela_do_cabecalho(pagina, cabecalho)
+            if linhas is not None:
+                return linhas
+        finally:
+            documento.liberar_pagina(i)
+
+    return tabela_por_ordem(documento, INDICE_TABELA[tipo])
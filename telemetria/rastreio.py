@@ -0,0 +1,218 @@
+"""
+Rastreamento das etapas do processamento (spans) em arquivo JSON-lines.
+
+Desligado por padrão. Para ligar, defina antes de iniciar o programa:
+
+    AC_TRACE=1                      liga o rastreamento
+    AC_TRACE_ARQUIVO=trace.jsonl    arquivo de saída (padrão: trace_ac.jsonl)
+
+Cada linha do arquivo é um span:
+
+    {"nome": "db.buscar_instrumento_por_tag", "trace": "...", "span": "...",
+     "pai": "...", "inicio": 1760000000.123, "duracao_ms": 0.41,
+     "atributos": {"tag": "20-PIT-1001", "certificado": "1234/2025", ...},
+     "erro": null}
+
+Os atributos de contexto (certificado, tag, tipo, arquivo) são herdados
+pelos spans filhos, para que as consultas ao banco e as etapas internas
+apareçam associadas ao certificado. O arquivo é rotacionado ao atingir
+LIMITE_BYTES; processos do pool do lote gravam em arquivos próprios.
+
+Com o rastreamento desligado, span() devolve um objeto nulo compartilhado
+e rastrear() devolve a própria função, sem custo adicional por chamada.
+"""
+import functools
+import inspect
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from logging.handlers import RotatingFileHandler
+
+
+ATIVO = os.environ.get("AC_TRACE", "").strip().lower() not in ("", "0", "false", "nao", "não")
+
+caminho_trace = os.environ.get("AC_TRACE_ARQUIVO", "trace_ac.jsonl")
+
+LIMITE_BYTES = 5 * 1024 * 1024
+BACKUPS = 3
+
+ATRIBUTOS_CONTEXTO = ("certificado", "tag", "tipo", "arquivo")
+
+_local = threading.local()
+_logger = None
+_trava = threading.Lock()
+
+
+def _arquivo_do_processo():
+    # A rotação do RotatingFileHandler não é segura entre processos
+    if multiprocessing.parent_process() is None:
+        return caminho_trace
+    base, ext = os.path.splitext(caminho_trace)
+    return f"{base}.{os.getpid()}{ext}"
+
+
+def _obter_logger():
+    global _logger
+    if _logger is None:
+        with _trava:
+            if _logger is None:
+                logger = logging.getLogger("ac.rastreio")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                handler = RotatingFileHandler(
+                    _arquivo_do_processo(),
+                    maxBytes=LIMITE_BYTES,
+                    backupCount=BACKUPS,
+                    encoding="utf-8"
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(handler)
+                _logger = logger
+    return _logger
+
+
+def _pilha():
+    pilha = getattr(_local, "pilha", None)
+    if pilha is None:
+        pilha = _local.pilha = []
+    return pilha
+
+
+class _SpanNulo:
+    """
+    Span usado com o rastreamento desligado: não mede nem grava nada.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def definir(self, **atributos):
+        pass
+
+
+_NULO = _SpanNulo()
+
+
+class Span:
+    __slots__ = ("nome", "trace", "id", "pai", "atributos", "_inicio", "_relogio")
+
+    def __init__(self, nome, atributos):
+        self.nome = nome
+        self.id = uuid.uuid4().hex[:16]
+        self.atributos = atributos
+
+    def __enter__(self):
+        pilha = _pilha()
+        if pilha:
+            pai = pilha[-1]
+            self.trace = pai.trace
+            self.pai = pai.id
+            herdados = {k: pai.atributos[k] for k in ATRIBUTOS_CONTEXTO if k in pai.atributos}
+            self.atributos = {**herdados, **self.atributos}
+        else:
+            self.trace = self.id
+            self.pai = None
+
+        pilha.append(self)
+        self._inicio = time.time()
+        self._relogio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo_exc, exc, tb):
+        duracao = (time.perf_counter() - self._relogio) * 1000
+        pilha = _pilha()
+        if pilha and pilha[-1] is self:
+            pilha.pop()
+
+        registro = {
+            "nome": self.nome,
+            "trace": self.trace,
+            "span": self.id,
+            "pai": self.pai,
+            "inicio": round(self._inicio, 6),
+            "duracao_ms": round(duracao, 3),
+            "atributos": self.atributos,
+            "erro": f"{tipo_exc.__name__}: {exc}" if tipo_exc else None
+        }
+        try:
+            _obter_logger().info(json.dumps(registro, ensure_ascii=False, default=str))
+        except Exception as e:
+            print(f"Erro ao gravar rastreamento: {e}")
+        return False
+
+    def definir(self, **atributos):
+        """
+        Acrescenta atributos ao span (ex.: TAG conhecida só após a leitura).
+        """
+        self.atributos.update(atributos)
+
+
+def span(nome, **atributos):
+    """
+    Context manager que mede a etapa "nome":
+
+        with span("pdf.campos", arquivo=caminho) as s:
+            ...
+            s.definir(tag=dados["tag"])
+    """
+    if not ATIVO:
+        return _NULO
+    return Span(nome, atributos)
+
+
+def definir_atributos(**atributos):
+    """
+    Define atributos no span corrente da thread (sem efeito se não houver).
+    """
+    if not ATIVO:
+        return
+    pilha = _pilha()
+    if pilha:
+        pilha[-1].definir(**atributos)
+
+
+def atributos_certificado(dados_pdf, pontos=None):
+    """
+    Atributos de contexto a partir dos dados extraídos do certificado.
+    """
+    dados_pdf = dados_pdf or {}
+    return {
+        "certificado": dados_pdf.get("certificado"),
+        "tag": dados_pdf.get("tag"),
+        "tipo": dados_pdf.get("tipo") or (pontos[0].get("tipo") if pontos else None)
+    }
+
+
+def rastrear(nome, *argumentos):
+    """
+    Decorador que envolve a função num span. Os nomes em "argumentos"
+    são copiados dos parâmetros da chamada para os atributos do span.
+
+    Com o rastreamento desligado a função é devolvida sem alteração.
+    """
+    def decorador(funcao):
+        if not ATIVO:
+            return funcao
+
+        assinatura = inspect.signature(funcao)
+
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            atributos = {}
+            if argumentos:
+                chamada = assinatura.bind_partial(*args, **kwargs).arguments
+                atributos = {a: chamada[a] for a in argumentos if a in chamada}
+            with Span(nome, atributos):
+                return funcao(*args, **kwargs)
+
+        return envolvida
+
+    return decorador
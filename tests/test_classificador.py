@@ -0,0 +1,114 @@
+"""
+pdf.classificador contra as verificações anteriores à classificação
+única: prefixo/sufixo da TAG na AC (gerar_ac) e termos do texto completo
+na extração dos pontos (extrair_pontos_calibracao_pdf).
+"""
+import itertools
+
+import pytest
+
+from config.validacao import compilar
+from pdf.classificador import DPT, PT, TE, TT, classificar_documento, classificar_texto
+
+
+def tipo_da_tag_antigo(tag):
+    tag = (tag or "").upper()
+    if tag.startswith("TE") or tag.endswith("-TE") or "-TE-" in tag:
+        return TE
+    if (
+        tag.startswith(("TT", "TIT", "TI")) or
+        tag.endswith(("-TT", "-TIT", "-TI")) or
+        any(x in tag for x in ("-TT-", "-TIT-", "-TI-"))
+    ):
+        return TT
+    if (
+        tag.startswith(("PT", "PIT")) or
+        tag.endswith(("-PT", "-PIT")) or
+        any(x in tag for x in ("-PT-", "-PIT-"))
+    ):
+        return PT
+    return DPT
+
+
+def tipo_do_texto_antigo(texto):
+    texto_upper = texto.upper()
+    is_te = "THERMORESISTANCE" in texto_upper or "TERMORRESISTÊNCIA" in texto_upper
+    is_tt = any(t in texto_upper for t in ("DIGITAL THERMOMETER", "TEMPERATURE TRANSMITTER", "-TT", "TRANSMISSOR DE TEMPERATURA"))
+    is_pt = any(t in texto_upper for t in ("PRESSURE", "PRESSÃO", "-PT"))
+    is_dpt = any(t in texto_upper for t in ("DIFFERENTIAL", "DIFERENCIAL", "-DPT", "PDIT"))
+
+    if is_te and not is_tt:
+        return TE
+    if is_tt:
+        return TT
+    if is_pt or is_dpt:
+        return DPT if is_dpt else PT
+    return None
+
+
+SEGMENTOS = ("20", "TE", "TT", "TIT", "TI", "PT", "PIT", "DPT", "PDIT", "TEMP", "1001", "X", "pit")
+TAGS = [
+    "-".join(partes)
+    for n in (1, 2, 3, 4)
+    for partes in itertools.product(SEGMENTOS, repeat=n)
+    if n < 4 or len(set(partes)) == 4
+][:20000] + ["X-TIT-1001-TE", "20-PIT-1001", "20-PDIT-1001", "", None]
+
+
+def test_tag_segue_a_precedencia_da_ac():
+    config = compilar()
+    for tag in TAGS:
+        antigo = tipo_da_tag_antigo(tag)
+        novo = config.tipo_da_tag(tag)
+        if antigo == DPT:
+            # A AC assumia DPT para TAGs sem código: agora o texto decide
+            assert novo in (DPT, None), tag
+        else:
+            assert novo == antigo, tag
+
+
+def test_tag_te_no_fim_vence_codigo_de_tt():
+    assert compilar().tipo_da_tag("X-TIT-1001-TE") == TE
+
+
+TERMOS = (
+    "THERMORESISTANCE", "Termorresistência", "Digital thermometer", "TEMPERATURE TRANSMITTER",
+    "20-TT-1001", "Transmissor de temperatura", "PRESSURE", "pressão", "20-PT-1", "DIFFERENTIAL",
+    "diferencial", "20-DPT-1", "PDIT", "ambient conditions",
+)
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3])
+def test_texto_segue_a_precedencia_da_extracao_dos_pontos(n):
+    for termos in itertools.combinations(TERMOS, n):
+        texto = "\n".join(termos)
+        assert classificar_texto(texto) == tipo_do_texto_antigo(texto), termos
+
+
+class DocumentoFalso:
+    def __init__(self, paginas):
+        self.paginas = paginas
+
+    @property
+    def num_paginas(self):
+        return len(self.paginas)
+
+    def texto_pagina(self, indice):
+        return self.paginas[indice]
+
+    @property
+    def texto(self):
+        return "\n".join(self.paginas)
+
+
+@pytest.mark.parametrize("paginas, esperado", [
+    (["Calibration of PRESSURE transmitter", "TEMPERATURE TRANSMITTER"], TT),
+    (["Ambient PRESSURE 1013 hPa", "THERMORESISTANCE"], TE),
+    (["PRESSURE", "DIFFERENTIAL"], DPT),
+    (["PRESSURE", "nada"], PT),
+    (["TEMPERATURE TRANSMITTER", "PRESSURE"], TT),
+    (["nada", "nada"], None),
+])
+def test_documento_igual_ao_texto_completo(paginas, esperado):
+    documento = DocumentoFalso(paginas)
+    assert classificar_documento(documento).tipo == esperado == tipo_do_texto_antigo("\n".join(paginas))
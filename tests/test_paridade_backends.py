@@ -0,0 +1,52 @@
+"""
+Paridade dos backends de texto de pdf.extrator nos certificados
+sintéticos (benchmarks.sintetico).
+
+- Layout "linhas" (cada linha da tabela escrita da esquerda para a
+  direita): o pdfium é suportado e extrair_campos devolve o mesmo
+  dicionário que com o pdfplumber.
+- Layout "colunas" (tabela escrita coluna a coluna): o pdfium devolve o
+  texto na ordem do conteúdo e perde campos; esses certificados vão para
+  o pdfplumber (fallback de extrair_campos_pdf), e o resultado final é o
+  do pdfplumber.
+"""
+import pytest
+
+from benchmarks.sintetico import TIPOS, gerar_certificado
+from pdf.documento import CertificateDocument
+from pdf.extrator import PDFIUM, PDFPLUMBER, campos_completos, extrair_campos_pdf, extrair_texto
+from pdf.classificador import classificar_documento
+from pdf.parser_certificados import extrair_campos
+
+
+def _campos(pdf, backend):
+    with CertificateDocument(pdf, backend=backend) as doc:
+        dados = extrair_campos(extrair_texto(doc))
+        return dados, classificar_documento(doc, dados.get("tag")).tipo
+
+
+@pytest.mark.parametrize("paginas_extra", [0, 3])
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_pdfium_igual_ao_pdfplumber_no_layout_linhas(tipo, paginas_extra):
+    pdf = gerar_certificado(tipo, paginas_extra=paginas_extra, layout="linhas")
+
+    referencia, tipo_referencia = _campos(pdf, PDFPLUMBER)
+    rapido, tipo_rapido = _campos(pdf, PDFIUM)
+
+    assert rapido == referencia
+    assert tipo_rapido == tipo_referencia
+    assert campos_completos(rapido, tipo_rapido)
+
+
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_layout_colunas_vai_para_o_pdfplumber(tipo):
+    pdf = gerar_certificado(tipo, layout="colunas")
+
+    rapido, tipo_rapido = _campos(pdf, PDFIUM)
+    assert not campos_completos(rapido, tipo_rapido)
+
+    referencia, tipo_referencia = _campos(pdf, PDFPLUMBER)
+    with CertificateDocument(pdf) as doc:
+        obtido = extrair_campos_pdf(doc)
+
+    assert obtido == {**referencia, "tipo": tipo_referencia}
@@ -0,0 +1,88 @@
+"""
+Planos de consulta (EXPLAIN QUERY PLAN) das instruções de
+data.repositorio e data.historico, num banco criado pelas migrações
+(data.migracoes) com linhas suficientes para o planejador preferir
+índices: nenhuma percorre uma tabela inteira (SCAN). Também num banco
+legado com TAGs duplicadas, em que o índice de TAG não é único.
+"""
+import sqlite3
+
+import pytest
+
+from data import historico, repositorio
+from data.migracoes import MIGRACOES, migrar
+
+
+CONSULTAS = {
+    "buscar_por_tag": (repositorio._SQL_POR_TAG, ("20-PIT-00001",)),
+    "buscar_por_sn_instrumento": (repositorio._SQL_POR_SN_INSTRUMENTO, ("SN0000001",)),
+    "buscar_por_sn_sensor": (repositorio._SQL_POR_SN_SENSOR, ("S000001",)),
+    "resolver": (repositorio._SQL_CANDIDATOS, ("20-PIT-00001", "SN0000002", "S000003")),
+    "resolver_varios": (
+        repositorio._SQL_CANDIDATOS_VARIOS.format("?, ?"),
+        ("20-PIT-00001", "20-PIT-00002", "SN0000003", "SN0000004", "S000005", "S000006")
+    ),
+    "atualizar_sn": (repositorio._SQL_ATUALIZAR_SN, ("SN", "20-PIT-00001")),
+    "atualizar_sn_sensor": (repositorio._SQL_ATUALIZAR_SN_SENSOR, ("S", "20-PIT-00001")),
+    "atualizar_tag": (repositorio._SQL_ATUALIZAR_TAG, ("20-PIT-X", "20-PIT-00001")),
+    "atualizar_range": (repositorio._SQL_ATUALIZAR_RANGE, (0.0, 1.0, "20-PIT-00001")),
+    "historico.registrar": (historico._SQL_ID, ("1234/2025", "20-PIT-00001")),
+    "historico.por_tag": historico.sql_busca(tag="20-PIT-00001"),
+    "historico.por_sn": historico.sql_busca(sn_instrumento="SN0000001", limite=5),
+    "historico.por_periodo": historico.sql_busca(desde="2025-01-01", ate="2025-06-30"),
+    "historico.anterior": (historico._SQL_ANTERIOR, ("20-PIT-00001", "2025-01-10")),
+    "historico.pontos": (historico._SQL_PONTOS.format("?, ?"), (1, 2)),
+}
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["tag_unica", "tags_duplicadas"])
+def banco(request, tmp_path_factory):
+    duplicar = request.param
+    conn = sqlite3.connect(tmp_path_factory.mktemp("banco") / "instrumentos.db")
+
+    # Banco anterior às migrações: só a tabela instrumentos
+    MIGRACOES[0][2](conn)
+    linhas = [(f"20-PIT-{i:05d}", f"SN{i:07d}", f"S{i:06d}", 0.0, 2500.0) for i in range(2000)]
+    if duplicar:
+        linhas.append(linhas[1])
+    conn.executemany(
+        "INSERT INTO instrumentos (tag, sn_instrumento, sn_sensor, min_range, max_range) VALUES (?, ?, ?, ?, ?)",
+        linhas
+    )
+    conn.commit()
+
+    versao = migrar(conn)
+    conn.executemany(
+        "INSERT INTO calibracoes (certificado, tag, sn_instrumento, data_calibracao, registrada_em) VALUES (?, ?, ?, ?, '')",
+        [(f"{i}/2025", f"20-PIT-{i % 2000:05d}", f"SN{i % 2000:07d}", f"2025-{i % 12 + 1:02d}-01") for i in range(6000)]
+    )
+    conn.executemany(
+        "INSERT INTO pontos_calibracao (calibracao_id, ordem, referencia) VALUES (?, ?, 0.0)",
+        [(i, j) for i in range(1, 6001) for j in range(5)]
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+
+    yield conn, versao, duplicar
+    conn.close()
+
+
+def test_migracoes_aplicadas(banco):
+    conn, versao, duplicar = banco
+    assert versao == MIGRACOES[-1][0]
+
+    unico, = conn.execute(
+        "SELECT \"unique\" FROM pragma_index_list('instrumentos') WHERE name = 'idx_instrumentos_tag'"
+    ).fetchone()
+    assert bool(unico) is not duplicar
+
+
+@pytest.mark.parametrize("nome", CONSULTAS)
+def test_consulta_usa_indice(banco, nome):
+    conn = banco[0]
+    sql, parametros = CONSULTAS[nome]
+    plano = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, parametros)]
+
+    assert plano
+    assert not [d for d in plano if d.startswith("SCAN")], plano
+    assert any("USING" in d for d in plano), plano
@@ -1,4 +1,26 @@
+from data.utils_db import extrair_tag_base, resolver_instrumento, sugerir_instrumentos
+from pdf.parser_certificados import normalizar_num
+from pdf.registro import RegistroCertificado
+from config.validacao import configuracao
+
+
 class ValidationContext:
+    """
+    Certificado e cadastro de uma validação. As regras leem cert (o
+    RegistroCertificado) e os valores do banco já convertidos; pdf é o
+    dicionário original, marcado pela UnidadeDeTrabalho com as ações
+    aprovadas (sn_atualizado, range_atualizado) para a AC.
+
+    config é a configuração da validação (config.validacao) em uso
+    quando o contexto foi montado: todas as regras do certificado usam a
+    mesma, mesmo que o arquivo seja recarregado no meio da validação.
+    """
+    __slots__ = (
+        "pdf", "db", "reg_sn", "tag_base_pdf", "tag_base_sn", "mvs",
+        "db_min_range", "db_max_range", "resolucao", "sugestoes",
+        "pontos", "cert", "tipo", "config"
+    )
+
     def __init__(
         self,
         dados_pdf,
@@ -6,7 +28,10 @@ class ValidationContext:
         reg_sn,
         tag_base_pdf,
         tag_base_sn,
-        pontos=None   
+        pontos=None,
+        resolucao=None,
+        sugestoes=None,
+        config=None
     ):
         
         self.pdf = dados_pdf
@@ -16,15 +41,60 @@ class ValidationContext:
         self.tag_base_pdf = tag_base_pdf
         self.tag_base_sn = tag_base_sn
 
-        self.mvs = False
+        # SN cadastrado em outra TAG da mesma família
+        self.mvs = reg_sn is not None and tag_base_pdf == tag_base_sn
+
+        self.db_min_range = normalizar_num(registro.get("min_range")) if registro else None
+        self.db_max_range = normalizar_num(registro.get("max_range")) if registro else None
+
+        self.resolucao = resolucao
+
+        # Instrumentos parecidos, quando a TAG e o SN não foram encontrados
+        self.sugestoes = sugestoes or []
 
        
         self.pontos = pontos or []
 
-        
-        self.tipo = self._obter_tipo()
+        self.cert = RegistroCertificado(dados_pdf, self.pontos)
+        self.tipo = self.cert.tipo
+
+        self.config = config or configuracao()
+
+
+def chave_resolucao(dados_pdf):
+    """
+    (tag, sn_instrumento, sn_sensor) do certificado, para resolver_instrumento(s).
+    """
+    return dados_pdf["tag"].upper(), dados_pdf.get("sn_instrumento"), dados_pdf.get("sn_sensor")
+
+
+def criar_contexto(dados_pdf, pontos, resolucao=None):
+    """
+    Consulta o banco para a TAG/SNs do certificado (uma única consulta) e
+    monta o contexto de validação (usado pela interface e pelo
+    processamento em lote). O lote pode informar a resolução já obtida
+    com resolver_instrumentos.
+
+    Se nem a TAG nem o SN estão cadastrados, busca instrumentos parecidos
+    (sugerir_instrumentos) antes de a validação tratá-lo como novo.
+    """
+    chave = chave_resolucao(dados_pdf)
+    dados_pdf["tag"] = chave[0]
+
+    if resolucao is None:
+        resolucao = resolver_instrumento(*chave)
+
+    sugestoes = None
+    if resolucao.exato is None and resolucao.mesmo_sn is None:
+        sugestoes = sugerir_instrumentos(*chave)
 
-    def _obter_tipo(self):
-        if not self.pontos:
-            return None
-        return self.pontos[0].get("tipo")
\ No newline at end of file
+    return ValidationContext(
+        dados_pdf=dados_pdf,
+        registro=resolucao.exato,
+        reg_sn=resolucao.mesmo_sn,
+        tag_base_pdf=extrair_tag_base(chave[0]),
+        tag_base_sn=resolucao.tag_base_sn,
+        pontos=pontos,
+        resolucao=resolucao,
+        sugestoes=sugestoes
+    )
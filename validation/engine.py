@@ -1,3 +1,5 @@
+from pdf.classificador import TE
+from telemetria.rastreio import span
 from validation.rules import (
     regra_tag_vs_sn,
     regra_novo_instrumento,
@@ -7,30 +9,136 @@ from validation.rules import (
     regra_haste_te,
     regra_local_fpso,
     regra_rangein,
-    regra_incert_fidu
+    regra_incert_fidu,
+    regra_pontos_if
+)
+
+
+# Modos do ValidationEngine
+COLETAR = "coletar"              # todas as regras (interface)
+FALHA_RAPIDA = "falha_rapida"    # para na primeira divergência que impede a geração (triagem do lote)
+
+
+# Pré-condições que as regras podem exigir do contexto
+CONDICOES = {
+    "cadastrado": lambda ctx: ctx.db is not None,
+    "sn_em_outra_tag": lambda ctx: ctx.db is None and ctx.reg_sn is not None,
+    "nao_encontrado": lambda ctx: ctx.db is None and ctx.reg_sn is None,
+    "te": lambda ctx: ctx.tipo == TE,
+}
+
+
+def avaliar_condicoes(ctx):
+    return {nome: teste(ctx) for nome, teste in CONDICOES.items()}
+
+
+def impeditiva(issue):
+    """
+    Divergência que impede a geração mesmo aprovando as ações.
+    """
+    return issue.blocking and issue.action is None
+
+
+class Regra:
+    """
+    Regra de validação e o que ela precisa para rodar:
+
+    - campos: atributos de ctx.cert que precisam estar preenchidos
+    - requer: nomes de CONDICOES
+    - custo: estimativa relativa, para ordenar a execução
+    - bloqueia: se pode devolver uma divergência bloqueante
+
+    Sem os campos ou as condições a regra não teria o que apontar e não
+    é executada.
+    """
+    __slots__ = ("funcao", "nome", "campos", "requer", "custo", "bloqueia")
+
+    def __init__(self, funcao, campos=(), requer=(), custo=1, bloqueia=False):
+        self.funcao = funcao
+        self.nome = funcao.__name__
+        self.campos = campos
+        self.requer = requer
+        self.custo = custo
+        self.bloqueia = bloqueia
+
+        desconhecidas = [c for c in requer if c not in CONDICOES]
+        if desconhecidas:
+            raise ValueError(f"{self.nome}: condição desconhecida {', '.join(desconhecidas)}")
+
+    def aplicavel(self, ctx, condicoes=None):
+        """
+        condicoes: resultado de avaliar_condicoes(ctx), para não
+        reavaliá-las a cada regra.
+        """
+        if condicoes is None:
+            condicoes = avaliar_condicoes(ctx)
+
+        cert = ctx.cert
+        for campo in self.campos:
+            if getattr(cert, campo) is None:
+                return False
+        for condicao in self.requer:
+            if not condicoes[condicao]:
+                return False
+        return True
+
+    def __repr__(self):
+        return f"Regra({self.nome}, custo={self.custo}, bloqueia={self.bloqueia})"
+
+
+# Na ordem em que as divergências são apresentadas
+REGRAS = (
+    Regra(regra_tag_vs_sn, requer=("sn_em_outra_tag",), bloqueia=True),
+    Regra(regra_novo_instrumento, requer=("nao_encontrado",), bloqueia=True),
+    Regra(regra_sn_instrumento, campos=("sn_instrumento",), requer=("cadastrado",)),
+    Regra(regra_sn_sensor, campos=("sn_sensor",), requer=("cadastrado",)),
+    Regra(regra_range, campos=("min_range", "max_range"), requer=("cadastrado",)),
+    Regra(regra_haste_te, requer=("te",), bloqueia=True),
+    Regra(regra_local_fpso, custo=2, bloqueia=True),
+    Regra(regra_rangein, campos=("min_range", "max_range", "inmin_range", "inmax_range"), bloqueia=True),
+    Regra(regra_incert_fidu, campos=("incerteza", "erro_fid"), bloqueia=True),
+    Regra(regra_pontos_if, campos=("pontos",), custo=3, bloqueia=True),
 )
 
 
 class ValidationEngine:
-    def __init__(self):
-        self.rules = [
-            regra_tag_vs_sn,
-            regra_novo_instrumento,
-            regra_sn_instrumento,
-            regra_sn_sensor,
-            regra_range,
-            regra_haste_te,
-            regra_local_fpso,
-            regra_rangein,
-            regra_incert_fidu
-        ]
+    """
+    Roda as regras de REGRAS aplicáveis ao contexto: as que podem
+    bloquear primeiro e, entre elas, as mais baratas. As divergências
+    voltam na ordem de REGRAS, seja qual for a ordem de execução.
+
+    modo=COLETAR roda todas (a interface mostra cada divergência).
+    modo=FALHA_RAPIDA para na primeira divergência em que parar(issue) é
+    verdadeiro (por padrão, impeditiva); o lote usa para triagem.
+    """
+
+    def __init__(self, modo=COLETAR, parar=impeditiva, regras=REGRAS):
+        self.modo = modo
+        self.parar = parar
+        self.regras = regras
+        self.ordem = {regra: i for i, regra in enumerate(regras)}
+        self.agenda = sorted(regras, key=lambda r: (not r.bloqueia, r.custo, self.ordem[r]))
 
     def run(self, context):
-        issues = []
+        encontradas = []
+        executadas = 0
+
+        with span("validacao", tipo=context.tipo, modo=self.modo) as s:
+            condicoes = avaliar_condicoes(context)
+            for regra in self.agenda:
+                if not regra.aplicavel(context, condicoes):
+                    continue
+
+                executadas += 1
+                with span("regra", regra=regra.nome):
+                    issue = regra.funcao(context)
+
+                if issue:
+                    encontradas.append((self.ordem[regra], issue))
+                    if self.modo == FALHA_RAPIDA and self.parar(issue):
+                        break
 
-        for rule in self.rules:
-            issue = rule(context)
-            if issue:
-                issues.append(issue)
+            s.definir(regras=executadas)
 
-        return issues
\ No newline at end of file
+        encontradas.sort(key=lambda item: item[0])
+        return [issue for _, issue in encontradas]
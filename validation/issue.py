@@ -5,10 +5,14 @@ class ValidationIssue:
         title,
         message,
         action=None,
-        blocking=False
+        blocking=False,
+        marca=None
     ):
         self.key = key
         self.title = title
         self.message = message
         self.action = action      
-        self.blocking = blocking  
\ No newline at end of file
+        self.blocking = blocking  
+        # Chave do certificado marcada (True) quando a ação é aprovada,
+        # para a AC (ver data.unidade_trabalho)
+        self.marca = marca
\ No newline at end of file
@@ -1,5 +1,6 @@
+from collections import Counter
+
 from validation.issue import ValidationIssue
-import unicodedata
 from data.utils_db import (
     atualizar_sn,
     atualizar_sn_sensor,
@@ -7,24 +8,25 @@ from data.utils_db import (
     atualizar_tag,
     inserir_instrumento
 )
-from xml_model.xml_extractor import extrair_pontos_calibracao_pdf
+from data.similaridade import normalizar_chave
 
+from xml_model.xml_extractor import extrair_pontos_calibracao_pdf
+from pdf.classificador import TE
 
-def normalizar_texto(texto):
-    if not texto:
-        return ""
-    texto = texto.upper()
-    texto = unicodedata.normalize("NFKD", texto)
-    return "".join(c for c in texto if not unicodedata.combining(c))
+# As regras leem ctx.cert (pdf.registro.RegistroCertificado), com os
+# números já convertidos, e ctx.config (config.validacao), e não alteram
+# o contexto; só as ações aprovadas gravam no banco e marcam o
+# certificado (ctx.pdf).
 
 
-def to_float(value):
-    try:
-        if value is None:
-            return None
-        return float(str(value).replace(",", "."))
-    except Exception:
-        return None
+def _inserir_certificado(ctx):
+    return inserir_instrumento(
+        ctx.cert.tag,
+        ctx.cert.sn_instrumento,
+        ctx.cert.sn_sensor,
+        ctx.cert.min_range,
+        ctx.cert.max_range
+    )
 
 
 
@@ -33,23 +35,16 @@ def regra_tag_vs_sn(ctx):
     if ctx.db is None and ctx.reg_sn is not None:
 
         # Família MVS
-        if ctx.tag_base_pdf == ctx.tag_base_sn:
-            ctx.mvs = True
+        if ctx.mvs:
             return ValidationIssue(
                 key="mvs",
                 title="TAG compatível (Família MVS)",
                 message=(
                     "NS pertence à mesma família.\n\n"
                     f"Banco: {ctx.reg_sn['tag']}\n"
-                    f"Certificado: {ctx.pdf['tag']}"
-                ),
-                action=lambda: inserir_instrumento(
-                    ctx.pdf["tag"],
-                    ctx.pdf.get("sn_instrumento"),
-                    ctx.pdf.get("sn_sensor"),
-                    ctx.pdf.get("min_range"),
-                    ctx.pdf.get("max_range")
+                    f"Certificado: {ctx.cert.tag}"
                 ),
+                action=lambda: _inserir_certificado(ctx),
                 blocking=False
             )
 
@@ -60,33 +55,63 @@ def regra_tag_vs_sn(ctx):
             message=(
                 "NS já cadastrado com outra TAG.\n\n"
                 f"Banco: {ctx.reg_sn['tag']}\n"
-                f"Certificado: {ctx.pdf['tag']}"
+                f"Certificado: {ctx.cert.tag}"
             ),
             action=lambda: atualizar_tag(
-                ctx.pdf["sn_instrumento"],
-                ctx.pdf["tag"]
+                ctx.reg_sn["tag"],
+                ctx.cert.tag
             ),
             blocking=True
         )
 
+def _listar_sugestoes(sugestoes):
+    return "\n".join(
+        f"- {s['tag']} (SN {s['sn_instrumento']}) {s['similaridade']:.0%}"
+        for s in sugestoes
+    )
+
+
 # Novo Instrumento
 def regra_novo_instrumento(ctx):
     if ctx.db is None and ctx.reg_sn is None:
+        # Pela chave normalizada, não pela similaridade: trigramas iguais
+        # não garantem a mesma TAG ("ABAB" e "ABABAB")
+        chave = normalizar_chave(ctx.cert.tag)
+        equivalentes = [
+            s for s in ctx.sugestoes
+            if chave and normalizar_chave(s["tag"]) == chave
+        ]
+
+        # Mesma TAG com outra grafia (traço, espaço): cadastrar criaria
+        # um instrumento duplicado
+        if equivalentes:
+            return ValidationIssue(
+                key="tag_equivalente",
+                title="TAG cadastrada com outra grafia",
+                message=(
+                    f"TAG {ctx.cert.tag} não existe, mas corresponde a:\n"
+                    f"{_listar_sugestoes(equivalentes)}\n\n"
+                    "Corrija a TAG no certificado ou no cadastro."
+                ),
+                blocking=True
+            )
+
+        message = (
+            f"TAG {ctx.cert.tag} não existe.\n\n"
+            f"SN Instrumento: {ctx.cert.sn_instrumento}\n"
+            f"SN Sensor: {ctx.cert.sn_sensor}"
+        )
+        if ctx.sugestoes:
+            message += (
+                f"\n\nInstrumentos parecidos já cadastrados:\n{_listar_sugestoes(ctx.sugestoes)}\n\n"
+                "Cadastrar mesmo assim como novo instrumento?"
+            )
+
         return ValidationIssue(
             key="novo_instrumento",
             title="TAG não encontrada",
-            message=(
-                f"TAG {ctx.pdf['tag']} não existe.\n\n"
-                f"SN Instrumento: {ctx.pdf.get('sn_instrumento')}\n"
-                f"SN Sensor: {ctx.pdf.get('sn_sensor')}"
-            ),
-            action=lambda: inserir_instrumento(
-                ctx.pdf["tag"],
-                ctx.pdf.get("sn_instrumento"),
-                ctx.pdf.get("sn_sensor"),
-                ctx.pdf.get("min_range"),
-                ctx.pdf.get("max_range")
-            ),
+            message=message,
+            action=lambda: _inserir_certificado(ctx),
             blocking=True
         )
 
@@ -95,21 +120,17 @@ def regra_sn_instrumento(ctx):
     if ctx.db is None:
         return None
 
-    if (
-        ctx.pdf.get("sn_instrumento")
-        and ctx.pdf["sn_instrumento"] != ctx.db.get("sn_instrumento")
-    ):
+    sn = ctx.cert.sn_instrumento
+    if sn and sn != ctx.db.get("sn_instrumento"):
         return ValidationIssue(
             key="sn_instrumento",
             title="SN do Instrumento divergente",
             message=(
-                f"PDF: {ctx.pdf['sn_instrumento']}\n"
+                f"PDF: {sn}\n"
                 f"Banco: {ctx.db.get('sn_instrumento')}"
             ),
-            action=lambda: (
-                atualizar_sn(ctx.db["tag"], ctx.pdf["sn_instrumento"]),
-                ctx.pdf.__setitem__("sn_atualizado", True)
-            )
+            action=lambda: atualizar_sn(ctx.db["tag"], sn),
+            marca="sn_atualizado"
         )
 
 # SN do Sensor
@@ -117,21 +138,17 @@ def regra_sn_sensor(ctx):
     if ctx.db is None:
         return None
 
-    if (
-        ctx.pdf.get("sn_sensor")
-        and ctx.pdf["sn_sensor"] != ctx.db.get("sn_sensor")
-    ):
+    sn_sensor = ctx.cert.sn_sensor
+    if sn_sensor and sn_sensor != ctx.db.get("sn_sensor"):
         return ValidationIssue(
             key="sn_sensor",
             title="SN do Sensor divergente",
             message=(
-                f"PDF: {ctx.pdf['sn_sensor']}\n"
+                f"PDF: {sn_sensor}\n"
                 f"Banco: {ctx.db.get('sn_sensor')}"
             ),
-            action=lambda: (
-                atualizar_sn_sensor(ctx.db["tag"], ctx.pdf["sn_sensor"]),
-                ctx.pdf.__setitem__("sn_atualizado", True)
-            )
+            action=lambda: atualizar_sn_sensor(ctx.db["tag"], sn_sensor),
+            marca="sn_atualizado"
         )
 
 # RANGE
@@ -139,19 +156,14 @@ def regra_range(ctx):
     if ctx.db is None:
         return None
 
-    pdf_min = to_float(ctx.pdf.get("min_range"))
-    pdf_max = to_float(ctx.pdf.get("max_range"))
+    pdf_min = ctx.cert.min_range
+    pdf_max = ctx.cert.max_range
 
     if pdf_min is None or pdf_max is None:
         return None
 
-    db_min = to_float(ctx.db.get("min_range"))
-    db_max = to_float(ctx.db.get("max_range"))
-
-    ctx.pdf["min_range"] = pdf_min
-    ctx.pdf["max_range"] = pdf_max
-    ctx.db["min_range"] = db_min
-    ctx.db["max_range"] = db_max
+    db_min = ctx.db_min_range
+    db_max = ctx.db_max_range
 
     if db_min is None or db_max is None:
         return ValidationIssue(
@@ -161,10 +173,8 @@ def regra_range(ctx):
                 f"PDF: {pdf_min} → {pdf_max}\n"
                 "Banco: não cadastrado"
             ),
-            action=lambda: (
-                atualizar_range(ctx.db["tag"], pdf_min, pdf_max),
-                ctx.pdf.__setitem__("range_atualizado", True)
-            )
+            action=lambda: atualizar_range(ctx.db["tag"], pdf_min, pdf_max),
+            marca="range_atualizado"
         )
 
     if pdf_min != db_min or pdf_max != db_max:
@@ -175,39 +185,28 @@ def regra_range(ctx):
                 f"PDF: {pdf_min} → {pdf_max}\n"
                 f"Banco: {db_min} → {db_max}"
             ),
-            action=lambda: (
-                atualizar_range(ctx.db["tag"], pdf_min, pdf_max),
-                ctx.pdf.__setitem__("range_atualizado", True)
-            )
+            action=lambda: atualizar_range(ctx.db["tag"], pdf_min, pdf_max),
+            marca="range_atualizado"
         )
 
     return None
 
 # HASTE (somente TE)
 def regra_haste_te(ctx):
-    if "TE" not in ctx.pdf["tag"]:
+    if ctx.tipo != TE:
         return None
 
-    try:
-        rod = ctx.pdf.get("rod_length")
-        dia = ctx.pdf.get("probe_diameter")
-
-        if rod is None or dia is None or float(dia) > float(rod):
-            return ValidationIssue(
-                key="haste",
-                title="Dados de Haste inválidos",
-                message=(
-                    f"Comprimento: {rod}\n"
-                    f"Diâmetro: {dia}"
-                ),
-                blocking=True
-            )
+    rod = ctx.cert.rod_length
+    dia = ctx.cert.probe_diameter
 
-    except Exception:
+    if rod is None or dia is None or dia > rod:
         return ValidationIssue(
-            key="haste_parse",
-            title="Erro na leitura da Haste",
-            message="Erro ao interpretar os valores.",
+            key="haste",
+            title="Dados de Haste inválidos",
+            message=(
+                f"Comprimento: {rod}\n"
+                f"Diâmetro: {dia}"
+            ),
             blocking=True
         )
 
@@ -215,7 +214,7 @@ def regra_haste_te(ctx):
 
 # LOCAL
 def regra_local_fpso(ctx):
-    local_pdf = normalizar_texto(ctx.pdf.get("local"))
+    local_pdf = ctx.cert.local_normalizado
 
     if not local_pdf:
         return ValidationIssue(
@@ -225,28 +224,16 @@ def regra_local_fpso(ctx):
             blocking=True
         )
 
-    fpsos = {
-        "FPSO FRADE": ["FPSO", "FRADE"],
-        "FPSO FORTE": ["FPSO", "FORTE"],
-        "FPSO BRAVO": ["FPSO", "BRAVO"],
-        "POLVO": ["POLVO"]
-    }
-
-    for nome, palavras in fpsos.items():
-        if all(p in local_pdf for p in palavras):
-            ctx.fpso_identificado = nome
-            return None
+    if ctx.config.instalacao(local_pdf):
+        return None
 
     return ValidationIssue(
         key="local_invalido",
         title="Local incompatível",
         message=(
-            f"Local informado:\n{ctx.pdf.get('local')}\n\n"
-            "Não corresponde a:\n"
-            "- FPSO FRADE\n"
-            "- FPSO FORTE\n"
-            "- FPSO BRAVO\n"
-            "- POLVO"
+            f"Local informado:\n{ctx.cert.local}\n\n"
+            "Não corresponde a:\n" +
+            "\n".join(f"- {nome}" for nome in ctx.config.instalacoes)
         ),
         blocking=True
     )
@@ -255,22 +242,15 @@ def regra_local_fpso(ctx):
 # RANGE indicado x calibrado
 def regra_rangein(ctx):
 
-    # Converter valores do PDF para float
-    pdf_min = to_float(ctx.pdf.get("min_range"))
-    pdf_max = to_float(ctx.pdf.get("max_range"))
-    pdf_imin = to_float(ctx.pdf.get("inmin_range"))
-    pdf_imax = to_float(ctx.pdf.get("inmax_range"))
+    pdf_min = ctx.cert.min_range
+    pdf_max = ctx.cert.max_range
+    pdf_imin = ctx.cert.inmin_range
+    pdf_imax = ctx.cert.inmax_range
 
-    # Se algum valor não puder ser convertido, ignora a regra
+    # Sem algum dos valores, ignora a regra
     if pdf_min is None or pdf_max is None or pdf_imin is None or pdf_imax is None:
         return None
 
-    # Atualiza o contexto com os valores normalizados
-    ctx.pdf["min_range"] = pdf_min
-    ctx.pdf["max_range"] = pdf_max
-    ctx.pdf["inmin_range"] = pdf_imin
-    ctx.pdf["inmax_range"] = pdf_imax
-
     # Validação: range calibrado deve estar contido no range indicado
     if pdf_min < pdf_imin or pdf_max > pdf_imax:
         return ValidationIssue(
@@ -290,27 +270,29 @@ def regra_rangein(ctx):
 # Incerteza e Erro fiducial 
 def regra_incert_fidu(ctx):
 
-    # Converter valores do PDF para float
-    incert= to_float(ctx.pdf.get("incerteza"))
-    fiducial = to_float(ctx.pdf.get("erro_fid"))
+    incert = ctx.cert.incerteza
+    fiducial = ctx.cert.erro_fid
 
-   
     if incert is None or fiducial is None:
         return None
 
-    
-    ctx.pdf["erro_fid"] = fiducial 
-    ctx.pdf["incerteza"] = incert
+    limites = ctx.config.limites(ctx.tipo)
+    if incert >= limites.incerteza or fiducial > limites.erro_fiducial:
+        if limites.incerteza == limites.erro_fiducial:
+            acima = f"Incerteza ou Erro fiducial acima de  {limites.incerteza}%"
+        else:
+            acima = (
+                f"Incerteza acima de {limites.incerteza}% ou "
+                f"Erro fiducial acima de {limites.erro_fiducial}%"
+            )
 
- 
-    if incert >= 0.1 or fiducial > 0.1:
         return ValidationIssue(
             key="incert_fiducial",
             title="Incerteza/Erro Fiducial",
             message=(
                 f"Incerteza (PDF): {incert}\n"
-                f"Erro fiducial (PDF): {fiducial}\n\n"
-                "Incerteza ou Erro fiducial acima de  0.1%"
+                f"Erro fiducial (PDF): {fiducial}\n\n" +
+                acima
             ),
             action=None,     # Apenas informativo
             blocking=True    # Bloqueia a geração da AC
@@ -318,6 +300,99 @@ def regra_incert_fidu(ctx):
 
     return None
 
+# Linhas listadas na mensagem; as demais só são contadas
+MAX_LINHAS_PONTOS = 15
+
+
+def _k_da_maioria(ks):
+    presentes = [v for v in ks if v is not None]
+    if not presentes:
+        return None
+    if presentes.count(presentes[0]) == len(presentes):
+        return presentes[0]
+    return Counter(presentes).most_common(1)[0][0]
+
+
+def verificar_pontos(cert, limites):
+    """
+    Confere a tabela de resultados do certificado, com os limites do tipo
+    (config.limites(cert.tipo)):
+
+    - primeiro e último ponto nos extremos do range (min/max_range)
+    - referências em sequência (crescente ou decrescente)
+    - mesmo k em todos os pontos
+
+    A conferência de |tendência| + incerteza de cada ponto NÃO é feita:
+    as tolerâncias de cada tipo ainda não foram confirmadas. Por isso
+    nenhum ponto bloqueia a geração da AC.
+
+    Retorna {linha: [motivos]} (linha a partir de 0, na ordem do
+    certificado).
+    """
+    pontos = cert.pontos
+    problemas = {}
+    if not pontos:
+        return problemas
+
+    ref = pontos.referencia
+    validas = [i for i, r in enumerate(ref) if r is not None]
+    if not validas:
+        return problemas
+
+    primeira, ultima = validas[0], validas[-1]
+    crescente = ref[ultima] >= ref[primeira]
+
+    # Extremos
+    if cert.min_range is not None and cert.max_range is not None:
+        margem = limites.margem_extremos * abs(cert.max_range - cert.min_range)
+        inicio, fim = (cert.min_range, cert.max_range) if crescente else (cert.max_range, cert.min_range)
+        if abs(ref[primeira] - inicio) > margem:
+            problemas[primeira] = [f"ponto inicial {ref[primeira]} ≠ {inicio}"]
+        if abs(ref[ultima] - fim) > margem:
+            problemas.setdefault(ultima, []).append(f"ponto final {ref[ultima]} ≠ {fim}")
+
+    # Sequência e k, numa passada
+    ks = pontos.k
+    k_maioria = _k_da_maioria(ks)
+    tolerancia_k = limites.tolerancia_k
+    anterior = None
+    for i, (r, k) in enumerate(zip(ref, ks)):
+        if r is not None:
+            if anterior is not None and (r <= anterior if crescente else r >= anterior):
+                problemas.setdefault(i, []).append("fora da sequência")
+            anterior = r
+        if k is not None and abs(k - k_maioria) > tolerancia_k:
+            problemas.setdefault(i, []).append(f"k diferente de {k_maioria}")
+
+    return problemas
+
+
+def _listar_pontos(cert, problemas):
+    pontos = cert.pontos
+    linhas = sorted(problemas)
+    texto = "\n".join(
+        f"- Linha {i + 1} (ref. {pontos.referencia[i]}, tend. {pontos.tendencia[i]}, "
+        f"inc. {pontos.incerteza[i]}, k {pontos.k[i]}): {'; '.join(problemas[i])}"
+        for i in linhas[:MAX_LINHAS_PONTOS]
+    )
+    if len(linhas) > MAX_LINHAS_PONTOS:
+        texto += f"\n... e mais {len(linhas) - MAX_LINHAS_PONTOS} linha(s)"
+    return texto
+
+
 # Verificar ponto inicial e final de calibração
 def regra_pontos_if(ctx):
-    pass
+    problemas = verificar_pontos(ctx.cert, ctx.config.limites(ctx.tipo))
+    if not problemas:
+        return None
+
+    return ValidationIssue(
+        key="pontos_calibracao",
+        title="Pontos de calibração",
+        message=(
+            f"{len(problemas)} de {len(ctx.cert.pontos)} pontos com divergência:\n\n"
+            f"{_listar_pontos(ctx.cert, problemas)}"
+        ),
+        action=None,     # Apenas informativo
+        blocking=False   # Sem tolerância dos pontos (ver verificar_pontos)
+    )
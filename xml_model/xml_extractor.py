@@ -1,4 +1,6 @@
-import pdfplumber
+from pdf.classificador import DPT, PT, TE, TT, classificar_documento
+from pdf.documento import CertificateDocument
+from pdf.tabelas import localizar_tabela_resultados
 from pdf.parser_certificados import extrair_curva_calibracao, aplicar_curva_kpa
 
 
@@ -32,52 +34,27 @@ def _valor_pos_barra(v):
 
 
 
-def extrair_pontos_calibracao_pdf(caminho_pdf):
-    tabelas = []
-    texto = ""
+def extrair_pontos_calibracao_pdf(documento, tipo=None):
+    """
+    Recebe o CertificateDocument já aberto (ou o caminho do PDF, que
+    então é aberto apenas para esta chamada) e o tipo do instrumento já
+    classificado (dados_pdf["tipo"]); sem tipo, classifica o documento.
+    """
+    if not isinstance(documento, CertificateDocument):
+        with CertificateDocument(documento) as doc:
+            return extrair_pontos_calibracao_pdf(doc, tipo)
 
-    
-    with pdfplumber.open(caminho_pdf) as pdf:
-        for pagina in pdf.pages:
-            texto += (pagina.extract_text() or "") + "\n"
-
-            for tabela in pagina.extract_tables() or []:
-                if tabela and len(tabela) > 2:
-                    tabelas.append(tabela)
+    if tipo is None:
+        tipo = classificar_documento(documento).tipo
 
-    if not tabelas:
-        return []
-
-    texto_upper = texto.upper()
     pontos = []
 
-    # Classificação
-    is_te = "THERMORESISTANCE" in texto_upper or "TERMORRESISTÊNCIA" in texto_upper
-
-    is_tt = (
-        "DIGITAL THERMOMETER" in texto_upper or
-        "TEMPERATURE TRANSMITTER" in texto_upper or
-        "-TT" in texto_upper or
-        "TRANSMISSOR DE TEMPERATURA" in texto_upper
-    )
-
-    is_pt = (
-        "PRESSURE" in texto_upper or
-        "PRESSÃO" in texto_upper or
-        "-PT" in texto_upper
-    )
-
-    is_dpt = (
-        "DIFFERENTIAL" in texto_upper or
-        "DIFERENCIAL" in texto_upper or
-        "-DPT" in texto_upper or
-        "PDIT" in texto_upper
-    )
-
     
     # TE – Termorresistência
-    if is_te and not is_tt:
-        tabela = tabelas[0]
+    if tipo == TE:
+        tabela = localizar_tabela_resultados(documento, TE)
+        if tabela is None:
+            return []
 
         for linha in tabela[1:]:
             if len(linha) < 7:
@@ -88,7 +65,7 @@ def extrair_pontos_calibracao_pdf(caminho_pdf):
                 continue
 
             pontos.append({
-                "tipo": "TE",
+                "tipo": TE,
                 "referencia": referencia,
                 "media": _to_float(linha[4]),
                 "tendencia": _to_float(linha[5]),
@@ -100,8 +77,10 @@ def extrair_pontos_calibracao_pdf(caminho_pdf):
 
     
     # TT – Temperatura (dois formatos de tabela)
-    if is_tt:
-        tabela = tabelas[0]
+    if tipo == TT:
+        tabela = localizar_tabela_resultados(documento, TT)
+        if tabela is None:
+            return []
 
         
         cabecalho = " ".join(
@@ -137,7 +116,7 @@ def extrair_pontos_calibracao_pdf(caminho_pdf):
                 k = _to_float(linha[4]) if len(linha) > 4 else None
 
             pontos.append({
-                "tipo": "TT",
+                "tipo": TT,
                 "referencia": referencia,
                 "media": media,
                 "tendencia": tendencia,
@@ -149,9 +128,10 @@ def extrair_pontos_calibracao_pdf(caminho_pdf):
 
     
     # PT / DPT – PRESSÃO
-    if (is_pt or is_dpt) and len(tabelas) >= 2:
-        tabela = tabelas[1]
-        tipo = "DPT" if is_dpt else "PT"
+    if tipo in (PT, DPT):
+        tabela = localizar_tabela_resultados(documento, tipo)
+        if tabela is None:
+            return []
 
         cabecalho = " ".join(
             str(c).upper()
@@ -160,7 +140,7 @@ def extrair_pontos_calibracao_pdf(caminho_pdf):
         )
 
         media_em_ma = "MA DC" in cabecalho
-        curva_calibracao = extrair_curva_calibracao(texto)
+        curva_calibracao = extrair_curva_calibracao(documento.texto)
 
         for linha in tabela[1:]:
             if len(linha) < 4:
@@ -2,6 +2,9 @@ import xml.etree.ElementTree as ET
 from xml.dom import minidom
 from pathlib import Path
 
+from pdf.classificador import tipo_do_certificado
+from telemetria.rastreio import rastrear
+
 
 
 
@@ -66,6 +69,7 @@ def normalizar_tag_mvs(tag: str | None, instalacao: str | None) -> str:
 
 
 
+@rastrear("xml.gerar")
 def gerar_xml_calibracao(
     dados_pdf: dict,
     pontos: list,
@@ -75,8 +79,7 @@ def gerar_xml_calibracao(
     if not pontos:
         raise ValueError("Pontos de calibração não informados")
 
-    # Tipo vem dos pontos
-    tipo = pontos[0]["tipo"].upper()
+    tipo = tipo_do_certificado(dados_pdf, pontos).upper()
 
     root = ET.Element("Calibracion")
 